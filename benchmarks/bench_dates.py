@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Compares parsing a 10,000 ticket list response with dates converted by
+``datetime.fromtimestamp`` every time, with the conversions remembered, and
+with dates kept as timestamps (``KayakoAPI(epoch_dates=True)``).
+
+In the first response each ticket has timestamps of its own, shared by its
+dates and its post, so the cache only helps within a ticket. In the second,
+as after a bulk import, every ticket has the same timestamps. Each is parsed
+in full, then projected to the date fields alone, which shows the share of
+the date conversions in the time taken.
+
+Usage: PYTHONPATH=. python benchmarks/bench_dates.py
+'''
+
+import time
+from datetime import datetime
+
+from lxml import etree
+
+import kayako.core.lib
+from kayako.api import KayakoAPI
+from kayako.core.transport import InProcessTransport
+from kayako.objects import Ticket
+from kayako.tests.core.fixtures import TICKET
+
+TICKETS = 10000
+
+def body(distinct):
+    rows = []
+    for id in range(1, TICKETS + 1):
+        ticket = TICKET % dict(id=id, departmentid=1, statusid=1, userid=1, ownerstaffid=1)
+        if distinct:
+            ticket = ticket.replace('1309262424', str(1309262424 + id * 3600)).replace('1309262500', str(1309262500 + id * 3600))
+        rows.append(ticket)
+    return '<tickets>%s</tickets>' % ''.join(rows)
+
+def timed(function, repeat=7):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+DATE_FIELDS = ['creationtime', 'lastactivity', 'laststaffreply', 'lastuserreply', 'nextreplydue', 'resolutiondue']
+
+def parse(api, nodes, fields=None):
+    # Start from an empty cache, and build the posts of full tickets too, they have a date of their own
+    kayako.core.lib._timestamps.clear()
+    tickets = [Ticket._load(api, node, fields) for node in nodes]
+    if fields is None:
+        for ticket in tickets:
+            len(ticket.posts)
+    return tickets
+
+def run(distinct):
+    nodes = etree.fromstring(body(distinct)).findall('ticket')
+    transport = InProcessTransport(lambda *args: '')
+    datetimes = KayakoAPI('http://localhost/api/index.php', 'key', 'secret', transport=transport)
+    epoch = KayakoAPI('http://localhost/api/index.php', 'key', 'secret', transport=transport, epoch_dates=True)
+
+    print '%d tickets, %s timestamps' % (TICKETS, 'distinct' if distinct else 'repeated')
+    for label, fields in (('all fields', None), ('date fields only', DATE_FIELDS)):
+        remembered = kayako.core.lib.fromtimestamp
+        kayako.core.lib.fromtimestamp = lambda timestamp, tz=None: datetime.fromtimestamp(timestamp, tz)
+        try:
+            uncached = timed(lambda: parse(datetimes, nodes, fields))
+        finally:
+            kayako.core.lib.fromtimestamp = remembered
+        cached = timed(lambda: parse(datetimes, nodes, fields))
+        epoch_time = timed(lambda: parse(epoch, nodes, fields))
+        print '  %s' % label
+        print '    fromtimestamp         %8.3fs' % uncached
+        print '    remembered            %8.3fs  (%.2fx)' % (cached, uncached / cached)
+        print '    epoch_dates           %8.3fs  (%.2fx)' % (epoch_time, uncached / epoch_time)
+
+    timestamps = [ticket.lastactivity for ticket in (Ticket._load(epoch, node) for node in nodes)]
+    converted = timed(lambda: (kayako.core.lib._timestamps.clear(), kayako.core.lib.fromtimestamps(timestamps)))
+    print '  fromtimestamps, 1 date  %8.3fs' % converted
+
+def main():
+    run(distinct=True)
+    run(distinct=False)
+
+if __name__ == '__main__':
+    main()
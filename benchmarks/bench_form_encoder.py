@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Compares the linear FormEncoder with the concatenating encoder it replaced
+on TicketAttachment.add sized bodies.
+
+Usage: PYTHONPATH=. python benchmarks/bench_form_encoder.py
+'''
+
+import base64
+import os
+import time
+import urllib2
+
+from kayako.core.form import FormEncoder
+from kayako.objects import TicketAttachment
+
+SIZES = [('1 KB', 1024), ('1 MB', 1024 ** 2), ('50 MB', 50 * 1024 ** 2)]
+
+def legacy_post_data(**parameters):
+    ''' The pre-FormEncoder KayakoAPI._post_data. '''
+    data = None
+    first = True
+    for key, value in parameters.iteritems():
+        if isinstance(value, list):
+            if len(value):
+                for sub_value in value:
+                    if first:
+                        data = '%s[]=%s' % (key, urllib2.quote(sub_value))
+                        first = False
+                    else:
+                        data = '%s&%s[]=%s' % (data, key, urllib2.quote(sub_value))
+            else:
+                if first:
+                    data = '%s[]=' % key
+                    first = False
+                else:
+                    data = '%s&%s[]=' % (data, key)
+        elif first:
+            data = '%s=%s' % (key, urllib2.quote(value))
+            first = False
+        else:
+            data = '%s&%s=%s' % (data, key, urllib2.quote(value))
+    return data
+
+def parameters(size):
+    contents = base64.b64encode(os.urandom(size * 3 // 4))
+    return dict(ticketid='1234', ticketpostid='5678', filename='log bundle.tar.gz', contents=contents, apikey='abc3r4f-alskcv3-kvj4', salt='1234567890',
+                signature='VKjt8M54liY6xq1UuhUYH5BFp1RUqHekqytgLPrVEA0=')
+
+def timed(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    encoder = FormEncoder(TicketAttachment.__add_parameters__)
+    print '%-6s %12s %12s %12s' % ('size', 'legacy', 'encode', 'streamed')
+    for label, size in SIZES:
+        params = parameters(size)
+        repeat = 200 if size < 1024 ** 2 else 3
+        legacy = timed(lambda: legacy_post_data(**params), repeat)
+        joined = timed(lambda: encoder.encode(params), repeat)
+        streamed = timed(lambda: [chunk for chunk in encoder.iter_encode(params)], repeat)
+        print '%-6s %10.2fms %10.2fms %10.2fms' % (label, legacy * 1000, joined * 1000, streamed * 1000)
+
+if __name__ == '__main__':
+    main()
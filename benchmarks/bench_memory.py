@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Compares the memory used per Ticket by slotted parameter objects with the
+per-instance ``__dict__`` objects they replaced, which set every parameter,
+UnsetParameter included, on each instance.
+
+Each count is measured in a forked child, as the growth of its resident set
+while building that many tickets from the same parsed parameters, so only
+the objects themselves are counted.
+
+Usage: PYTHONPATH=. python benchmarks/bench_memory.py
+'''
+
+import os
+import sys
+import time
+
+from lxml import etree
+
+from kayako.core.lib import UnsetParameter
+from kayako.objects import Ticket
+from kayako.tests.core.fixtures import tickets
+
+OBJECTS = 100000
+
+class LegacyTicket(object):
+    ''' A Ticket as built before slots: one attribute per parameter in ``__dict__``. '''
+
+    def __init__(self, api, **parameters):
+        for parameter in Ticket.__parameters__:
+            setattr(self, parameter, parameters.get(parameter, UnsetParameter))
+        self.api = api
+
+def resident():
+    ''' Return the resident set size of this process, in bytes. '''
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+def measure(build, parameters):
+    ''' Return the bytes per object used building ``OBJECTS`` objects, measured in a child. '''
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read)
+        before = resident()
+        objects = [build(parameters) for _ in xrange(OBJECTS)]
+        used = resident() - before
+        os.write(write, str(float(used) / len(objects)))
+        os._exit(0)
+    os.close(write)
+    result = os.read(read, 64)
+    os.waitpid(pid, 0)
+    return float(result)
+
+def timed(function, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    node = etree.fromstring(tickets([1])).find('ticket')
+    parameters = Ticket._parse_ticket(None, node)
+
+    legacy = LegacyTicket(None, **parameters)
+    slotted = Ticket._from_parameters(None, parameters)
+    print 'shallow size per ticket (object + __dict__)'
+    print '  __dict__ %6d bytes' % (sys.getsizeof(legacy) + sys.getsizeof(legacy.__dict__))
+    print '  slots    %6d bytes' % sys.getsizeof(slotted)
+
+    print 'resident memory per ticket, %d tickets' % OBJECTS
+    before = measure(lambda parameters: LegacyTicket(None, **parameters), parameters)
+    after = measure(lambda parameters: Ticket._from_parameters(None, parameters), parameters)
+    print '  __dict__ %8.1f bytes' % before
+    print '  slots    %8.1f bytes  (%.2fx)' % (after, before / after)
+
+    print 'construction time, %d tickets' % OBJECTS
+    legacy_time = timed(lambda: [LegacyTicket(None, **parameters) for _ in xrange(OBJECTS)])
+    checked_time = timed(lambda: [Ticket(None, **parameters) for _ in xrange(OBJECTS)])
+    trusted_time = timed(lambda: [Ticket._from_parameters(None, parameters) for _ in xrange(OBJECTS)])
+    print '  __dict__          %8.3fs' % legacy_time
+    print '  Ticket()          %8.3fs' % checked_time
+    print '  _from_parameters  %8.3fs' % trusted_time
+
+if __name__ == '__main__':
+    main()
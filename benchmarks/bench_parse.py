@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Compares the schema parser with the find() per field parser it replaced on
+a 10,000 ticket list response, and with lazy decoding or a field projection
+reading only the fields a typical list consumer uses.
+
+Usage: PYTHONPATH=. python benchmarks/bench_parse.py
+'''
+
+import time
+
+from lxml import etree
+
+from kayako.objects import Ticket, TicketNote, TicketPost, TicketTimeTrack
+from kayako.tests.core.fixtures import tickets
+
+TICKETS = 10000
+
+def legacy_parse_ticket_post(ticket_post_tree, ticket_id):
+    ''' The pre-schema TicketPost._parse_ticket_post. '''
+    cls = TicketPost
+    return dict(
+        id=cls._get_int(ticket_post_tree.find('id')),
+        ticketid=ticket_id,
+        contents=cls._get_string(ticket_post_tree.find('contents')),
+        userid=cls._get_int(ticket_post_tree.find('userid')),
+        staffid=cls._get_int(ticket_post_tree.find('staffid')),
+        dateline=cls._get_date(ticket_post_tree.find('dateline')),
+        fullname=cls._get_string(ticket_post_tree.find('fullname')),
+        email=cls._get_string(ticket_post_tree.find('email')),
+        emailto=cls._get_string(ticket_post_tree.find('emailto')),
+        ipaddress=cls._get_string(ticket_post_tree.find('ipaddress')),
+        hasattachments=cls._get_boolean(ticket_post_tree.find('hasattachments')),
+        creator=cls._get_int(ticket_post_tree.find('creator')),
+        isthirdparty=cls._get_boolean(ticket_post_tree.find('isthirdparty')),
+        ishtml=cls._get_boolean(ticket_post_tree.find('ishtml')),
+        isemailed=cls._get_boolean(ticket_post_tree.find('isemailed')),
+        issurveycomment=cls._get_boolean(ticket_post_tree.find('issurveycomment')),
+        isprivate=cls._get_boolean(ticket_post_tree.find('isprivate')),
+    )
+
+def legacy_parse_ticket(api, ticket_tree):
+    ''' The pre-schema Ticket._parse_ticket. '''
+    cls = Ticket
+    ticketid = cls._parse_int(ticket_tree.get('id'))
+
+    workflows = [dict(id=workflow_node.get('id'), title=workflow_node.get('title')) for workflow_node in ticket_tree.findall('workflow')]
+    watchers = [dict(staffid=watcher_node.get('staffid'), name=watcher_node.get('name')) for watcher_node in ticket_tree.findall('watcher')]
+    notes = [TicketNote(api, **TicketNote._parse_ticket_note(ticket_note_tree, ticketid)) for ticket_note_tree in ticket_tree.findall('note') if ticket_note_tree.get('type') == 'ticket']
+    timetracks = [TicketTimeTrack(api, **TicketTimeTrack._parse_ticket_time_track(ticket_time_track_tree, ticketid)) for ticket_time_track_tree in ticket_tree.findall('note') if
+                  ticket_time_track_tree.get('type') == 'timetrack']
+
+    posts = []
+    posts_node = ticket_tree.find('posts')
+    if posts_node is not None:
+        posts = [TicketPost(api, **legacy_parse_ticket_post(ticket_post_tree, ticketid)) for ticket_post_tree in posts_node.findall('post')]
+
+    return dict(
+        id=ticketid,
+        subject=cls._get_string(ticket_tree.find('subject')),
+        fullname=cls._get_string(ticket_tree.find('fullname')),
+        email=cls._get_string(ticket_tree.find('email')),
+        departmentid=cls._get_int(ticket_tree.find('departmentid')),
+        autouserid=cls._get_boolean(ticket_tree.find('autouserid'), required=False),
+        ticketstatusid=cls._get_int(ticket_tree.find('ticketstatusid'), required=False),
+        ticketpriorityid=cls._get_int(ticket_tree.find('priorityid')),
+        tickettypeid=cls._get_int(ticket_tree.find('tickettypeid'), required=False),
+        userid=cls._get_int(ticket_tree.find('userid')),
+        ownerstaffid=cls._get_int(ticket_tree.find('ownerstaffid')),
+        flagtype=cls._parse_int(ticket_tree.get('flagtype'), 'flagtype'),
+        displayid=cls._get_string(ticket_tree.find('displayid')),
+        statusid=cls._get_int(ticket_tree.find('statusid')),
+        typeid=cls._get_int(ticket_tree.find('typeid')),
+        userorganization=cls._get_string(ticket_tree.find('userorganization')),
+        userorganizationid=cls._get_int(ticket_tree.find('userorganizationid'), required=False),
+        ownerstaffname=cls._get_string(ticket_tree.find('ownerstaffname')),
+        lastreplier=cls._get_string(ticket_tree.find('lastreplier')),
+        creationtime=cls._get_date(ticket_tree.find('creationtime')),
+        lastactivity=cls._get_date(ticket_tree.find('lastactivity')),
+        laststaffreply=cls._get_date(ticket_tree.find('laststaffreply')),
+        lastuserreply=cls._get_date(ticket_tree.find('lastuserreply')),
+        slaplanid=cls._get_int(ticket_tree.find('slaplanid')),
+        nextreplydue=cls._get_date(ticket_tree.find('nextreplydue')),
+        resolutiondue=cls._get_date(ticket_tree.find('resolutiondue')),
+        replies=cls._get_int(ticket_tree.find('replies')),
+        ipaddress=cls._get_string(ticket_tree.find('ipaddress')),
+        creator=cls._get_int(ticket_tree.find('creator')),
+        creationmode=cls._get_int(ticket_tree.find('creationmode')),
+        creationtype=cls._get_int(ticket_tree.find('creationtype')),
+        isescalated=cls._get_boolean(ticket_tree.find('isescalated')),
+        escalationruleid=cls._get_int(ticket_tree.find('escalationruleid')),
+        tags=cls._get_string(ticket_tree.find('tags')),
+        templategroupname=cls._get_string(ticket_tree.find('templategroupname')),
+        watchers=watchers,
+        workflows=workflows,
+        notes=notes,
+        posts=posts,
+        timetracks=timetracks,
+    )
+
+LIST_FIELDS = ['id', 'subject', 'statusid', 'lastactivity']
+
+def read_list_fields(ticket):
+    return ticket.id, ticket.subject, ticket.statusid, ticket.lastactivity
+
+def timed(function, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    tree = etree.fromstring(tickets(range(1, TICKETS + 1)))
+    nodes = tree.findall('ticket')
+    legacy = timed(lambda: [Ticket(None, **legacy_parse_ticket(None, node)) for node in nodes])
+    schema = timed(lambda: [Ticket(None, **Ticket._parse_ticket(None, node)) for node in nodes])
+    print '%d tickets' % TICKETS
+    print 'find() per field %8.3fs' % legacy
+    print 'schema           %8.3fs  (%.2fx)' % (schema, legacy / schema)
+    lazy = timed(lambda: [read_list_fields(Ticket._lazy(None, node)) for node in nodes])
+    print 'lazy, 4 fields   %8.3fs  (%.2fx)' % (lazy, legacy / lazy)
+    projected = timed(lambda: [read_list_fields(Ticket._load(None, node, LIST_FIELDS)) for node in nodes])
+    print 'fields, 4 fields %8.3fs  (%.2fx)' % (projected, legacy / projected)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Compares page by page iteration of Ticket.iter_all with read-ahead
+iteration, against a fake server with a fixed per-page latency and a
+consumer spending a fixed time per ticket.
+
+Usage: PYTHONPATH=. python benchmarks/bench_prefetch.py
+'''
+
+import re
+import time
+import urllib
+
+from kayako.api import KayakoAPI
+from kayako.core.transport import InProcessTransport
+from kayako.objects import Ticket
+from kayako.tests.core.fixtures import tickets
+
+TOTAL = 2000
+PAGE_SIZE = 200
+LATENCY = 0.2
+''' Seconds the fake server takes per page. '''
+WORK = 0.001
+''' Seconds the consumer spends per ticket. '''
+
+def handler(method, url, body, headers):
+    controller = urllib.unquote(re.search(r'e=([^&]*)', url).group(1))
+    count, start = [int(number) for number in controller.rstrip('/').split('/')[-2:]]
+    time.sleep(LATENCY)
+    return tickets(range(start + 1, min(start + count, TOTAL) + 1))
+
+def export(prefetch):
+    api = KayakoAPI('http://localhost/api/index.php', 'key', 'secret', transport=InProcessTransport(handler))
+    start = time.time()
+    count = 0
+    for ticket in api.iter_all(Ticket, 1, page_size=PAGE_SIZE, prefetch=prefetch):
+        time.sleep(WORK)
+        count += 1
+    assert count == TOTAL
+    return time.time() - start
+
+def main():
+    import logging
+    logging.getLogger('kayako').setLevel(logging.WARNING)
+    print '%d tickets, %d per page, %.0fms per page, %.1fms per ticket' % (TOTAL, PAGE_SIZE, LATENCY * 1000, WORK * 1000)
+    for prefetch in (0, 1, 2):
+        print 'prefetch=%d %8.2fs' % (prefetch, export(prefetch))
+
+if __name__ == '__main__':
+    main()
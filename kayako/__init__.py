@@ -5,7 +5,9 @@
 # Distributed under the terms of the Lesser GNU General Public License (LGPL)
 #-----------------------------------------------------------------------------
 from kayako.api import KayakoAPI
-from kayako.core.lib import UnsetParameter, FOREVER
+from kayako.async_api import AsyncKayakoAPI
+from kayako.core.deadline import Deadline
+from kayako.core.lib import UnsetParameter, NotLoaded, FOREVER
 from kayako.objects import *
 
 __NAME__ = 'kayako'
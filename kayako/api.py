@@ -16,16 +16,27 @@ import hashlib
 import hmac
 import logging
 import random
+import threading
 import urllib
-import urllib2
 import time
+from contextlib import contextmanager
 from datetime import datetime
+from StringIO import StringIO
+from multiprocessing.pool import ThreadPool
 
 from lxml import etree
 
-from kayako.exception import KayakoRequestError, KayakoResponseError, KayakoInitializationError
-from kayako.core.lib import FOREVER
-from kayako.objects.ticket import Ticket
+from kayako.exception import KayakoIOError, KayakoRequestError, KayakoResponseError, KayakoInitializationError, KayakoDeadlineExceededError
+from kayako.core.compression import ACCEPT_ENCODING, decode_response
+from kayako.core.crawl import CrawlShard, TicketCrawl
+from kayako.core.deadline import Deadline, DeadlineResponse
+from kayako.core.form import IterReader, StreamedValue, default_encoder
+from kayako.core.lib import FOREVER, BatchResult, LazyList
+from kayako.core.retry import RetryPolicy
+from kayako.core.singleflight import SingleFlight
+from kayako.core.transport import PooledTransport, UrllibTransport
+from kayako.objects.department import Department
+from kayako.objects.ticket import Ticket, TicketCount
 from kayako.objects.user import User
 
 log = logging.getLogger('kayako')
@@ -270,6 +281,31 @@ class KayakoAPI(object):
             ``api.get(TicketNote, ticketid, ticketnoteid)``
                 Return a ``TicketNote`` for a ticket with the given ``Ticket`` ID and
                 ``TicketNote`` ID.
+    
+    ``api.get_many(Object, ids, workers=10)``
+    
+        *Get many ``KayakoObjects`` of the given type concurrently.*
+        
+        Composite IDs are given as tuples. Results are in the order of ``ids``;
+        missing objects are ``None`` and per-item errors are collected in
+        ``result.errors`` instead of aborting the batch.
+        
+        e.x. ::
+    
+            >>> tickets = api.get_many(Ticket, [1, 2, 3], workers=8)
+            >>> posts = api.get_many(TicketPost, [(1, 10), (1, 11)])
+            >>> posts.errors
+            {}
+
+    ``KayakoAPI(..., cache=EntityCache({Department: 3600, TicketStatus: 3600}))``
+
+        *Keep the objects of some classes returned by ``get`` and ``get_many``.*
+
+        Objects are kept for the seconds given for their class, up to
+        ``size`` objects, and optionally returned for ``stale`` more seconds
+        while they are fetched again in the background. Saving or deleting
+        an object removes it. ``api.cache.hits`` and ``api.cache.misses``
+        count the lookups.
                 
     **Object persistence methods**
     
@@ -338,10 +374,75 @@ class KayakoAPI(object):
     ================= ====================================================================== ========================= ======= ======= =====================
     '''
 
-    def __init__(self, api_url, api_key, secret_key):
+    STREAM_THRESHOLD = 1048576
+    ''' POST/PUT bodies larger than this many bytes are streamed. '''
+
+    READ_CHUNK_SIZE = 65536
+    ''' Bytes read at a time between deadline checks. '''
+
+    def __init__(self, api_url, api_key, secret_key, pool_size=10, pool_idle_timeout=60, retry_policy=None, rate_limiter=None, compress=True, transport=None, single_flight=False, circuit_breaker=None, connect_timeout=10, read_timeout=60, lazy=False, epoch_dates=False, cache=None):
         ''' 
         Creates a new wrapper that will make requests to the given URL using
         the authentication provided.
+
+        Requests are sent over persistent keep-alive connections shared by
+        every object created from this API. ``pool_size`` is the number of
+        idle connections kept per host and ``pool_idle_timeout`` the number
+        of seconds an idle connection is kept. A ``pool_size`` of 0 opens a
+        new connection with ``urllib2`` for every request.
+
+        ``connect_timeout`` and ``read_timeout`` are the seconds to wait for a
+        connection to be established and for each read from it. None waits
+        forever. Deadlines (see ``deadline``) shorten both when needed.
+
+        ``transport`` replaces the default transport entirely, for example
+        with an ``InProcessTransport`` dispatching requests to a Python
+        callable; ``pool_size`` and ``pool_idle_timeout`` are then ignored.
+        See ``kayako.core.transport``.
+
+        ``retry_policy`` is a ``RetryPolicy`` deciding which failed requests
+        are retried. By default GET requests are retried up to 3 times on
+        connection errors and HTTP 5xx responses, with jittered exponential
+        backoff. Use ``kayako.core.retry.NO_RETRY`` to disable retries.
+
+        ``rate_limiter`` is an optional ``RateLimiter``; every request
+        attempt waits for a token from it. One limiter can be shared by
+        several APIs talking to the same host.
+
+        ``circuit_breaker`` is an optional ``CircuitBreaker``. Requests to a
+        controller that keeps failing then raise ``KayakoCircuitOpenError``
+        at once instead of waiting for the server. Like a rate limiter it can
+        be shared by several APIs.
+
+        If ``compress`` is True, gzip or deflate compressed responses are
+        requested and decompressed incrementally while they are parsed.
+        The ``compressed_bytes`` and ``decompressed_bytes`` of the returned
+        response are logged when it has been read.
+
+        If ``single_flight`` is True, identical GET requests made at the same
+        time from several threads share one request: the first one is sent
+        and its body is handed to every waiting caller. POST, PUT and DELETE
+        requests are always sent. A shared body is read whole before it is
+        parsed, which gives up incremental decompression and parsing, so
+        this is off by default and best kept for APIs making many small,
+        identical GETs.
+
+        If ``lazy`` is True, tickets, ticket posts, users, departments and
+        staff returned by ``get``, ``get_all`` and the searches keep their
+        XML element and decode each field the first time it is read, so that
+        only the fields used are decoded. Streamed results are always decoded
+        at once.
+
+        If ``epoch_dates`` is True, the dates of those objects are kept as
+        integer timestamps (``FOREVER`` for 0) instead of being converted to
+        local datetimes, which is most of the cost of parsing them. Convert
+        them when needed with ``kayako.core.lib.fromtimestamps``.
+
+        ``cache`` is an optional ``EntityCache`` keeping the objects of the
+        classes it lists that are returned by ``get`` and ``get_many``, so
+        that reference objects such as departments and ticket statuses are
+        not fetched again for every use. Objects saved or deleted through
+        this API are removed from it. See ``kayako.core.cache``.
         '''
 
         if not api_url:
@@ -356,6 +457,72 @@ class KayakoAPI(object):
             raise KayakoInitializationError('Secret Key not specified.')
         self.api_key = api_key
 
+        if transport is not None:
+            self.transport = transport
+        elif pool_size:
+            self.transport = PooledTransport(maxsize=pool_size, idle_timeout=pool_idle_timeout)
+        else:
+            self.transport = UrllibTransport()
+
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_budget = self.retry_policy.create_budget()
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.compress = compress
+        self.single_flight = SingleFlight() if single_flight else None
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.lazy = lazy
+        self.epoch_dates = epoch_dates
+        self.cache = cache
+        self._local = threading.local()
+
+    def close(self):
+        '''
+        Close any idle pooled connections held by this API's transport.
+        '''
+        self.transport.close()
+
+    @contextmanager
+    def deadline(self, deadline):
+        '''
+        Limit every request made by the current thread within the block to a
+        ``Deadline`` or a number of seconds. Nested deadlines can only make the
+        limit earlier::
+
+            >>> with api.deadline(30):
+            ...     tickets = api.get_all(Ticket, departmentid)
+            ...     users = [api.get(User, ticket.userid) for ticket in tickets]
+
+        Requests raise ``KayakoDeadlineExceededError`` once the deadline has
+        passed, and their socket timeouts are cut to the time remaining. The
+        methods of this API also accept a ``deadline`` keyword argument.
+        '''
+        previous = self._current_deadline()
+        current = Deadline.earliest(previous, Deadline.coerce(deadline))
+        self._local.deadline = current
+        try:
+            yield current
+        finally:
+            self._local.deadline = previous
+
+    def _current_deadline(self):
+        ''' Return the Deadline of the current thread, or None. '''
+        return getattr(self._local, 'deadline', None)
+
+    def _bind_deadline(self, function):
+        '''
+        Return a wrapper calling ``function`` under the deadline of the
+        current thread, for functions that may run on other threads.
+        '''
+        deadline = self._current_deadline()
+
+        def bound(*args, **kwargs):
+            with self.deadline(deadline):
+                return function(*args, **kwargs)
+
+        return bound
+
     ## { Communication Layer
 
     def _sanitize_parameter(self, parameter):
@@ -365,7 +532,7 @@ class KayakoAPI(object):
         - Convert None types to empty strings
         - Convert FOREVER to '0'
         - Convert lists/tuples into sanitized lists
-        - Convert objects to strings
+        - Convert objects to strings, except StreamedValues
         '''
 
         if parameter is None:
@@ -380,6 +547,8 @@ class KayakoAPI(object):
             return str(int(time.mktime(parameter.timetuple())))
         elif isinstance(parameter, (list, tuple, set)):
             return [self._sanitize_parameter(item) for item in parameter if item not in ['', None]]
+        elif isinstance(parameter, StreamedValue):
+            return parameter
         else:
             return str(parameter)
 
@@ -396,29 +565,7 @@ class KayakoAPI(object):
         '''
         Turns parameters into application/x-www-form-urlencoded format.
         '''
-        data = None
-        first = True
-        for key, value in parameters.iteritems():
-            if isinstance(value, list):
-                if len(value):
-                    for sub_value in value:
-                        if first:
-                            data = '%s[]=%s' % (key, urllib2.quote(sub_value))
-                            first = False
-                        else:
-                            data = '%s&%s[]=%s' % (data, key, urllib2.quote(sub_value))
-                else:
-                    if first:
-                        data = '%s[]=' % key
-                        first = False
-                    else:
-                        data = '%s&%s[]=' % (data, key)
-            elif first:
-                data = '%s=%s' % (key, urllib2.quote(value))
-                first = False
-            else:
-                data = '%s&%s=%s' % (data, key, urllib2.quote(value))
-        return data
+        return default_encoder.encode(parameters)
 
     def _generate_signature(self):
         '''
@@ -432,52 +579,173 @@ class KayakoAPI(object):
         b64_encoded_signature = base64.b64encode(encrypted_signature)
         return salt, b64_encoded_signature
 
-    def _request(self, controller, method, **parameters):
+    def _request(self, controller, method, _encoder=None, _stream=False, **parameters):
         '''
         Get a response from the specified controller using the given parameters.
+
+        ``_encoder`` is an optional ``FormEncoder`` with a precomputed parameter
+        order, see ``KayakoObject._form_encoder``.
+
+        Failed requests are retried as allowed by ``self.retry_policy`` and
+        ``self.retry_budget``. Every attempt is signed with a new salt.
+
+        Concurrent GET requests for the same controller and query are sent
+        once when ``self.single_flight`` is set; each caller gets its own
+        file-like copy of the body. Pass ``_stream=True`` to get the response
+        itself instead, for bodies too large to be read into memory.
+
+        The request, including reading its response body, is limited by the
+        deadline of the current thread, see ``deadline``.
         '''
 
         log.info('REQUEST: %s %s' % (controller, method))
 
+        deadline = self._current_deadline()
+        if deadline is not None:
+            deadline.check('%s %s' % (method, controller))
+
+        if method == 'GET' and self.single_flight is not None and not _stream:
+            key = (controller, default_encoder.encode(self._sanitize_parameters(**parameters)))
+            while True:
+                try:
+                    return StringIO(self.single_flight.do(key, self._read_request, (controller, method, _encoder, parameters), deadline.remaining() if deadline is not None else None))
+                except KayakoDeadlineExceededError:
+                    # The shared request may have failed on another caller's
+                    # deadline; try again while this one has time left
+                    if deadline is not None and deadline.expired():
+                        raise
+        return self._limit_response(self._request_with_retries(controller, method, _encoder, parameters), controller, method)
+
+    def _limit_response(self, response, controller, method):
+        '''
+        Wrap a response in a ``DeadlineResponse`` checking the deadline of the
+        current thread while its body is read, if there is one.
+        '''
+        deadline = self._current_deadline()
+        if deadline is None:
+            return response
+        return DeadlineResponse(response, deadline, '%s %s' % (method, controller), self.READ_CHUNK_SIZE)
+
+    def _read_request(self, controller, method, encoder, parameters):
+        '''
+        Send a request and read its whole response body, checking the
+        deadline between chunks.
+        '''
+        response = self._limit_response(self._request_with_retries(controller, method, encoder, parameters), controller, method)
+        try:
+            return response.read()
+        finally:
+            response.close()
+
+    def _request_with_retries(self, controller, method, encoder, parameters):
+        '''
+        Send a request, retrying failed attempts and recording the outcome of
+        each attempt in the circuit breaker.
+        '''
+        deadline = self._current_deadline()
+        operation = '%s %s' % (method, controller)
+        circuit = self.circuit_breaker.circuit_for(controller) if self.circuit_breaker is not None else None
+        self.retry_budget.record_request()
+        attempt = 1
+        while True:
+            if deadline is not None:
+                deadline.check(operation)
+            if self.rate_limiter is not None:
+                if not self.rate_limiter.acquire(controller, timeout=deadline.remaining() if deadline is not None else None):
+                    raise KayakoDeadlineExceededError('%s exceeded its deadline waiting for the rate limiter' % operation)
+            # Only take a half-open trial once the request is about to be sent
+            trial = circuit is not None and circuit.before_request()
+            try:
+                response = self._send_request(controller, method, parameters, encoder or default_encoder)
+                if circuit is not None:
+                    trial = False
+                    circuit.record_success()
+                return response
+            except KayakoIOError, error:
+                if circuit is not None:
+                    trial = False
+                    if self.circuit_breaker.is_failure(error):
+                        circuit.record_failure()
+                    else:
+                        circuit.record_success()
+                if deadline is not None:
+                    # e.g. a socket timeout cut short by the deadline
+                    deadline.check(operation)
+                if not self.retry_policy.should_retry(method, error, attempt) or not self.retry_budget.withdraw():
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                if deadline is not None and delay >= deadline.remaining():
+                    raise
+                log.warning('RETRY: %s %s in %.2fs (attempt %s of %s)' % (controller, method, delay, attempt + 1, self.retry_policy.max_attempts))
+                time.sleep(delay)
+                attempt += 1
+            finally:
+                # Any other error leaves the trial without an outcome
+                if trial:
+                    circuit.release()
+
+    def _send_request(self, controller, method, parameters, encoder=default_encoder):
+        '''
+        Sign and send a single request attempt over ``self.transport``.
+
+        POST and PUT bodies longer than ``STREAM_THRESHOLD`` are encoded while
+        they are sent instead of being built in memory first.
+        '''
+
         salt, b64signature = self._generate_signature()
 
         if method == 'GET':
             url = '%s?e=%s&apikey=%s&salt=%s&signature=%s' % (self.api_url, urllib.quote(controller), urllib.quote(self.api_key), salt, urllib.quote(b64signature))
             # Append additional query args if necessary
-            data = self._post_data(**self._sanitize_parameters(**parameters)) if parameters else None
+            data = encoder.encode(self._sanitize_parameters(**parameters)) if parameters else None
             if data:
                 url = '%s&%s' % (url, data)
-            request = urllib2.Request(url)
         elif method == 'POST' or method == 'PUT':
             url = '%s?e=%s' % (self.api_url, urllib.quote(controller))
             # Auth parameters go in the body for these methods
             parameters['apikey'] = self.api_key
             parameters['salt'] = salt
             parameters['signature'] = b64signature
-            data = self._post_data(**self._sanitize_parameters(**parameters))
-            request = urllib2.Request(url, data=data, headers={'Content-length' : len(data) if data else 0})
-            request.get_method = lambda: method
+            sanitized = self._sanitize_parameters(**parameters)
+            length = encoder.content_length(sanitized)
+            if length > self.STREAM_THRESHOLD:
+                data = IterReader(encoder.iter_encode(sanitized), length)
+            else:
+                data = encoder.encode(sanitized)
         elif method == 'DELETE': # DELETE
             url = '%s?e=%s&apikey=%s&salt=%s&signature=%s' % (self.api_url, urllib.quote(controller), urllib.quote(self.api_key), salt, urllib.quote(b64signature))
-            data = self._post_data(**self._sanitize_parameters(**parameters))
-            request = urllib2.Request(url, data=data, headers={'Content-length' : len(data) if data else 0})
-            request.get_method = lambda: method
+            data = encoder.encode(self._sanitize_parameters(**parameters))
         else:
             raise KayakoRequestError('Invalid request method: %s not supported.' % method)
 
+        timeout = (self.connect_timeout, self.read_timeout)
+        deadline = self._current_deadline()
+        if deadline is not None:
+            # Never 0, which would make the socket non-blocking
+            remaining = max(deadline.remaining(), 0.001)
+            timeout = tuple(remaining if value is None else min(value, remaining) for value in timeout)
+
+        headers = {}
+        if method != 'GET':
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['Content-Length'] = str(len(data) if data else 0)
+        if self.compress:
+            headers['Accept-Encoding'] = ACCEPT_ENCODING
+
         log.debug('REQUEST URL: %s' % url)
-        log.debug('REQUEST DATA: %s' % data)
+        log.debug('REQUEST DATA: %s' % (data if not isinstance(data, IterReader) else '<%s bytes streamed>' % len(data)))
 
         try:
-            response = urllib2.urlopen(request)
-        except urllib2.HTTPError, error:
-            response_error = KayakoResponseError('%s: %s' % (error, error.read()))
+            response = decode_response(self.transport.send(method, url, data if method != 'GET' else None, headers, timeout))
+        except KayakoRequestError, error:
+            log.error(error)
+            raise
+        if not 200 <= response.code < 300:
+            # Same message format as urllib2.HTTPError so callers can look for 'HTTP Error 404'
+            response_error = KayakoResponseError('HTTP Error %s: %s: %s' % (response.code, response.msg, response.read()))
+            response_error.code = response.code
             log.error(response_error)
             raise response_error
-        except urllib2.URLError, error:
-            request_error = KayakoRequestError(error)
-            log.error(request_error)
-            raise request_error
         return response
 
     ## { Persistence Layer
@@ -513,9 +781,50 @@ class KayakoAPI(object):
                 
             api.get_all(TicketPost, ticketid)
                 Return all TicketPosts for a Ticket with the given ID.
+
+        A ``deadline`` keyword argument (a ``Deadline`` or a number of seconds)
+        limits every request made, see ``deadline``.
+
+        Tickets and Users also accept ``stream=True``, returning a generator
+        that yields each object as soon as it is parsed from the response.
+
+        ``fields`` limits the objects returned to a list of fields, plus
+        ``id``::
+
+            >>> api.get_all(Ticket, 1, fields=['subject', 'lastactivity'])
+
+        Such objects are partial: fields that were not loaded read as
+        ``NotLoaded`` and are left out of ``parameters``. Tickets, ticket
+        posts, users, departments and staff only parse the fields asked for,
+        and tickets only build the posts, notes and time tracks asked for;
+        other objects are parsed whole and then trimmed.
                 
         '''
-        return object.get_all(self, *args, **kwargs)
+        fields = kwargs.pop('fields', None)
+        with self.deadline(kwargs.pop('deadline', None)):
+            if fields is None:
+                return object.get_all(self, *args, **kwargs)
+            if object.__schema__ is not None:
+                return object.get_all(self, *args, fields=fields, **kwargs)
+            return [result._project(fields) for result in object.get_all(self, *args, **kwargs)]
+
+    def iter_all(self, object, *args, **kwargs):
+        '''
+        Iterate over all Kayako Objects of a paginated type, requesting one
+        page at a time as the objects are consumed.
+
+        e.x.
+            >>> for ticket in api.iter_all(Ticket, departmentid, page_size=500):
+            ...     print ticket
+
+        Supported by Ticket, User (from a ``marker`` User ID),
+        KnowledgebaseArticle, KnowledgebaseCategory and NewsCategory. Offset
+        paginated types resume from a ``start`` offset.
+
+        Pass ``prefetch=N`` to fetch up to N pages ahead on a background thread
+        while the current page is consumed, for large exports.
+        '''
+        return object.iter_all(self, *args, **kwargs)
 
     def _match_filter(self, object, **filter):
         '''
@@ -524,13 +833,22 @@ class KayakoAPI(object):
         '''
         for key, value in filter.iteritems():
             attr = getattr(object, key)
-            if isinstance(attr, list):
+            if isinstance(attr, (list, LazyList)):
                 if value not in attr:
                     return False
             elif attr != value:
                 return False
         return True
 
+    def _filter_fields(self, filter):
+        '''
+        Pop the ``fields`` of a filter, adding the attributes it matches.
+        '''
+        fields = filter.pop('fields', None)
+        if fields is not None:
+            fields = list(fields) + filter.keys()
+        return fields
+
     def filter(self, object, args=(), kwargs={}, **filter):
         '''
         Gets all KayakoObjects matching a filter.
@@ -538,8 +856,11 @@ class KayakoAPI(object):
         e.x.
             >>> api.filter(Department, args=(2), module='tickets')
             [<Department module='tickets'...>, <Department module='tickets'...>, ...]
+
+        Accepts a ``deadline`` and ``fields`` like ``get_all``. The fields
+        filtered on are always loaded.
         '''
-        objects = self.get_all(object, *args, **kwargs)
+        objects = self.get_all(object, deadline=filter.pop('deadline', None), fields=self._filter_fields(filter), *args, **kwargs)
         results = []
         for result in objects:
             if self._match_filter(result, **filter):
@@ -553,13 +874,16 @@ class KayakoAPI(object):
         e.x.
             >>> api.filter(Department, args=(2), module='tickets')
             <Department module='tickets'>
+
+        Accepts a ``deadline`` and ``fields`` like ``get_all``. The fields
+        filtered on are always loaded.
         '''
-        objects = self.get_all(object, *args, **kwargs)
+        objects = self.get_all(object, deadline=filter.pop('deadline', None), fields=self._filter_fields(filter), *args, **kwargs)
         for result in objects:
             if self._match_filter(result, **filter):
                 return result
 
-    def get(self, object, *args):
+    def get(self, object, *args, **kwargs):
         '''
         Get a Kayako Object of the given type by ID.
         
@@ -581,13 +905,178 @@ class KayakoAPI(object):
             api.get(TicketNote, ticketid, ticketnoteid)
                 Return a TicketNote for a ticket with the given Ticket ID and
                 TicketNote ID.
+
+        Accepts a ``deadline`` like ``get_all``.
+
+        With a ``cache``, objects of the classes it lists are returned from
+        it while they have not expired.
         
         '''
 
 
-        return object.get(self, *args)
+        with self.deadline(kwargs.pop('deadline', None)):
+            return self._get(object, args, kwargs)
+
+    def _get(self, object, args, kwargs={}):
+        '''
+        Get an object, through the cache for classes it lists that are
+        fetched by a single ID.
+        '''
+        if self.cache is None or kwargs or len(args) != 1 or not self.cache.caches(object):
+            return object.get(self, *args, **kwargs)
+        return self.cache.get(object, args[0], lambda: object.get(self, *args))
+
+    def _invalidate(self, object):
+        '''
+        Remove an object being saved or deleted from the cache.
+        '''
+        if self.cache is not None:
+            self.cache.invalidate(type(object), object.id)
+
+    def get_many(self, object, ids, workers=10, deadline=None):
+        '''
+        Get many Kayako Objects of the given type by ID, using up to
+        ``workers`` concurrent requests.
+
+        Each item of ``ids`` is an ID, or a tuple of arguments for
+        ``object.get`` for objects with composite IDs.
+
+        e.x.
+            >>> api.get_many(Ticket, [1, 2, 3])
+            [<Ticket (1)...>, None, <Ticket (3)...>]
+            >>> api.get_many(TicketPost, [(ticketid, 10), (ticketid, 11)])
+            [<TicketPost (10)...>, <TicketPost (11)...>]
+
+        Returns a ``BatchResult``, a list in the same order as ``ids``. Objects
+        that do not exist are ``None``. Items that fail with any other error
+        are also ``None``, and the error is recorded in ``result.errors``
+        keyed by the item's ID.
+
+        ``deadline`` limits the whole batch; items not fetched in time fail
+        with ``KayakoDeadlineExceededError`` without being requested.
+        '''
+        keys = [tuple(key) if isinstance(key, (list, tuple)) else key for key in ids]
+        result = BatchResult()
+        if not keys:
+            return result
+
+        # Worker threads do not inherit this thread's deadline
+        deadline = Deadline.earliest(self._current_deadline(), Deadline.coerce(deadline))
+
+        def fetch(key):
+            args = key if isinstance(key, tuple) else (key,)
+            try:
+                with self.deadline(deadline):
+                    return self._get(object, args), None
+            except KayakoResponseError, error:
+                if 'HTTP Error 404' in str(error):
+                    return None, None
+                return None, error
+            except Exception, error:
+                return None, error
+
+        workers = ThreadPool(max(1, min(workers, len(keys))))
+        try:
+            outcomes = workers.map(fetch, keys)
+        finally:
+            workers.close()
+            workers.join()
+
+        for key, (item, error) in zip(keys, outcomes):
+            result.append(item)
+            if error is not None:
+                log.error('GET MANY %s %s: %s' % (object.__name__, key, error))
+                result.errors[key] = error
+        return result
+
+    def get_all_tickets(self, departments=None, statuses=None, staff=None, page_size=1000, workers=10, deadline=None):
+        '''
+        Get all Tickets in the given departments, ticket statuses and owner
+        staff ids (all departments by default) in one round of up to
+        ``workers`` concurrent requests.
+
+        The pages to request are planned from the ticket counts, see
+        ``TicketCount.plan_pages``. Counts can change while the pages are
+        requested: a last planned page that comes back full is followed by
+        the next ones, and tickets listed twice are returned once.
+
+        e.x.
+            >>> api.get_all_tickets(departments=[1, 2], statuses=[1])
+            [<Ticket (1)...>, <Ticket (2)...>, ...]
+
+        Returns a ``BatchResult`` of Tickets in plan order. Pages that fail
+        are recorded in ``result.errors``, keyed by their
+        ``(departmentid, ticketstatusid, ownerstaffid, start)`` arguments,
+        along with any tickets read before the error.
+
+        ``deadline`` limits the whole operation, as for ``get_many``.
+        '''
+        with self.deadline(deadline) as deadline:
+            counts = TicketCount.get_all(self)
+        pages = counts.plan_pages(page_size, departments, statuses, staff)
+        result = BatchResult()
+        if not pages:
+            return result
+        planned = set(pages)
+
+        def fetch(page):
+            departmentid, ticketstatusid, ownerstaffid, start = page
+            tickets = []
+            try:
+                with self.deadline(deadline):
+                    while True:
+                        received = Ticket.get_all(self, departmentid, ticketstatusid, ownerstaffid, count=page_size, start=start)
+                        tickets.extend(received)
+                        start += page_size
+                        if len(received) < page_size or (departmentid, ticketstatusid, ownerstaffid, start) in planned:
+                            return tickets, None
+            except Exception, error:
+                return tickets, error
+
+        workers = ThreadPool(max(1, min(workers, len(pages))))
+        try:
+            outcomes = workers.map(fetch, pages)
+        finally:
+            workers.close()
+            workers.join()
+
+        seen = set()
+        for page, (tickets, error) in zip(pages, outcomes):
+            for ticket in tickets:
+                if ticket.id not in seen:
+                    seen.add(ticket.id)
+                    result.append(ticket)
+            if error is not None:
+                log.error('GET ALL TICKETS %s: %s' % (page, error))
+                result.errors[page] = error
+        return result
+
+    def crawl_tickets(self, departments=None, statuses=None, workers=10, page_size=1000, progress=None, deadline=None):
+        '''
+        Crawl the Tickets of the given departments, by default every
+        Department whose ``module`` is 'tickets', crawling up to ``workers``
+        departments concurrently and yielding tickets as their pages arrive.
+
+        e.x.
+            >>> crawl = api.crawl_tickets(workers=20)
+            >>> for ticket in crawl:
+            ...     print ticket
+            >>> crawl.errors
+            {}
+
+        Given a list of ticket ``statuses``, each department is split into a
+        shard per status. Returns a ``TicketCrawl``, whose ``shards`` report the
+        pages and tickets received per shard and its ``errors`` the shards that
+        failed; pass ``progress`` to be called with a ``CrawlShard`` after each
+        of its pages. ``deadline`` limits the whole crawl.
+        '''
+        with self.deadline(deadline) as deadline:
+            if departments is None:
+                departments = [department.id for department in self.get_all(Department) if department.module == 'tickets']
+        shards = [CrawlShard(departmentid, ticketstatusid) for departmentid in departments for ticketstatusid in statuses or [-1]]
+        return TicketCrawl(self, shards, workers=workers, page_size=page_size, progress=progress, deadline=deadline)
 
-    def ticket_search(self, query, ticketid=False, contents=False, author=False, email=False, creatoremail=False, fullname=False, notes=False, usergroup=False, userorganization=False, user=False, tags=False):
+    def ticket_search(self, query, ticketid=False, contents=False, author=False, email=False, creatoremail=False, fullname=False, notes=False, usergroup=False, userorganization=False, user=False, tags=False, deadline=None, stream=False, fields=None):
         ''' Search tickets in certain parameters for a given query.
         query               The Search Query
         ticketid=False      If True, then search the Ticket ID & Mask ID
@@ -601,19 +1090,29 @@ class KayakoAPI(object):
         userorganization=False  If True, then search the User Organization
         user=False          If True, then search the User (Full Name, Email)
         tags=False          If True, then search the Ticket Tags
+        deadline=None       A Deadline or a number of seconds limiting the search
+        stream=False        If True, return a generator yielding each Ticket as soon as it is parsed
+        fields=None         If given, only parse these fields of the Tickets, see ``get_all``
         '''
-        response = self._request('/Tickets/TicketSearch', 'POST', query=query, ticketid=ticketid, contents=contents, author=author, email=email, creatoremail=creatoremail, fullname=fullname, notes=notes, usergroup=usergroup, userorganization=userorganization, user=user, tags=tags)
-        ticket_xml = etree.parse(response)
-        return [Ticket(self, **Ticket._parse_ticket(self, ticket_tree)) for ticket_tree in ticket_xml.findall('ticket')]
+        with self.deadline(deadline):
+            response = self._request('/Tickets/TicketSearch', 'POST', query=query, ticketid=ticketid, contents=contents, author=author, email=email, creatoremail=creatoremail, fullname=fullname, notes=notes, usergroup=usergroup, userorganization=userorganization, user=user, tags=tags)
+            if stream:
+                return Ticket._iter_tickets(self, response, fields)
+            ticket_xml = etree.parse(response)
+            return [Ticket._load(self, ticket_tree, fields) for ticket_tree in ticket_xml.findall('ticket')]
 
-    def user_search(self, query):
-	    response = self._request('/Base/UserSearch', 'POST', query=query)
-	    user_xml = etree.parse(response)
-	    return [User(self, **User._parse_user(user_tree)) for user_tree in user_xml.findall('user')]
+    def user_search(self, query, deadline=None, stream=False, fields=None):
+	    ''' Search users for a given query. ``deadline``, ``stream`` and ``fields`` are as for ``ticket_search``. '''
+	    with self.deadline(deadline):
+	        response = self._request('/Base/UserSearch', 'POST', query=query)
+	        if stream:
+	            return User._iter_users(self, response, fields)
+	        user_xml = etree.parse(response)
+	        return [User._load(self, user_tree, fields) for user_tree in user_xml.findall('user')]
 
-    def ticket_search_full(self, query):
+    def ticket_search_full(self, query, deadline=None, stream=False, fields=None):
         ''' Shorthand for ticket_search(query, ticketid=True, contents=True, author=True, email=True, creatoremail=True, fullname=True, notes=True, usergroup=True, userorganization=True, user=True, tags=True) '''
-        return self.ticket_search(query, ticketid=True, contents=True, author=True, email=True, creatoremail=True, fullname=True, notes=True, usergroup=True, userorganization=True, user=True, tags=True)
+        return self.ticket_search(query, ticketid=True, contents=True, author=True, email=True, creatoremail=True, fullname=True, notes=True, usergroup=True, userorganization=True, user=True, tags=True, deadline=deadline, stream=stream, fields=fields)
 
     def __str__(self):
         return '<KayakoAPI: %s>' % self.api_url
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Non-blocking front end for KayakoAPI.
+'''
+
+from multiprocessing.pool import ThreadPool
+
+from kayako.api import KayakoAPI
+from kayako.core.deadline import Deadline
+
+__all__ = [
+    'AsyncKayakoAPI',
+]
+
+class AsyncKayakoAPI(object):
+    '''
+    Non-blocking wrapper around ``KayakoAPI``.
+
+    Every call is dispatched to a bounded pool of worker threads sharing one
+    ``KayakoAPI`` (and therefore one keep-alive connection pool), and
+    immediately returns an ``AsyncResult``. Call ``result.get(timeout)`` to
+    wait for the value, ``result.ready()`` to poll it, or pass
+    ``callback=function`` to be called with the value when it is available.
+    Exceptions raised by the request are re-raised by ``result.get()``.
+
+    Requests are signed and responses parsed exactly as ``KayakoAPI`` does.
+
+    **Usage:**
+
+        >>> from kayako import AsyncKayakoAPI, Department, Ticket
+        >>> api = AsyncKayakoAPI(API_URL, API_KEY, SECRET_KEY, workers=20)
+        >>> departments = api.filter(Department, module='tickets')
+        >>> pending = [api.get_all(Ticket, dept.id) for dept in departments.get()]
+        >>> tickets = [ticket for result in pending for ticket in result.get()]
+        >>> ticket = tickets[0]
+        >>> ticket.subject = 'Updated'
+        >>> api.save(ticket).get()
+        >>> api.close()
+    '''
+
+    def __init__(self, api_url, api_key, secret_key, workers=10, **options):
+        '''
+        Creates a wrapper running at most ``workers`` requests at a time.
+        Other keyword arguments are passed to ``KayakoAPI``; unless given,
+        ``pool_size`` defaults to ``workers`` so each worker can keep its
+        connection alive.
+        '''
+        options.setdefault('pool_size', workers)
+        self.api = KayakoAPI(api_url, api_key, secret_key, **options)
+        self.workers = workers
+        self._workers = ThreadPool(workers)
+
+    def _submit(self, function, args=(), kwargs=None, callback=None):
+        kwargs = kwargs or {}
+        if kwargs.get('deadline') is not None:
+            # Start the clock now rather than when a worker picks the call up
+            kwargs['deadline'] = Deadline.coerce(kwargs['deadline'])
+        return self._workers.apply_async(function, args, kwargs, callback)
+
+    def close(self):
+        '''
+        Wait for outstanding requests, then stop the workers and close pooled
+        connections.
+        '''
+        self._workers.close()
+        self._workers.join()
+        self.api.close()
+
+    ## { Persistence Layer
+
+    def create(self, object, *args, **kwargs):
+        '''
+        Create a new KayakoObject of the type given. Objects are bound to the
+        underlying blocking ``KayakoAPI``; use ``add``, ``save`` and ``delete``
+        on this API to persist them without blocking.
+        '''
+        return self.api.create(object, *args, **kwargs)
+
+    def get_all(self, object, *args, **kwargs):
+        ''' Non-blocking ``KayakoAPI.get_all``. '''
+        callback = kwargs.pop('callback', None)
+        return self._submit(self.api.get_all, (object,) + args, kwargs, callback)
+
+    def filter(self, object, args=(), kwargs={}, callback=None, **filter):
+        ''' Non-blocking ``KayakoAPI.filter``. '''
+        return self._submit(self.api.filter, (object, args, kwargs), filter, callback)
+
+    def first(self, object, args=(), kwargs={}, callback=None, **filter):
+        ''' Non-blocking ``KayakoAPI.first``. '''
+        return self._submit(self.api.first, (object, args, kwargs), filter, callback)
+
+    def get(self, object, *args, **kwargs):
+        ''' Non-blocking ``KayakoAPI.get``. '''
+        callback = kwargs.pop('callback', None)
+        return self._submit(self.api.get, (object,) + args, kwargs, callback)
+
+    def ticket_search(self, query, callback=None, **fields):
+        ''' Non-blocking ``KayakoAPI.ticket_search``. '''
+        return self._submit(self.api.ticket_search, (query,), fields, callback)
+
+    def ticket_search_full(self, query, callback=None, **kwargs):
+        ''' Non-blocking ``KayakoAPI.ticket_search_full``. '''
+        return self._submit(self.api.ticket_search_full, (query,), kwargs, callback)
+
+    def user_search(self, query, callback=None, **kwargs):
+        ''' Non-blocking ``KayakoAPI.user_search``. '''
+        return self._submit(self.api.user_search, (query,), kwargs, callback)
+
+    ## { Object persistence methods
+
+    def add(self, kayakoobject, callback=None):
+        ''' Non-blocking ``kayakoobject.add()``. The result is the object. '''
+        return self._submit(self._persist, (kayakoobject, 'add'), callback=callback)
+
+    def save(self, kayakoobject, callback=None):
+        ''' Non-blocking ``kayakoobject.save()``. The result is the object. '''
+        return self._submit(self._persist, (kayakoobject, 'save'), callback=callback)
+
+    def delete(self, kayakoobject, callback=None):
+        ''' Non-blocking ``kayakoobject.delete()``. The result is the object. '''
+        return self._submit(self._persist, (kayakoobject, 'delete'), callback=callback)
+
+    @staticmethod
+    def _persist(kayakoobject, action):
+        getattr(kayakoobject, action)()
+        return kayakoobject
+
+    def __str__(self):
+        return '<AsyncKayakoAPI: %s>' % self.api.api_url
+
+    def __repr__(self):
+        return 'AsyncKayakoAPI(%s, "some_key", "some_secret", workers=%s)' % (self.api.api_url, self.workers)
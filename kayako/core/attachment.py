@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Streaming transfer of attachment contents.
+'''
+
+import base64
+import mmap
+import os
+import shutil
+import tempfile
+
+from lxml import etree
+
+from kayako.core.form import StreamedValue
+from kayako.exception import KayakoResponseError
+
+__all__ = [
+    'Base64FileContents',
+    'Base64StreamDecoder',
+    'download_attachment',
+]
+
+class Base64StreamDecoder(object):
+    '''
+    Decodes base64 text fed in arbitrary pieces and writes the decoded bytes
+    to ``output``. At most ``buffer_size`` bytes of text are held at a time.
+    '''
+
+    BUFFER_SIZE = 65536
+
+    def __init__(self, output, buffer_size=BUFFER_SIZE):
+        self.output = output
+        self.buffer_size = buffer_size
+        self.written = 0
+        self._pieces = []
+        self._length = 0
+
+    def feed(self, text):
+        self._pieces.append(text)
+        self._length += len(text)
+        if self._length >= self.buffer_size:
+            self._decode(final=False)
+
+    def _decode(self, final):
+        # Whitespace (line breaks) may appear anywhere in the text
+        text = ''.join(''.join(self._pieces).split())
+        usable = len(text) if final else len(text) - len(text) % 4
+        if usable:
+            data = base64.b64decode(text[:usable])
+            self.output.write(data)
+            self.written += len(data)
+        remainder = text[usable:]
+        self._pieces = [remainder] if remainder else []
+        self._length = len(remainder)
+
+    def close(self):
+        ''' Decode the remaining text and return the number of bytes written. '''
+        self._decode(final=True)
+        return self.written
+
+class _AttachmentTarget(object):
+    '''
+    An lxml parser target collecting the text of the fields of the first
+    ``tag`` element, except ``contents``, whose text is passed to a
+    Base64StreamDecoder as it is parsed.
+    '''
+
+    def __init__(self, tag, decoder):
+        self.tag = tag
+        self.decoder = decoder
+        self.fields = None
+        self._depth = 0
+        self._active = False
+        self._text = None
+        self._contents = False
+
+    def start(self, tag, attrib):
+        self._depth += 1
+        if self._depth == 2 and tag == self.tag and self.fields is None:
+            self.fields = {}
+            self._active = True
+        elif self._depth == 3 and self._active:
+            self._contents = tag == 'contents'
+            self._text = []
+
+    def data(self, data):
+        if self._contents:
+            if isinstance(data, unicode):
+                data = data.encode('ascii')
+            self.decoder.feed(data)
+        elif self._text is not None:
+            self._text.append(data)
+
+    def end(self, tag):
+        if self._depth == 3 and self._active:
+            if not self._contents:
+                self.fields[tag] = ''.join(self._text)
+            self._text = None
+            self._contents = False
+        elif self._depth == 2:
+            self._active = False
+        self._depth -= 1
+
+    def close(self):
+        return self.fields
+
+def _parse_stream(response, target, chunk_size):
+    parser = etree.XMLParser(target=target, huge_tree=True)
+    while True:
+        data = response.read(chunk_size)
+        if not data:
+            break
+        parser.feed(data)
+    return parser.close()
+
+def download_attachment(response, tag, output, chunk_size=65536):
+    '''
+    Parse an attachment response, writing the decoded ``contents`` of its
+    first ``tag`` element to ``output``, a writable file-like object or a
+    file path. The response is read ``chunk_size`` bytes at a time, so memory
+    use does not depend on the size of the attachment.
+
+    Returns an element holding the other fields of the attachment, for the
+    ``_parse_*`` method of the attachment class, or None if the response has
+    no attachment, in which case no file is left at a given path. Raises KayakoResponseError if the number of bytes written
+    does not match the attachment's ``filesize``.
+    '''
+    path = None
+    if isinstance(output, basestring):
+        path, output = output, open(output, 'wb')
+    try:
+        decoder = Base64StreamDecoder(output)
+        fields = _parse_stream(response, _AttachmentTarget(tag, decoder), chunk_size)
+        written = decoder.close()
+        if fields is None:
+            if path is not None:
+                # Leave no empty file behind for a missing attachment
+                output.close()
+                os.remove(path)
+                path = None
+            return None
+        filesize = fields.get('filesize')
+        if filesize and filesize.strip().isdigit() and int(filesize) != written:
+            raise KayakoResponseError('Attachment size mismatch: expected %s bytes, received %s bytes.' % (filesize.strip(), written))
+    except:
+        if path is not None:
+            output.close()
+            os.remove(path)
+            path = None
+        raise
+    finally:
+        if path is not None:
+            output.close()
+
+    node = etree.Element(tag)
+    for name, text in fields.iteritems():
+        etree.SubElement(node, name).text = text
+    return node
+
+class Base64FileContents(StreamedValue):
+    '''
+    The base64 encoded contents of a file, as an attachment ``contents``
+    parameter that is encoded while the request is sent.
+
+    ``source`` is a file path, a file object or an ``mmap``. Files are read
+    in chunks each time the value is encoded, after being copied to a
+    temporary file if they cannot seek. Files are not memory mapped here:
+    a mapping's resident pages grow with the file, while chunked reads keep
+    memory use constant.
+
+    ``filename`` is the base name of the source, if it has one. Call
+    ``close`` when done to release files this object opened.
+    '''
+
+    CHUNK_SIZE = 49152
+    ''' Bytes encoded at a time; a multiple of 3, so chunks join cleanly. '''
+
+    def __init__(self, source, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.filename = None
+        self._opened = []
+        self._map = None
+        self._file = None
+
+        if isinstance(source, basestring):
+            self.filename = os.path.basename(source)
+            source = open(source, 'rb')
+            self._opened.append(source)
+        elif isinstance(getattr(source, 'name', None), basestring) and not source.name.startswith('<'):
+            self.filename = os.path.basename(source.name)
+
+        if isinstance(source, mmap.mmap):
+            self._map = source
+            self.size = len(source)
+            return
+
+        try:
+            start = source.tell()
+            source.seek(0, os.SEEK_END)
+            self.size = source.tell() - start
+            source.seek(start)
+        except (AttributeError, IOError, OSError):
+            # Not seekable: spool it to disk so it can be read twice
+            spool = tempfile.TemporaryFile()
+            self._opened.append(spool)
+            shutil.copyfileobj(source, spool)
+            source, start = spool, 0
+            self.size = spool.tell()
+
+        self._file, self._start = source, start
+
+    def __len__(self):
+        ''' The length of the base64 encoded contents. '''
+        return (self.size + 2) // 3 * 4
+
+    def iter_chunks(self):
+        if self._map is not None:
+            for start in xrange(0, self.size, self.chunk_size):
+                yield base64.b64encode(self._map[start:start + self.chunk_size])
+            return
+        self._file.seek(self._start)
+        remaining = self.size
+        while remaining > 0:
+            # Keep reading until a whole chunk is read, so only the last
+            # chunk can need base64 padding
+            pieces = []
+            wanted = min(self.chunk_size, remaining)
+            while wanted > 0:
+                data = self._file.read(wanted)
+                if not data:
+                    break
+                pieces.append(data)
+                wanted -= len(data)
+            data = ''.join(pieces)
+            if not data:
+                break
+            remaining -= len(data)
+            yield base64.b64encode(data)
+
+    def close(self):
+        for opened in self._opened:
+            opened.close()
+        self._opened = []
+
+    def __str__(self):
+        return '<Base64FileContents %s bytes>' % self.size
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Per controller circuit breakers.
+'''
+
+import logging
+import threading
+import time
+
+from kayako.exception import KayakoCircuitOpenError, KayakoRequestError, KayakoResponseError
+
+__all__ = [
+    'CLOSED',
+    'OPEN',
+    'HALF_OPEN',
+    'Circuit',
+    'CircuitBreaker',
+]
+
+log = logging.getLogger('kayako')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+class Circuit(object):
+    '''
+    The breaker state of one controller.
+
+    failure_threshold  Consecutive failures that open the circuit.
+    cooldown           Seconds the circuit stays open before a trial request
+                       is let through (half-open).
+    half_open_calls    Trial requests allowed at once while half-open. A
+                       successful trial closes the circuit, a failed one opens
+                       it again.
+    '''
+
+    def __init__(self, controller, failure_threshold=5, cooldown=30, half_open_calls=1, listeners=()):
+        self.controller = controller
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.half_open_calls = half_open_calls
+        self.listeners = listeners
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trials = 0
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        # Called with the lock held; returns the change to report
+        old_state, self.state = self.state, state
+        if state == OPEN:
+            self.opened_at = time.time()
+        elif state == CLOSED:
+            self.failures = 0
+        self._trials = 0
+        return old_state, state
+
+    def _notify(self, change):
+        if change is None or change[0] == change[1]:
+            return
+        log.warning('CIRCUIT: %s %s -> %s' % (self.controller, change[0], change[1]))
+        for listener in self.listeners:
+            try:
+                listener(self.controller, change[0], change[1])
+            except Exception:
+                log.exception('Circuit breaker listener failed')
+
+    def before_request(self):
+        '''
+        Raise ``KayakoCircuitOpenError`` if a request may not be sent now.
+        Returns True if the request is a half-open trial, which must be
+        followed by ``record_success``, ``record_failure`` or ``release``.
+        '''
+        change = None
+        trial = False
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + self.cooldown - time.time()
+                if remaining > 0:
+                    raise KayakoCircuitOpenError(self.controller, remaining)
+                change = self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    raise KayakoCircuitOpenError(self.controller, 0)
+                self._trials += 1
+                trial = True
+        self._notify(change)
+        return trial
+
+    def release(self):
+        '''
+        Give back a half-open trial that ended without an outcome, such as a
+        request that failed before it could be sent.
+        '''
+        with self._lock:
+            if self.state == HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    def record_success(self):
+        change = None
+        with self._lock:
+            if self.state == HALF_OPEN:
+                change = self._set_state(CLOSED)
+            else:
+                self.failures = 0
+        self._notify(change)
+
+    def record_failure(self):
+        change = None
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                change = self._set_state(OPEN)
+        self._notify(change)
+
+    def __str__(self):
+        return '<Circuit %s %s failures=%s>' % (self.controller, self.state, self.failures)
+
+class CircuitBreaker(object):
+    '''
+    Fails requests fast while their controller is failing. Each controller
+    (the first two path segments, e.g. ``/Tickets/TicketSearch``) has its own
+    ``Circuit``, so a failing endpoint does not block healthy ones.
+
+    Connection errors and the HTTP ``status_codes`` count as failures; any
+    other response closes the circuit again. While a circuit is open
+    requests raise ``KayakoCircuitOpenError`` without being sent.
+
+    failure_threshold, cooldown, half_open_calls
+                 Defaults for every circuit. See ``Circuit``.
+    controllers  A dictionary of controller to a dictionary of settings
+                 overriding the defaults for that controller.
+    listeners    Callables called as ``listener(controller, old_state,
+                 new_state)`` whenever a circuit changes state. More can be
+                 added with ``add_listener``.
+
+    Like a ``RateLimiter``, one breaker can be shared by several APIs::
+
+        >>> breaker = CircuitBreaker(failure_threshold=3, cooldown=10, controllers={'/Tickets/TicketSearch': dict(cooldown=60)})
+        >>> breaker.add_listener(lambda controller, old, new: alert('%s is %s' % (controller, new)))
+        >>> api = KayakoAPI(API_URL, API_KEY, SECRET_KEY, circuit_breaker=breaker)
+    '''
+
+    def __init__(self, failure_threshold=5, cooldown=30, half_open_calls=1, controllers=None, listeners=None, status_codes=(500, 502, 503, 504)):
+        self.defaults = dict(failure_threshold=failure_threshold, cooldown=cooldown, half_open_calls=half_open_calls)
+        self.controllers = dict((self.key(controller), settings) for controller, settings in (controllers or {}).iteritems())
+        self.listeners = list(listeners or [])
+        self.status_codes = frozenset(status_codes)
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(controller):
+        ''' Return the circuit key of a controller path. '''
+        return '/' + '/'.join([part for part in controller.split('/') if part][:2])
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def circuit_for(self, controller):
+        ''' Return the Circuit of a controller path, creating it if needed. '''
+        key = self.key(controller)
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            with self._lock:
+                circuit = self._circuits.get(key)
+                if circuit is None:
+                    settings = dict(self.defaults)
+                    settings.update(self.controllers.get(key, {}))
+                    circuit = self._circuits[key] = Circuit(key, listeners=self.listeners, **settings)
+        return circuit
+
+    def state(self, controller):
+        ''' Return the state of the circuit of a controller path. '''
+        return self.circuit_for(controller).state
+
+    def is_failure(self, error):
+        ''' Returns whether an error counts as a failure of its controller. '''
+        if isinstance(error, KayakoResponseError):
+            return getattr(error, 'code', None) in self.status_codes
+        return isinstance(error, KayakoRequestError)
+
+    def __str__(self):
+        return '<CircuitBreaker %s>' % ', '.join('%s=%s' % (key, circuit.state) for key, circuit in sorted(self._circuits.iteritems()))
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+In-memory caching of objects fetched by ID.
+'''
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+__all__ = [
+    'EntityCache',
+]
+
+log = logging.getLogger('kayako')
+
+def _copy(parameters):
+    # Lists, such as the emails of a user, are copied too
+    return dict((name, list(value) if isinstance(value, list) else value) for name, value in parameters.iteritems())
+
+def _key(cls, id):
+    # IDs given as strings, such as '5', are the same objects as 5
+    try:
+        return cls, int(id)
+    except (TypeError, ValueError):
+        return cls, id
+
+class _Entry(object):
+    '''
+    The parameters of a cached object, from which a new object is built for
+    every lookup.
+    '''
+
+    __slots__ = ('api', 'parameters', 'expires', 'refreshing')
+
+    def __init__(self, object, expires):
+        self.api = object.api
+        self.parameters = _copy(object.parameters)
+        self.expires = expires
+        self.refreshing = False
+
+    def build(self, cls):
+        return cls._from_parameters(self.api, _copy(self.parameters))
+
+class EntityCache(object):
+    '''
+    A bounded least recently used cache of Kayako objects, keyed by class
+    and ID, for ``KayakoAPI(cache=...)``.
+
+    ttls   The seconds objects of each class are kept, by class. Only the
+           classes listed are cached, so that reference objects that rarely
+           change can be cached without caching tickets::
+
+               EntityCache({Department: 3600, TicketStatus: 3600, Staff: 300})
+
+    size   The number of objects kept. The least recently used object is
+           dropped to make room for a new one.
+    stale  Seconds after expiring during which an object is still returned
+           while it is fetched again on a background thread. After that it
+           is fetched before returning. 0 always fetches expired objects
+           before returning.
+
+    The cache keeps the parameters of each object and every lookup returns
+    a new object built from them, so changes made to one are not seen by
+    other callers until it is saved. Saving or deleting an object through
+    the API it was fetched with removes it from the cache.
+
+    ``hits``, ``misses`` and ``stale_hits`` count the lookups, ``refreshes``
+    the background fetches and ``evictions`` the objects dropped for room.
+    '''
+
+    def __init__(self, ttls, size=1024, stale=0):
+        self.ttls = dict(ttls)
+        self.size = size
+        self.stale = stale
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def caches(self, cls):
+        ''' Return whether objects of ``cls`` are cached. '''
+        return cls in self.ttls
+
+    def get(self, cls, id, load):
+        '''
+        Return the cached object of ``cls`` with ``id``, or the result of
+        ``load()``, caching it unless it is None.
+        '''
+        key = _key(cls, id)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and now < entry.expires + self.stale:
+                self._entries[key] = entry
+                if now < entry.expires:
+                    self.hits += 1
+                    return entry.build(cls)
+                self.stale_hits += 1
+                refresh = not entry.refreshing
+                entry.refreshing = True
+            else:
+                self.misses += 1
+                refresh = None
+            generation = self._generation
+
+        if refresh is None:
+            return self._store(key, load(), generation)
+        if refresh:
+            thread = threading.Thread(target=self._refresh, args=(key, entry, load, generation), name='kayako-cache-refresh')
+            thread.daemon = True
+            thread.start()
+        return entry.build(cls)
+
+    def _entry(self, key, value):
+        return _Entry(value, time.time() + self.ttls[key[0]])
+
+    def _put(self, key, entry):
+        # Called with the lock held
+        self._entries.pop(key, None)
+        self._entries[key] = entry
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _store(self, key, value, generation):
+        if value is not None:
+            entry = self._entry(key, value)
+            with self._lock:
+                # Objects loaded while others were invalidated may be out of date
+                if generation == self._generation:
+                    self._put(key, entry)
+        return value
+
+    def _refresh(self, key, entry, load, generation):
+        with self._lock:
+            self.refreshes += 1
+        try:
+            value = load()
+            refreshed = self._entry(key, value) if value is not None else None
+        except Exception, error:
+            log.error('CACHE refresh %s %s: %s' % (key[0].__name__, key[1], error))
+            refreshed = entry
+        with self._lock:
+            entry.refreshing = False
+            # Leave entries replaced or invalidated since
+            if self._entries.get(key) is not entry or refreshed is entry or generation != self._generation:
+                return
+            if refreshed is None:
+                del self._entries[key]
+            else:
+                self._put(key, refreshed)
+
+    def invalidate(self, cls, id):
+        ''' Remove the object of ``cls`` with ``id``, if cached. '''
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(_key(cls, id), None)
+
+    def clear(self):
+        ''' Remove every object. '''
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __str__(self):
+        return '<EntityCache size=%s/%s hits=%s stale_hits=%s misses=%s refreshes=%s evictions=%s>' % (len(self), self.size, self.hits, self.stale_hits, self.misses, self.refreshes, self.evictions)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Compressed (gzip/deflate) response handling.
+'''
+
+import logging
+import zlib
+
+__all__ = [
+    'ACCEPT_ENCODING',
+    'DecodingResponse',
+    'decode_response',
+]
+
+log = logging.getLogger('kayako')
+
+ACCEPT_ENCODING = 'gzip, deflate'
+''' The Accept-Encoding header sent when compression is enabled. '''
+
+class DecodingResponse(object):
+    '''
+    A file-like wrapper around a response that decompresses a gzip or deflate
+    body as it is read, so the whole inflated document is never held in
+    memory at once. Identity encoded responses are passed through.
+
+    ``compressed_bytes`` is the number of bytes received so far and
+    ``decompressed_bytes`` the number of bytes returned by ``read``.
+    '''
+
+    CHUNK_SIZE = 16384
+
+    def __init__(self, response, encoding=None):
+        self._response = response
+        self.encoding = encoding
+        if encoding in ('gzip', 'x-gzip'):
+            self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            self._decoder = zlib.decompressobj()
+        else:
+            self._decoder = None
+        self._started = False
+        self._buffer = ''
+        self._pending = ''
+        self._eof = False
+        self.compressed_bytes = 0
+        self.decompressed_bytes = 0
+        self.code = getattr(response, 'code', None)
+        self.msg = getattr(response, 'msg', None)
+
+    def _decompress(self, data, max_length):
+        try:
+            decoded = self._decoder.decompress(data, max_length)
+        except zlib.error:
+            if self.encoding != 'deflate' or self._started:
+                raise
+            # Some servers send raw deflate data without the zlib header
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            decoded = self._decoder.decompress(data, max_length)
+        self._started = True
+        return decoded
+
+    def _decode_more(self, wanted):
+        if self._pending:
+            data = self._pending
+        else:
+            data = self._response.read(self.CHUNK_SIZE)
+            if not data:
+                self._buffer += self._decoder.flush()
+                self._finish()
+                return
+            self.compressed_bytes += len(data)
+        self._buffer += self._decompress(data, max(wanted, self.CHUNK_SIZE))
+        self._pending = self._decoder.unconsumed_tail
+
+    def _finish(self):
+        if not self._eof:
+            self._eof = True
+            log.debug('RESPONSE SIZE: %s bytes received, %s bytes decoded (%s)' % (self.compressed_bytes, self.decompressed_bytes + len(self._buffer), self.encoding or 'identity'))
+
+    def read(self, amt=None):
+        if self._decoder is None:
+            data = self._response.read() if amt is None else self._response.read(amt)
+            self.compressed_bytes += len(data)
+            self.decompressed_bytes += len(data)
+            if not data or amt is None:
+                self._finish()
+            return data
+
+        if amt is None:
+            while not self._eof:
+                self._decode_more(self.CHUNK_SIZE)
+            data, self._buffer = self._buffer, ''
+        else:
+            while len(self._buffer) < amt and not self._eof:
+                self._decode_more(amt - len(self._buffer))
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        self.decompressed_bytes += len(data)
+        return data
+
+    def getcode(self):
+        return self._response.getcode()
+
+    def info(self):
+        return self._response.info()
+
+    def geturl(self):
+        return self._response.geturl()
+
+    def close(self):
+        self._response.close()
+
+def decode_response(response):
+    '''
+    Wrap a response in a DecodingResponse according to its Content-Encoding
+    header.
+    '''
+    encoding = response.info().getheader('Content-Encoding')
+    if encoding:
+        encoding = encoding.strip().lower()
+        if encoding == 'identity':
+            encoding = None
+    return DecodingResponse(response, encoding)
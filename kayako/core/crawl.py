@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Concurrent crawling of ticket lists, sharded by department and status.
+'''
+
+import logging
+import threading
+import Queue
+
+from kayako.objects.ticket import Ticket
+
+__all__ = [
+    'CrawlShard',
+    'TicketCrawl',
+]
+
+log = logging.getLogger('kayako')
+
+class CrawlShard(object):
+    '''
+    The progress of one shard of a ``TicketCrawl``: the tickets of one
+    department, with one ticket status or any (-1).
+
+    ``pages`` and ``tickets`` count what has been received so far. ``done``
+    is set once the shard has finished, and ``error`` is the exception that
+    ended it early, if any.
+    '''
+
+    def __init__(self, departmentid, ticketstatusid=-1):
+        self.departmentid = departmentid
+        self.ticketstatusid = ticketstatusid
+        self.pages = 0
+        self.tickets = 0
+        self.done = False
+        self.error = None
+
+    @property
+    def key(self):
+        return (self.departmentid, self.ticketstatusid)
+
+    def __str__(self):
+        return '<CrawlShard department=%s status=%s pages=%s tickets=%s%s>' % (self.departmentid, self.ticketstatusid, self.pages, self.tickets,
+                                                                              ' error=%r' % self.error if self.error is not None else ' done' if self.done else '')
+
+class TicketCrawl(object):
+    '''
+    Iterates over the tickets of a list of shards, crawling up to ``workers``
+    shards at a time. Each shard is walked page by page with
+    ``Ticket.get_all``; tickets are yielded as their pages arrive, once each,
+    in no particular order.
+
+    At most ``2 * workers`` pages are held waiting for the consumer, and the
+    workers stop when the consumer stops iterating. ``progress``, if given,
+    is called with the ``CrawlShard`` after each page and when the shard
+    finishes, on the consuming thread. A shard that fails is logged and
+    recorded in ``errors``; the other shards carry on.
+    '''
+
+    def __init__(self, api, shards, workers=10, page_size=1000, progress=None, deadline=None):
+        self.api = api
+        self.shards = list(shards)
+        self.workers = max(1, min(workers, len(self.shards)))
+        self.page_size = page_size
+        self.progress = progress
+        self.deadline = deadline
+
+    @property
+    def errors(self):
+        ''' The exceptions of failed shards, keyed by shard key. '''
+        return dict((shard.key, shard.error) for shard in self.shards if shard.error is not None)
+
+    @property
+    def done(self):
+        return all(shard.done for shard in self.shards)
+
+    def _crawl(self, shard, put):
+        start = 0
+        with self.api.deadline(self.deadline):
+            while True:
+                page = Ticket.get_all(self.api, shard.departmentid, shard.ticketstatusid, count=self.page_size, start=start)
+                if not put((shard, page)):
+                    return
+                if len(page) < self.page_size:
+                    return
+                start += len(page)
+
+    def __iter__(self):
+        pages = Queue.Queue(2 * self.workers)
+        pending = list(reversed(self.shards))
+        lock = threading.Lock()
+        stopped = threading.Event()
+
+        def put(entry):
+            while not stopped.is_set():
+                try:
+                    pages.put(entry, timeout=0.1)
+                    return True
+                except Queue.Full:
+                    pass
+            return False
+
+        def work():
+            while not stopped.is_set():
+                with lock:
+                    if not pending:
+                        break
+                    shard = pending.pop()
+                try:
+                    self._crawl(shard, put)
+                except Exception, error:
+                    put((shard, error))
+                else:
+                    put((shard, None))
+            put(None)
+
+        threads = [threading.Thread(target=work, name='kayako-crawl-%s' % number) for number in range(self.workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        seen = set()
+        running = len(threads)
+        try:
+            while running:
+                entry = pages.get()
+                if entry is None:
+                    running -= 1
+                    continue
+                shard, page = entry
+                if isinstance(page, list):
+                    shard.pages += 1
+                    shard.tickets += len(page)
+                else:
+                    shard.done = True
+                    if page is not None:
+                        shard.error = page
+                        log.error('CRAWL department %s status %s: %s' % (shard.departmentid, shard.ticketstatusid, page))
+                    page = []
+                if self.progress is not None:
+                    self.progress(shard)
+                for ticket in page:
+                    if ticket.id not in seen:
+                        seen.add(ticket.id)
+                        yield ticket
+        finally:
+            stopped.set()
+
+    def __str__(self):
+        return '<TicketCrawl shards=%s done=%s errors=%s>' % (len(self.shards), len([shard for shard in self.shards if shard.done]), len(self.errors))
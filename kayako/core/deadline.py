@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Deadlines limiting the total time of an operation.
+'''
+
+import time
+
+from kayako.exception import KayakoDeadlineExceededError
+
+__all__ = [
+    'Deadline',
+    'DeadlineResponse',
+]
+
+class Deadline(object):
+    '''
+    A point in time by which an operation, including every request it
+    makes, must finish.
+
+        >>> deadline = Deadline(30)
+        >>> tickets = api.get_all(Ticket, departmentid, deadline=deadline)
+        >>> users = api.get_all(User, deadline=deadline)
+
+    API methods also accept a number of seconds wherever a Deadline is
+    accepted.
+    '''
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires = time.time() + seconds
+
+    @classmethod
+    def coerce(cls, value):
+        ''' Return a Deadline for a Deadline, a number of seconds or None. '''
+        if value is None or isinstance(value, Deadline):
+            return value
+        return cls(value)
+
+    @staticmethod
+    def earliest(*deadlines):
+        ''' Return the Deadline expiring first, ignoring Nones. '''
+        deadlines = [deadline for deadline in deadlines if deadline is not None]
+        return min(deadlines, key=lambda deadline: deadline.expires) if deadlines else None
+
+    def remaining(self):
+        ''' Return the number of seconds left, at least 0. '''
+        return max(0.0, self.expires - time.time())
+
+    def expired(self):
+        return time.time() >= self.expires
+
+    def check(self, operation='Operation'):
+        ''' Raise ``KayakoDeadlineExceededError`` if the deadline has passed. '''
+        if self.expired():
+            raise KayakoDeadlineExceededError('%s exceeded its deadline of %ss' % (operation, self.seconds))
+
+    def __str__(self):
+        return '<Deadline %.3fs remaining>' % self.remaining()
+
+class DeadlineResponse(object):
+    '''
+    A file-like wrapper around a response that checks a deadline before
+    every read of at most ``chunk_size`` bytes, so that a body arriving
+    slowly cannot outlast the deadline. Other attributes are those of the
+    response.
+    '''
+
+    def __init__(self, response, deadline, operation='Operation', chunk_size=65536):
+        self._response = response
+        self.deadline = deadline
+        self.operation = operation
+        self.chunk_size = chunk_size
+
+    def read(self, amt=None):
+        if amt is not None:
+            self.deadline.check(self.operation)
+            return self._response.read(min(amt, self.chunk_size))
+        chunks = []
+        while True:
+            self.deadline.check(self.operation)
+            chunk = self._response.read(self.chunk_size)
+            if not chunk:
+                return ''.join(chunks)
+            chunks.append(chunk)
+
+    def close(self):
+        self._response.close()
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
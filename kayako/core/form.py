@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+application/x-www-form-urlencoded request body encoding.
+'''
+
+__all__ = [
+    'FormEncoder',
+    'IterReader',
+    'StreamedValue',
+    'default_encoder',
+]
+
+# Characters urllib.quote leaves alone with its default safe='/'
+_SAFE_CHARACTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-/'
+
+_ESCAPES = dict((chr(code), '%%%02X' % code) for code in range(256))
+_ESCAPES.update((character, character) for character in _SAFE_CHARACTERS)
+
+def _quote(value):
+    '''
+    Equivalent to urllib.quote(value). Values using only a few distinct
+    unsafe characters, such as base64 ('+', '='), are escaped with str.replace
+    instead of character by character.
+    '''
+    unsafe = set(value.translate(None, _SAFE_CHARACTERS))
+    if not unsafe:
+        return value
+    if len(unsafe) > 8:
+        return ''.join(map(_ESCAPES.__getitem__, value))
+    if '%' in unsafe:
+        # Escape '%' first so the escapes added below are left alone
+        value = value.replace('%', '%25')
+        unsafe.discard('%')
+    for character in unsafe:
+        value = value.replace(character, _ESCAPES[character])
+    return value
+
+def _quoted_length(value):
+    # Every unsafe character becomes a three character escape
+    return len(value) + 2 * len(value.translate(None, _SAFE_CHARACTERS))
+
+class StreamedValue(object):
+    '''
+    A parameter value produced in chunks while the request body is encoded,
+    instead of being held in memory as one string. Subclasses implement
+    ``iter_chunks``, which must yield the same chunks every time it is
+    called.
+    '''
+
+    _length = None
+
+    def iter_chunks(self):
+        ''' Yield the unquoted value in chunks. '''
+        raise NotImplementedError()
+
+    def quoted_length(self):
+        ''' Return the length of the quoted value. Computed once. '''
+        if self._length is None:
+            self._length = sum(_quoted_length(chunk) for chunk in self.iter_chunks())
+        return self._length
+
+class FormEncoder(object):
+    '''
+    Encodes sanitized parameters (strings and lists of strings) in linear
+    time, either as one string or as a stream of chunks.
+
+    ``order`` is a sequence of parameter names; the ``name=`` and ``name[]=``
+    prefixes for these are computed once and they are encoded first, in that
+    order. Other parameters follow in sorted order.
+
+    Values are quoted in slices of ``chunk_size`` bytes, so encoding a large
+    value never needs more than one slice of extra memory. ``StreamedValue``
+    values are quoted chunk by chunk as they are produced.
+    '''
+
+    CHUNK_SIZE = 65536
+
+    def __init__(self, order=(), chunk_size=CHUNK_SIZE):
+        self.order = tuple(order)
+        self.chunk_size = chunk_size
+        self._prefixes = dict((name, self._make_prefixes(name)) for name in self.order)
+
+    @staticmethod
+    def _make_prefixes(name):
+        return ('%s=' % name, '%s[]=' % name)
+
+    def _ordered_items(self, parameters):
+        prefixes = self._prefixes
+        for name in self.order:
+            if name in parameters:
+                yield prefixes[name], parameters[name]
+        for name in sorted(name for name in parameters if name not in prefixes):
+            yield self._make_prefixes(name), parameters[name]
+
+    def _fields(self, parameters):
+        ''' Yields (prefix, value) for every field in the body. '''
+        for (prefix, list_prefix), value in self._ordered_items(parameters):
+            if isinstance(value, list):
+                if value:
+                    for sub_value in value:
+                        yield list_prefix, sub_value
+                else:
+                    yield list_prefix, ''
+            else:
+                yield prefix, value
+
+    def iter_encode(self, parameters):
+        '''
+        Yields the encoded body in chunks. Nothing is yielded if there are no
+        parameters.
+        '''
+        chunk_size = self.chunk_size
+        separator = ''
+        for prefix, value in self._fields(parameters):
+            if isinstance(value, StreamedValue):
+                yield separator + prefix
+                for chunk in value.iter_chunks():
+                    yield _quote(chunk)
+            elif len(value) <= chunk_size:
+                yield '%s%s%s' % (separator, prefix, _quote(value))
+            else:
+                yield separator + prefix
+                for start in xrange(0, len(value), chunk_size):
+                    yield _quote(value[start:start + chunk_size])
+            separator = '&'
+
+    def encode(self, parameters):
+        ''' Returns the encoded body as a string, or None if it is empty. '''
+        return ''.join(self.iter_encode(parameters)) or None
+
+    def content_length(self, parameters):
+        ''' Returns the length of the encoded body without encoding it. '''
+        length = 0
+        fields = 0
+        for prefix, value in self._fields(parameters):
+            length += len(prefix) + (value.quoted_length() if isinstance(value, StreamedValue) else _quoted_length(value))
+            fields += 1
+        return length + max(fields - 1, 0)
+
+    def __str__(self):
+        return '<FormEncoder order=%s>' % (self.order,)
+
+default_encoder = FormEncoder()
+''' A FormEncoder without a predefined parameter order. '''
+
+class IterReader(object):
+    '''
+    A read-only file-like object over an iterable of strings, used to stream
+    a request body.
+    '''
+
+    def __init__(self, iterable, length=None):
+        self._iterator = iter(iterable)
+        self._buffer = ''
+        self._position = 0
+        self.length = length
+
+    def read(self, amt=None):
+        available = len(self._buffer) - self._position
+        if amt is not None and amt >= 0 and available >= amt:
+            data = self._buffer[self._position:self._position + amt]
+            self._position += amt
+            return data
+        chunks = [self._buffer[self._position:]]
+        if amt is None or amt < 0:
+            chunks.extend(self._iterator)
+        else:
+            while available < amt:
+                try:
+                    chunk = self._iterator.next()
+                except StopIteration:
+                    break
+                chunks.append(chunk)
+                available += len(chunk)
+        data = ''.join(chunks)
+        if amt is None or amt < 0 or len(data) <= amt:
+            self._buffer, self._position = '', 0
+            return data
+        self._buffer, self._position = data, amt
+        return data[:amt]
+
+    def __len__(self):
+        if self.length is None:
+            raise TypeError('IterReader length is unknown')
+        return self.length
@@ -10,13 +10,19 @@ Created on May 5, 2011
 @author: evan
 '''
 
-from datetime import datetime
+from datetime import datetime, timedelta, tzinfo
 
 __all__ = [
     'UnsetParameter',
+    'NotLoaded',
     'FOREVER',
+    'UTC',
+    'fromtimestamp',
+    'fromtimestamps',
     'ParameterObject',
     'NodeParser',
+    'BatchResult',
+    'LazyList',
 ]
 
 class _unsetparameter(object):
@@ -33,6 +39,17 @@ class _unsetparameter(object):
     def __str__(self):
         return '??'
 
+class _notloaded(object):
+
+    def __nonzero__(self):
+        return False
+
+    def __repr__(self):
+        return 'NotLoaded()'
+
+    def __str__(self):
+        return '<Not loaded>'
+
 class _forever(object):
 
     def __int__(self):
@@ -44,14 +61,155 @@ class _forever(object):
     def __str__(self):
         return '<Forever>'
 
+class _utc(tzinfo):
+
+    def utcoffset(self, dt):
+        return timedelta(0)
+
+    def tzname(self, dt):
+        return 'UTC'
+
+    def dst(self, dt):
+        return timedelta(0)
+
+    def __repr__(self):
+        return 'UTC'
+
 UnsetParameter = _unsetparameter()
+NotLoaded = _notloaded()
+''' The value of the fields of a partial object that were not loaded. '''
 FOREVER = _forever()
+UTC = _utc()
+
+_TIMESTAMP_CACHE_SIZE = 65536
+_timestamps = {}
+''' Remembered conversions, by timezone and then timestamp. '''
+
+def fromtimestamp(timestamp, tz=None):
+    '''
+    Return ``datetime.fromtimestamp(timestamp, tz)``. Results are remembered,
+    as bulk responses repeat the same timestamps many times; up to
+    ``_TIMESTAMP_CACHE_SIZE`` of them are kept per timezone.
+    '''
+    cache = _timestamps.get(tz)
+    if cache is None:
+        cache = _timestamps.setdefault(tz, {})
+    value = cache.get(timestamp)
+    if value is None:
+        if len(cache) >= _TIMESTAMP_CACHE_SIZE:
+            cache.clear()
+        value = cache[timestamp] = datetime.fromtimestamp(timestamp, tz)
+    return value
+
+def fromtimestamps(timestamps, tz=UTC):
+    '''
+    Convert a sequence of epoch timestamps, such as the dates kept by a
+    ``KayakoAPI`` with ``epoch_dates``, to a list of timezone aware datetimes
+    in ``tz``. ``FOREVER`` and None are kept as they are.
+    '''
+    convert = fromtimestamp
+    return [timestamp if timestamp is None or timestamp is FOREVER else convert(timestamp, tz) for timestamp in timestamps]
+
+class BatchResult(list):
+    '''
+    A list of results from a batch operation. Errors for individual items are
+    kept in ``errors``, a dictionary keyed by the item that failed.
+    '''
+
+    def __init__(self, *args):
+        list.__init__(self, *args)
+        self.errors = {}
+
+class LazyList(object):
+    '''
+    A read-only sequence of the items returned by ``load()``, which is only
+    called the first time the items are needed. ``loaded`` tells whether it
+    has been called.
+    '''
+
+    __slots__ = ('_load', '_items')
+
+    def __init__(self, load):
+        self._load = load
+        self._items = None
+
+    @property
+    def loaded(self):
+        return self._items is not None
+
+    @property
+    def items(self):
+        items = self._items
+        if items is None:
+            items = self._items = list(self._load())
+            self._load = None
+        return items
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __contains__(self, item):
+        return item in self.items
+
+    def __nonzero__(self):
+        return bool(self.items)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyList):
+            other = other.items
+        return self.items == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def index(self, item):
+        return self.items.index(item)
+
+    def count(self, item):
+        return self.items.count(item)
+
+    def __repr__(self):
+        if self._items is None:
+            return 'LazyList(<not loaded>)'
+        return 'LazyList(%r)' % self._items
+
+class _ParameterObjectType(type):
+    '''
+    Gives each ParameterObject class ``__slots__`` for the ``__parameters__``
+    its bases do not already have, so instances keep their parameters in
+    fixed slots rather than a ``__dict__`` of their own.
+    '''
+
+    def __new__(mcs, name, bases, attributes):
+        if '__slots__' not in attributes:
+            slotted = set()
+            for base in bases:
+                for klass in base.__mro__:
+                    slotted.update(klass.__dict__.get('__slots__', ()))
+            attributes['__slots__'] = tuple(parameter for parameter in attributes.get('__parameters__', ())
+                                            if parameter not in slotted and parameter not in attributes)
+        cls = type.__new__(mcs, name, bases, attributes)
+        cls._parameter_set = frozenset(cls.__parameters__)
+        return cls
 
 class ParameterObject(object):
     '''
     An object used to build a dictionary around different parameter types.
+
+    Parameters are stored in slots generated from ``__parameters__``; a
+    parameter that has not been set reads as ``UnsetParameter``. Pickling
+    keeps the value of every slot.
     '''
 
+    __metaclass__ = _ParameterObjectType
+    __slots__ = ('__dict__',)
+
     __parameters__ = []
     ''' Parameters that this ParameterObject can have. '''
 
@@ -61,9 +219,12 @@ class ParameterObject(object):
         keyword arguments.
         '''
         self._update_parameters(**parameters)
-        for parameter in self.__parameters__:
-            if parameter not in parameters:
-                setattr(self, parameter, UnsetParameter)
+
+    def __getattr__(self, name):
+        # Only called for attributes that have not been set
+        if name in self._parameter_set:
+            return UnsetParameter
+        raise AttributeError("'%s' object has no attribute '%s'" % (self.__class__.__name__, name))
 
     @property
     def parameters(self):
@@ -76,13 +237,29 @@ class ParameterObject(object):
         params = {}
         for parameter in list:
             attribute = getattr(self, parameter)
-            if attribute is not UnsetParameter:
+            if attribute is not UnsetParameter and attribute is not NotLoaded:
                 params[parameter] = attribute
         return params
 
+    def __getstate__(self):
+        # Objects with __slots__ are only pickled with a __getstate__
+        state = dict(self.__dict__)
+        for klass in type(self).__mro__:
+            for name in klass.__dict__.get('__slots__', ()):
+                if name != '__dict__' and name not in state:
+                    try:
+                        state[name] = object.__getattribute__(self, name)
+                    except AttributeError:
+                        pass
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.iteritems():
+            object.__setattr__(self, name, value)
+
     def _update_parameters(self, **parameters):
         for parameter, value in parameters.iteritems():
-            if parameter not in self.__parameters__:
+            if parameter not in self._parameter_set:
                 raise TypeError("'%s' is an invalid keyword argument for %s" % (parameter, self.__class__.__name__))
             else:
                 setattr(self, parameter, value)
@@ -93,6 +270,8 @@ class ParameterObject(object):
 class NodeParser(object):
     ''' Methods to parse text data from an lxml etree object. '''
 
+    __slots__ = ()
+
     @staticmethod
     def _parse_int(data, required=True, strict=True):
         ''' Simply parses data as an int.
@@ -123,7 +302,36 @@ class NodeParser(object):
         elif value == 0:
             return FOREVER
         else:
-            return datetime.fromtimestamp(value)
+            return fromtimestamp(value)
+
+    @staticmethod
+    def _parse_epoch(data, required=True, strict=True):
+        '''
+        Return an integer timestamp, or FOREVER. See _parse_int for
+        information on required and strict.
+        '''
+        value = NodeParser._parse_int(data, required=required, strict=strict)
+        if value == 0:
+            return FOREVER
+        return value
+
+    @staticmethod
+    def _parse_boolean(data, required=True, strict=True):
+        '''
+        Returns the boolean value of integer data.  See _get_boolean for
+        details.
+        '''
+        value = NodeParser._parse_int(data, required=required, strict=strict)
+        if value is None:
+            return None
+        elif not strict:
+            return bool(value)
+        elif value == 0:
+            return False
+        elif value == 1:
+            return True
+        else:
+            raise ValueError('Value for node not 1 or 0')
 
     @staticmethod
     def _get_int(node, required=True, strict=True):
@@ -185,7 +393,7 @@ class NodeParser(object):
         elif value == 0:
             return FOREVER
         else:
-            return datetime.fromtimestamp(value)
+            return fromtimestamp(value)
 
     def __str__(self):
         return '<NodeParser at %s>' % (hex(id(self)))
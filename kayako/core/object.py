@@ -9,15 +9,20 @@ Created on May 5, 2011
 
 @author: evan
 '''
-from kayako.core.lib import ParameterObject, NodeParser, UnsetParameter
+from kayako.core.form import FormEncoder
+from kayako.core.lib import ParameterObject, NodeParser, UnsetParameter, NotLoaded
 from kayako.exception import KayakoMethodNotImplementedError, KayakoRequestError, KayakoResponseError
 
+_form_encoders = {}
+
 class KayakoRequestParser(NodeParser):
     ''' 
     Overrides NodeParser methods to raise KayakoResponseErrors instead of 
     ValueError, AttributeError, and TypeError when parsing nodes/data.
     '''
 
+    __slots__ = ()
+
     @staticmethod
     def _parse_int(data, required=True, strict=True):
         try:
@@ -59,10 +64,13 @@ class KayakoRequestParser(NodeParser):
 class KayakoObject(ParameterObject, KayakoRequestParser):
     ''' Kayako Object class meant to built from a factory. '''
 
-    id = UnsetParameter
-    api = None
+    __slots__ = ('api', '_node', '_children', '_partial')
+
     controller = None
 
+    __schema__ = None
+    ''' The ``Schema`` of the fields parsed from a response, if any. '''
+
     __required_add_parameters__ = []
     ''' Parameters required to add this object. '''
     __add_parameters__ = []
@@ -77,6 +85,133 @@ class KayakoObject(ParameterObject, KayakoRequestParser):
         ParameterObject.__init__(self, **parameters)
         self.api = api
 
+    @classmethod
+    def _from_parameters(cls, api, parameters):
+        '''
+        Return an instance with parameters already parsed from a response,
+        without checking them against ``__parameters__`` as ``__init__``
+        does. Only for dictionaries built by this class' own parser.
+        '''
+        self = cls.__new__(cls)
+        self.api = api
+        for parameter, value in parameters.iteritems():
+            setattr(self, parameter, value)
+        return self
+
+    @classmethod
+    def _api_schema(cls, api):
+        '''
+        Return the ``__schema__`` used for responses to ``api``: with dates
+        kept as timestamps if it has ``epoch_dates`` set.
+        '''
+        if api is not None and api.epoch_dates:
+            return cls.__schema__.epoch()
+        return cls.__schema__
+
+    @classmethod
+    def _parse_node(cls, api, node, schema, **parameters):
+        '''
+        Return the parameters of ``node``, reading the fields of ``schema``,
+        which is ``__schema__`` or a projection of it. ``parameters`` are
+        added as given. Classes with fields built from nodes extend this.
+        '''
+        params = schema.parse(node)
+        params.update(parameters)
+        return params
+
+    @classmethod
+    def _fields(cls, fields):
+        '''
+        Return the set of parameters named in ``fields``, with ``id``. Raises
+        TypeError for names that are not parameters of this class.
+        '''
+        for name in fields:
+            if name not in cls._parameter_set:
+                raise TypeError("'%s' is not a field of %s" % (name, cls.__name__))
+        return frozenset(fields) | frozenset(['id'])
+
+    @classmethod
+    def _load(cls, api, node, fields=None, lazy=None, **parameters):
+        '''
+        Return an instance for ``node`` of a class with a ``__schema__``.
+
+        With ``fields``, only those fields (and ``id``) are parsed and the
+        instance is partial, see ``_project``. Otherwise it is decoded lazily
+        if ``lazy``, by default ``api.lazy``, is set, or parsed at once.
+        '''
+        if fields is not None:
+            self = cls._from_parameters(api, cls._parse_node(api, node, cls._api_schema(api).project(cls._fields(fields)), **parameters))
+            self._partial = True
+            return self
+        if lazy is None:
+            lazy = api is not None and api.lazy
+        if lazy:
+            return cls._lazy(api, node, **parameters)
+        return cls._from_parameters(api, cls._parse_node(api, node, cls._api_schema(api), **parameters))
+
+    @classmethod
+    def _lazy(cls, api, node, **parameters):
+        '''
+        Return an instance that reads the fields of ``__schema__`` from
+        ``node`` the first time each one is accessed, instead of parsing them
+        all up front. ``parameters`` are set as given. Setting a field
+        replaces its value without decoding it.
+
+        The instance keeps ``node``, and so its whole document, until it is
+        garbage collected.
+        '''
+        self = cls._from_parameters(api, parameters)
+        self._node = node
+        return self
+
+    def _decode(self, name, node, children):
+        '''
+        Return the value of the field ``name`` of a lazy instance's ``node``,
+        the children of which are indexed in ``children``.
+        '''
+        return self._api_schema(self.api).read(name, node, children)
+
+    def _project(self, fields):
+        '''
+        Drop every parameter but ``fields`` and ``id`` from this instance and
+        mark it partial: parameters that were not loaded read as
+        ``NotLoaded`` and are left out of ``parameters``. Returns the
+        instance.
+        '''
+        fields = self._fields(fields)
+        for parameter in self.__parameters__:
+            if parameter not in fields:
+                try:
+                    delattr(self, parameter)
+                except AttributeError:
+                    pass
+        self._partial = True
+        return self
+
+    @property
+    def partial(self):
+        ''' Whether only some fields of this object were loaded, see ``KayakoAPI.get_all``. '''
+        return bool(self._partial)
+
+    def __getattr__(self, name):
+        # Only called for attributes that have not been set
+        if name in ('api', '_node', '_children', '_partial'):
+            return None
+        node = self._node
+        if node is not None and name in self.__schema__:
+            children = self._children
+            if children is None:
+                children = self._children = self.__schema__.index(node)
+            value = self._decode(name, node, children)
+            setattr(self, name, value)
+            return value
+        if self._partial and name in self._parameter_set:
+            return NotLoaded
+        if name == 'id':
+            # Every object has an id
+            return UnsetParameter
+        return ParameterObject.__getattr__(self, name)
+
     ## ParameterObject
 
     @property
@@ -100,6 +235,20 @@ class KayakoObject(ParameterObject, KayakoRequestParser):
         '''
         return self._parameters_from_list(self.__parameters__)
 
+    @classmethod
+    def _form_encoder(cls, kind):
+        '''
+        Return the FormEncoder for this class' ``__add_parameters__`` (kind
+        'add') or ``__save_parameters__`` (kind 'save') order. Encoders are
+        built once per class.
+        '''
+        key = (cls, kind)
+        encoder = _form_encoders.get(key)
+        if encoder is None:
+            order = cls.__add_parameters__ if kind == 'add' else cls.__save_parameters__
+            encoder = _form_encoders[key] = FormEncoder(order)
+        return encoder
+
     ## Persistence Layer
 
     @classmethod
@@ -107,6 +256,11 @@ class KayakoObject(ParameterObject, KayakoRequestParser):
         ''' Get all instances of this object from Kayako. '''
         raise KayakoMethodNotImplementedError('GET ALL %s is not implemented for this object.' % cls.__name__)
 
+    @classmethod
+    def iter_all(cls, api, *args, **kwargs):
+        ''' Iterate over all instances of this object, one page at a time. '''
+        raise KayakoMethodNotImplementedError('ITER ALL %s is not implemented for this object.' % cls.__name__)
+
     @classmethod
     def get(cls, api, *args):
         ''' Get an instance of this object by ID '''
@@ -124,7 +278,7 @@ class KayakoObject(ParameterObject, KayakoRequestParser):
         for required_parameter in self.__required_add_parameters__:
             if required_parameter not in parameters:
                 raise KayakoRequestError('Cannot add %s: Missing required field: %s.' % (self.__class__.__name__, required_parameter))
-        return self.api._request(controller, 'POST', **parameters)
+        return self.api._request(controller, 'POST', _encoder=self._form_encoder('add'), **parameters)
 
     def add(self):
         ''' Add a new object to Kayako '''
@@ -142,7 +296,10 @@ class KayakoObject(ParameterObject, KayakoRequestParser):
         for required_parameter in self.__required_save_parameters__:
             if required_parameter not in parameters:
                 raise KayakoRequestError('Cannot save %s: Missing required field: %s. (id: %s)' % (self.__class__.__name__, required_parameter, self.id))
-        return self.api._request(controller, 'PUT', **parameters)
+        try:
+            return self.api._request(controller, 'PUT', _encoder=self._form_encoder('save'), **parameters)
+        finally:
+            self.api._invalidate(self)
 
     def save(self):
         ''' Save an existing object to Kayako '''
@@ -154,7 +311,10 @@ class KayakoObject(ParameterObject, KayakoRequestParser):
         '''
         if self.id is UnsetParameter:
             raise KayakoRequestError('Cannot delete a non-existent %s. The ID of the %s to delete has not been specified.' % (self.__class__.__name__, self.__class__.__name__))
-        self.api._request(controller, 'DELETE')
+        try:
+            self.api._request(controller, 'DELETE')
+        finally:
+            self.api._invalidate(self)
         self.id = UnsetParameter
 
     def delete(self):
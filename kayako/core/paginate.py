@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Iteration over paginated list controllers.
+'''
+
+import sys
+import threading
+import Queue
+
+__all__ = [
+    'iter_offset_pages',
+    'iter_marker_pages',
+    'read_ahead',
+]
+
+_ITEM, _ERROR, _DONE = range(3)
+
+def read_ahead(iterable, size):
+    '''
+    Iterate over ``iterable`` on a background thread, keeping at most ``size``
+    of its items queued ahead of the consumer. Exceptions raised by the
+    iterable are raised to the consumer in its place.
+
+    The thread stops once the consumer stops iterating, after finishing the
+    item it is producing.
+    '''
+    queue = Queue.Queue(size)
+    stopped = threading.Event()
+
+    def put(entry):
+        while not stopped.is_set():
+            try:
+                queue.put(entry, timeout=0.1)
+                return True
+            except Queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((_ITEM, item)):
+                    return
+        except:
+            put((_ERROR, sys.exc_info()))
+        else:
+            put((_DONE, None))
+
+    thread = threading.Thread(target=produce, name='kayako-read-ahead')
+    thread.daemon = True
+    thread.start()
+    try:
+        while True:
+            kind, value = queue.get()
+            if kind == _ITEM:
+                yield value
+            elif kind == _ERROR:
+                raise value[0], value[1], value[2]
+            else:
+                return
+    finally:
+        stopped.set()
+
+def _prefetched(pages, prefetch):
+    ''' Yield the items of ``pages``, reading ``prefetch`` pages ahead. '''
+    for page in read_ahead(pages, prefetch):
+        for item in page:
+            yield item
+
+def _offset_pages(fetch, page_size, start):
+    while True:
+        page = list(fetch(page_size, start))
+        yield page
+        if len(page) < page_size:
+            return
+        start += len(page)
+
+def _marker_pages(fetch, page_size, marker, key):
+    while True:
+        page = list(fetch(page_size, marker))
+        yield page
+        if len(page) < page_size:
+            return
+        marker = key(page[-1]) + 1
+
+def iter_offset_pages(fetch, page_size, start=0, prefetch=0):
+    '''
+    Yield every item of a list paginated by offset, such as the ``count`` and
+    ``start`` arguments of ``Ticket.get_all``. ``fetch(count, start)`` returns
+    an iterable of at most ``count`` items from offset ``start``.
+
+    Pages are fetched as the items are consumed, and iteration stops at the
+    first page with fewer than ``page_size`` items. With ``prefetch`` set,
+    up to that many pages are fetched ahead on a background thread while
+    the current one is consumed, see ``read_ahead``.
+    '''
+    if prefetch:
+        for item in _prefetched(_offset_pages(fetch, page_size, start), prefetch):
+            yield item
+        return
+    while True:
+        received = 0
+        for item in fetch(page_size, start):
+            received += 1
+            yield item
+        if received < page_size:
+            return
+        start += received
+
+def iter_marker_pages(fetch, page_size, marker, key, prefetch=0):
+    '''
+    Yield every item of a list paginated by marker, such as the ``marker``
+    and ``maxitems`` arguments of ``User.get_all``. ``fetch(count, marker)``
+    returns an iterable of at most ``count`` items with ids from ``marker``,
+    in id order; ``key(item)`` returns the id of an item.
+
+    The next page starts after the id of the last item of the previous one.
+    ``prefetch`` works as for ``iter_offset_pages``.
+    '''
+    if prefetch:
+        for item in _prefetched(_marker_pages(fetch, page_size, marker, key), prefetch):
+            yield item
+        return
+    while True:
+        received = 0
+        last = None
+        for item in fetch(page_size, marker):
+            received += 1
+            last = item
+            yield item
+        if received < page_size:
+            return
+        marker = key(last) + 1
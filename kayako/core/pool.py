@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Persistent (keep-alive) HTTP connection pooling.
+'''
+
+import collections
+import errno
+import httplib
+import logging
+import select
+import socket
+import threading
+import time
+import urlparse
+
+__all__ = [
+    'ConnectionPool',
+    'PooledResponse',
+]
+
+log = logging.getLogger('kayako')
+
+class PooledResponse(object):
+    '''
+    A file-like wrapper around an ``httplib.HTTPResponse`` that returns its
+    connection to the pool once the body has been read completely.
+
+    Mirrors the parts of the ``urllib2`` response interface used by the
+    library: ``read``, ``getcode``, ``info``, ``geturl`` and ``close``.
+    '''
+
+    # Unread bodies up to this size are drained on close so the connection can
+    # still be reused.
+    DRAIN_LIMIT = 65536
+
+    def __init__(self, pool, key, connection, response, url):
+        self._pool = pool
+        self._key = key
+        self._connection = connection
+        self._response = response
+        self._url = url
+        self.code = response.status
+        self.msg = response.reason
+        self.headers = response.msg
+
+    def _release(self):
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            if self._response.will_close:
+                connection.close()
+            else:
+                self._pool._put_connection(self._key, connection)
+
+    def _discard(self):
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            connection.close()
+
+    def read(self, amt=None):
+        try:
+            if amt is None:
+                data = self._response.read()
+            else:
+                data = self._response.read(amt)
+        except (socket.error, httplib.HTTPException):
+            self._discard()
+            raise
+        if self._response.isclosed():
+            self._release()
+        return data
+
+    def getcode(self):
+        return self.code
+
+    def info(self):
+        return self.headers
+
+    def geturl(self):
+        return self._url
+
+    def close(self):
+        if self._connection is None:
+            return
+        if self._response.isclosed():
+            self._release()
+            return
+        length = self._response.length
+        if length is not None and length <= self.DRAIN_LIMIT:
+            try:
+                self._response.read()
+            except (socket.error, httplib.HTTPException):
+                self._discard()
+            else:
+                self._release()
+        else:
+            self._response.close()
+            self._discard()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+class ConnectionPool(object):
+    '''
+    A thread safe pool of persistent HTTP/HTTPS connections keyed by host.
+
+    maxsize       The maximum number of idle connections kept per host.
+                  Connections beyond this are closed when released.
+    idle_timeout  Seconds an idle connection may sit in the pool before it is
+                  evicted. None keeps idle connections indefinitely.
+    '''
+
+    connection_classes = {
+        'http': httplib.HTTPConnection,
+        'https': httplib.HTTPSConnection,
+    }
+
+    REPLAY_METHODS = frozenset(['GET', 'HEAD'])
+    ''' Methods replayed on another connection when a reused one was closed. '''
+
+    def __init__(self, maxsize=10, idle_timeout=60):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._idle = {}
+
+    def _new_connection(self, key):
+        scheme, host, port = key
+        try:
+            connection_class = self.connection_classes[scheme]
+        except KeyError:
+            raise ValueError('Unsupported URL scheme: %s' % scheme)
+        log.debug('POOL: new connection to %s://%s:%s' % (scheme, host, port))
+        return connection_class(host, port)
+
+    @staticmethod
+    def _is_dropped(connection):
+        '''
+        Returns True if the server has closed an idle connection. An idle
+        keep-alive socket only becomes readable when it is closed.
+
+        Uses ``poll`` where available, since ``select`` cannot watch file
+        descriptors of 1024 and above.
+        '''
+        sock = connection.sock
+        if sock is None:
+            return False
+        try:
+            if hasattr(select, 'poll'):
+                poller = select.poll()
+                poller.register(sock, select.POLLIN)
+                return bool(poller.poll(0))
+            return bool(select.select([sock], [], [], 0)[0])
+        except (select.error, socket.error):
+            return True
+        except ValueError:
+            # select could not watch the socket, which may still be usable
+            return False
+
+    def _expired(self, last_used, now):
+        return self.idle_timeout is not None and now - last_used > self.idle_timeout
+
+    def _get_connection(self, key):
+        '''
+        Returns a tuple of (connection, reused). The most recently used idle
+        connection is preferred; expired connections are closed.
+        '''
+        now = time.time()
+        expired = []
+        connection = None
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                candidate, last_used = idle.pop()
+                if self._expired(last_used, now) or self._is_dropped(candidate):
+                    expired.append(candidate)
+                else:
+                    connection = candidate
+                    break
+        for candidate in expired:
+            candidate.close()
+        if connection is not None:
+            return connection, True
+        return self._new_connection(key), False
+
+    def _put_connection(self, key, connection):
+        now = time.time()
+        discard = []
+        with self._lock:
+            idle = self._idle.setdefault(key, collections.deque())
+            while idle and self._expired(idle[0][1], now):
+                discard.append(idle.popleft()[0])
+            if len(idle) < self.maxsize:
+                idle.append((connection, now))
+            else:
+                discard.append(connection)
+        for candidate in discard:
+            candidate.close()
+
+    def evict_idle(self):
+        ''' Close every pooled connection that has exceeded idle_timeout. '''
+        now = time.time()
+        discard = []
+        with self._lock:
+            for idle in self._idle.itervalues():
+                while idle and self._expired(idle[0][1], now):
+                    discard.append(idle.popleft()[0])
+        for connection in discard:
+            connection.close()
+        return len(discard)
+
+    def clear(self):
+        ''' Close every idle connection in the pool. '''
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.itervalues():
+            for connection, _ in connections:
+                connection.close()
+
+    def idle_count(self, key=None):
+        ''' Return the number of idle connections, optionally for one host key. '''
+        with self._lock:
+            if key is not None:
+                return len(self._idle.get(key, ()))
+            return sum(len(idle) for idle in self._idle.itervalues())
+
+    @staticmethod
+    def _split_url(url):
+        parts = urlparse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == 'https' else 80)
+        path = parts.path or '/'
+        if parts.query:
+            path = '%s?%s' % (path, parts.query)
+        return (scheme, parts.hostname, port), path
+
+    def urlopen(self, method, url, body=None, headers=None, timeout=None):
+        '''
+        Send a request over a pooled connection and return a PooledResponse.
+
+        ``timeout`` is None or a tuple of (connect, read) timeouts in seconds.
+        The connect timeout applies when a new connection is opened, the read
+        timeout to every socket operation of this request after that.
+
+        Idle connections the server has closed are dropped before use. A
+        GET or HEAD request that still finds its reused connection closed,
+        before any of the response was received, is sent again on another
+        connection. Timeouts and other methods are never replayed here,
+        that is left to the ``RetryPolicy``, as the server may already have
+        acted on the request. Raises socket.error or httplib.HTTPException
+        on failure.
+        '''
+        key, path = self._split_url(url)
+        headers = headers or {}
+        while True:
+            connection, reused = self._get_connection(key)
+            sent = False
+            try:
+                if timeout is not None:
+                    connect_timeout, read_timeout = timeout
+                    if connection.sock is None:
+                        connection.timeout = connect_timeout
+                        connection.connect()
+                    connection.sock.settimeout(read_timeout)
+                connection.request(method, path, body, headers)
+                sent = True
+                response = connection.getresponse()
+            except (socket.error, httplib.HTTPException), error:
+                connection.close()
+                if reused and self._replayable(method, body, error, sent):
+                    log.debug('POOL: stale connection to %s://%s:%s, reconnecting' % key)
+                    continue
+                raise
+            return PooledResponse(self, key, connection, response, url)
+
+    def _replayable(self, method, body, error, sent):
+        '''
+        Returns True if a request that failed with ``error`` on a reused
+        connection was refused by a closed socket, with no response received,
+        and may be sent again.
+        '''
+        if method not in self.REPLAY_METHODS or not (body is None or isinstance(body, basestring)):
+            return False
+        if isinstance(error, socket.timeout):
+            return False
+        if isinstance(error, httplib.BadStatusLine):
+            # Raised when the connection closed before a status line was received
+            return sent and (error.line == "''" or error.line.startswith('No status line received'))
+        if isinstance(error, socket.error):
+            return error.errno in (errno.ECONNRESET, errno.EPIPE, errno.ECONNABORTED)
+        return False
+
+    def __str__(self):
+        return '<ConnectionPool maxsize=%s idle=%s>' % (self.maxsize, self.idle_count())
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Client side rate limiting of API requests.
+'''
+
+import threading
+import time
+
+__all__ = [
+    'TokenBucket',
+    'RateLimiter',
+]
+
+class TokenBucket(object):
+    '''
+    A thread safe token bucket.
+
+    rate      Tokens added per second.
+    capacity  The maximum number of tokens held, i.e. the largest burst.
+              Defaults to ``rate`` (one second worth of requests).
+    '''
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self._tokens = self.capacity
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        '''
+        Take ``tokens`` if they are available. Returns a tuple of (acquired,
+        wait) where ``wait`` is the number of seconds until they would be.
+        '''
+        with self._lock:
+            self._refill(time.time())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True, 0
+            return False, (tokens - self._tokens) / self.rate
+
+    def release(self, tokens=1):
+        ''' Give back ``tokens`` that were taken but not used. '''
+        with self._lock:
+            self._refill(time.time())
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def acquire(self, tokens=1, timeout=None):
+        '''
+        Block until ``tokens`` are available and take them. Returns False if
+        they could not be taken within ``timeout`` seconds.
+        '''
+        end = None if timeout is None else time.time() + timeout
+        while True:
+            acquired, wait = self.try_acquire(tokens)
+            if acquired:
+                return True
+            if end is not None:
+                remaining = end - time.time()
+                if remaining < wait:
+                    return False
+            time.sleep(wait)
+
+    def __str__(self):
+        return '<TokenBucket rate=%s capacity=%s>' % (self.rate, self.capacity)
+
+class RateLimiter(object):
+    '''
+    Limits the rate of requests sent by one or more ``KayakoAPI`` instances.
+
+    rate, capacity  Settings for a bucket shared by every request. If rate is
+                    None there is no overall limit.
+    controllers     A dictionary of controller path to a ``TokenBucket`` or to
+                    a ``(rate, capacity)`` tuple. A request to a controller
+                    also takes a token from the bucket of the longest
+                    configured controller path containing it, so
+                    ``'/Tickets/Ticket'`` limits ``/Tickets/Ticket/123/`` but
+                    not ``/Tickets/TicketSearch``.
+
+    A limiter is thread safe. Pass the same instance to every ``KayakoAPI``
+    talking to one host to limit them together::
+
+        >>> limiter = RateLimiter(rate=50, controllers={'/Tickets/TicketSearch': (1, 2)})
+        >>> api = KayakoAPI(API_URL, API_KEY, SECRET_KEY, rate_limiter=limiter)
+    '''
+
+    def __init__(self, rate=None, capacity=None, controllers=None):
+        self.bucket = TokenBucket(rate, capacity) if rate is not None else None
+        self.controllers = {}
+        for controller, bucket in (controllers or {}).iteritems():
+            self.set_limit(controller, bucket)
+
+    def set_limit(self, controller, bucket):
+        ''' Set the bucket for a controller path. '''
+        if not isinstance(bucket, TokenBucket):
+            bucket = TokenBucket(*bucket) if isinstance(bucket, (list, tuple)) else TokenBucket(bucket)
+        self.controllers[controller.rstrip('/')] = bucket
+
+    def bucket_for(self, controller):
+        ''' Return the controller bucket limiting a controller path, or None. '''
+        path = controller.rstrip('/')
+        while path:
+            bucket = self.controllers.get(path)
+            if bucket is not None:
+                return bucket
+            path = path.rpartition('/')[0]
+        return None
+
+    def acquire(self, controller, timeout=None):
+        '''
+        Block until a request to ``controller`` may be sent. Returns False if
+        it may not be sent within ``timeout`` seconds.
+        '''
+        end = None if timeout is None else time.time() + timeout
+        bucket = self.bucket_for(controller)
+        if bucket is not None and not bucket.acquire(timeout=timeout):
+            return False
+        if self.bucket is not None:
+            remaining = None if end is None else max(0, end - time.time())
+            if not self.bucket.acquire(timeout=remaining):
+                # The request is not sent, so its controller token is not used
+                if bucket is not None:
+                    bucket.release()
+                return False
+        return True
+
+    def __str__(self):
+        return '<RateLimiter %s controllers=%s>' % (self.bucket, len(self.controllers))
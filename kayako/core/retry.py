@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Retry policies for failed API requests.
+'''
+
+import collections
+import random
+import threading
+import time
+
+from kayako.exception import KayakoRequestError, KayakoResponseError
+
+__all__ = [
+    'RetryPolicy',
+    'RetryBudget',
+    'NO_RETRY',
+]
+
+class RetryBudget(object):
+    '''
+    Caps retries to a fraction of recent requests, so that retries cannot
+    multiply the load on a server that is already failing.
+
+    ratio    Retries allowed per request sent in the last ``window`` seconds.
+    minimum  Retries always allowed per ``window``, regardless of traffic.
+    window   The length of the sliding window in seconds.
+    '''
+
+    def __init__(self, ratio=0.2, minimum=10, window=10):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.window = window
+        self._lock = threading.Lock()
+        self._requests = collections.deque()
+        self._retries = collections.deque()
+
+    def _trim(self, now):
+        horizon = now - self.window
+        for events in (self._requests, self._retries):
+            while events and events[0] < horizon:
+                events.popleft()
+
+    def record_request(self):
+        ''' Record a request against the budget. '''
+        now = time.time()
+        with self._lock:
+            self._trim(now)
+            self._requests.append(now)
+
+    def withdraw(self):
+        ''' Return True and record a retry if the budget allows one. '''
+        now = time.time()
+        with self._lock:
+            self._trim(now)
+            if len(self._retries) < self.minimum + self.ratio * len(self._requests):
+                self._retries.append(now)
+                return True
+            return False
+
+    def __str__(self):
+        return '<RetryBudget ratio=%s minimum=%s window=%s>' % (self.ratio, self.minimum, self.window)
+
+class RetryPolicy(object):
+    '''
+    Decides whether and when a failed request is retried.
+
+    max_attempts   Total attempts per request, including the first.
+    backoff        Delay in seconds before the first retry. Doubles with every
+                   further retry.
+    max_backoff    Upper bound for the delay in seconds.
+    jitter         Fraction of the delay that is randomized (0 to 1). The
+                   default of 1 picks a delay uniformly between 0 and the
+                   backoff, spreading out retries from many clients.
+    methods        HTTP methods that may be retried. POST is not idempotent
+                   and is only retried when listed explicitly.
+    status_codes   HTTP status codes that are retried. Connection errors are
+                   always retried for the listed methods.
+    budget_ratio, budget_minimum, budget_window
+                   Settings for the RetryBudget each KayakoAPI creates from
+                   this policy. See RetryBudget.
+    '''
+
+    def __init__(self, max_attempts=3, backoff=0.5, max_backoff=30, jitter=1.0, methods=('GET',), status_codes=(500, 502, 503, 504), budget_ratio=0.2, budget_minimum=10,
+                 budget_window=10):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.methods = frozenset(methods)
+        self.status_codes = frozenset(status_codes)
+        self.budget_ratio = budget_ratio
+        self.budget_minimum = budget_minimum
+        self.budget_window = budget_window
+        self.random = random.Random()
+
+    def create_budget(self):
+        ''' Return a new RetryBudget using this policy's budget settings. '''
+        return RetryBudget(ratio=self.budget_ratio, minimum=self.budget_minimum, window=self.budget_window)
+
+    def should_retry(self, method, error, attempt):
+        '''
+        Returns whether a request with the given method that failed with
+        ``error`` on attempt number ``attempt`` should be retried.
+        '''
+        if attempt >= self.max_attempts or method not in self.methods:
+            return False
+        if isinstance(error, KayakoResponseError):
+            return getattr(error, 'code', None) in self.status_codes
+        return isinstance(error, KayakoRequestError)
+
+    def delay(self, attempt):
+        ''' Returns the number of seconds to wait after attempt ``attempt``. '''
+        delay = min(self.max_backoff, self.backoff * (2 ** (attempt - 1)))
+        return delay - delay * self.jitter * self.random.random()
+
+    def __str__(self):
+        return '<RetryPolicy max_attempts=%s methods=%s>' % (self.max_attempts, ','.join(sorted(self.methods)))
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+''' A RetryPolicy that never retries. '''
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+De-duplication of identical concurrent calls.
+'''
+
+import sys
+import threading
+
+from kayako.exception import KayakoDeadlineExceededError
+
+__all__ = [
+    'SingleFlight',
+]
+
+class _Call(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exc_info = None
+
+class SingleFlight(object):
+    '''
+    Runs at most one call per key at a time. Threads calling ``do`` with a key
+    that is already in flight wait for that call and share its result, or
+    its exception.
+
+    ``calls`` counts the calls that were run and ``shared`` the calls that
+    waited for another one instead.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, function, args=(), timeout=None):
+        '''
+        Return ``function(*args)``, sharing in-flight calls by key. A thread
+        waiting for another call raises ``KayakoDeadlineExceededError`` if it
+        does not finish within ``timeout`` seconds.
+        '''
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise KayakoDeadlineExceededError('Timed out waiting for a shared request')
+            if call.exc_info is not None:
+                raise call.exc_info[0], call.exc_info[1], call.exc_info[2]
+            return call.result
+
+        try:
+            call.result = function(*args)
+            return call.result
+        except:
+            call.exc_info = sys.exc_info()
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        ''' Return the number of calls currently in flight. '''
+        with self._lock:
+            return len(self._calls)
+
+    def __str__(self):
+        return '<SingleFlight in_flight=%s calls=%s shared=%s>' % (self.in_flight(), self.calls, self.shared)
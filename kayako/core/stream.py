@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Incremental parsing of list responses.
+'''
+
+from lxml import etree
+
+__all__ = [
+    'iter_nodes',
+]
+
+def iter_nodes(response, tag):
+    '''
+    Parse a response with ``etree.iterparse``, yielding each ``tag`` child of
+    the root element as soon as it is closed. Once the consumer moves on, the
+    element is cleared and removed from the tree, so memory use does not grow
+    with the number of elements in the response.
+
+    The response is closed when the generator is exhausted or closed.
+    '''
+    try:
+        for event, node in etree.iterparse(response, events=('end',), tag=tag, huge_tree=True):
+            parent = node.getparent()
+            if parent is None or parent.getparent() is not None:
+                # Only direct children of the root element
+                continue
+            yield node
+            node.clear()
+            # Drop this and any earlier children (whitespace, other tags)
+            while node.getprevious() is not None:
+                del parent[0]
+            parent.remove(node)
+    finally:
+        response.close()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+HTTP transports used by KayakoAPI to send signed requests.
+
+A transport takes a fully signed request (method, URL, body and headers) and
+returns a response object with:
+
+    code, msg     The HTTP status code and reason.
+    info()        The response headers, supporting ``getheader(name)``.
+    read([n])     The response body stream.
+    getcode(), geturl(), close()
+
+Responses are returned for every HTTP status; connection failures raise
+``KayakoRequestError``.
+'''
+
+import httplib
+import socket
+import urllib2
+from StringIO import StringIO
+
+from kayako.core.pool import ConnectionPool
+from kayako.exception import KayakoRequestError
+
+__all__ = [
+    'Transport',
+    'UrllibTransport',
+    'PooledTransport',
+    'InProcessTransport',
+    'ResponseHeaders',
+]
+
+class Transport(object):
+    ''' Base class for transports. '''
+
+    def send(self, method, url, body=None, headers=None, timeout=None):
+        '''
+        Send a request and return its response. ``body`` is None, a string or
+        a file-like object. ``timeout`` is None or a tuple of the connect and
+        read timeouts in seconds, either of which may be None for no timeout.
+        '''
+        raise NotImplementedError()
+
+    def close(self):
+        ''' Release any resources (connections) held by this transport. '''
+        pass
+
+    def __str__(self):
+        return '<%s>' % self.__class__.__name__
+
+class UrllibTransport(Transport):
+    '''
+    Opens a new connection with urllib2 for every request. urllib2 has a
+    single socket timeout, so the larger of the connect and read timeouts is
+    used for both, or the one that is set if the other is None.
+    '''
+
+    def send(self, method, url, body=None, headers=None, timeout=None):
+        request = urllib2.Request(url, data=body, headers=headers or {})
+        request.get_method = lambda: method
+        timeouts = [value for value in timeout or () if value is not None]
+        if timeouts:
+            timeout = max(timeouts)
+        else:
+            timeout = socket._GLOBAL_DEFAULT_TIMEOUT
+        try:
+            return urllib2.urlopen(request, timeout=timeout)
+        except urllib2.HTTPError, error:
+            # HTTPError doubles as the response
+            return error
+        except (urllib2.URLError, socket.error, httplib.HTTPException), error:
+            raise KayakoRequestError(error)
+
+class PooledTransport(Transport):
+    '''
+    Sends requests over persistent keep-alive connections from a
+    ``ConnectionPool``. See ``ConnectionPool`` for ``maxsize`` and
+    ``idle_timeout``.
+    '''
+
+    def __init__(self, maxsize=10, idle_timeout=60):
+        self.pool = ConnectionPool(maxsize=maxsize, idle_timeout=idle_timeout)
+
+    def send(self, method, url, body=None, headers=None, timeout=None):
+        try:
+            return self.pool.urlopen(method, url, body=body, headers=headers, timeout=timeout)
+        except (socket.error, httplib.HTTPException), error:
+            raise KayakoRequestError(error)
+
+    def close(self):
+        self.pool.clear()
+
+    def __str__(self):
+        return '<PooledTransport %s>' % self.pool
+
+class ResponseHeaders(dict):
+    ''' A case-insensitive dictionary of response headers. '''
+
+    def __init__(self, headers=None):
+        dict.__init__(self)
+        for name, value in (headers or {}).iteritems():
+            self[name] = value
+
+    def __setitem__(self, name, value):
+        dict.__setitem__(self, name.lower(), value)
+
+    def __getitem__(self, name):
+        return dict.__getitem__(self, name.lower())
+
+    def __contains__(self, name):
+        return dict.__contains__(self, name.lower())
+
+    def getheader(self, name, default=None):
+        return dict.get(self, name.lower(), default)
+
+    get = getheader
+
+class InProcessResponse(object):
+    ''' The response returned by InProcessTransport. '''
+
+    def __init__(self, url, code, msg, headers, body):
+        self.code = code
+        self.msg = msg
+        self.headers = headers
+        self._url = url
+        self._body = body
+
+    def read(self, amt=None):
+        return self._body.read() if amt is None else self._body.read(amt)
+
+    def getcode(self):
+        return self.code
+
+    def info(self):
+        return self.headers
+
+    def geturl(self):
+        return self._url
+
+    def close(self):
+        pass
+
+class InProcessTransport(Transport):
+    '''
+    Dispatches requests to a Python callable instead of the network, to test
+    or benchmark the library without a Kayako server.
+
+    The handler is called as ``handler(method, url, body, headers)`` with the
+    body read into a string (or None); timeouts do not apply. It returns
+    either a response body string (status 200), or a tuple of ``(status,
+    headers, body)`` where body is a string or a file-like object.
+    '''
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    def send(self, method, url, body=None, headers=None, timeout=None):
+        if body is not None and hasattr(body, 'read'):
+            body = body.read()
+        result = self.handler(method, url, body, dict(headers or {}))
+        if isinstance(result, basestring):
+            code, response_headers, response_body = 200, {}, result
+        else:
+            code, response_headers, response_body = result
+        if isinstance(response_body, basestring):
+            response_body = StringIO(response_body)
+        return InProcessResponse(url, code, httplib.responses.get(code, ''), ResponseHeaders(response_headers), response_body)
+
+    def __str__(self):
+        return '<InProcessTransport %r>' % (self.handler,)
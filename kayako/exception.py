@@ -50,4 +50,27 @@ class KayakoMethodNotImplementedError(KayakoRequestError):
 # RESPONSE ERROR
 
 class KayakoResponseError(KayakoIOError):
+
+    code = None
+    ''' The HTTP status code of the response, if the server sent one. '''
+
+# CIRCUIT BREAKER
+
+class KayakoCircuitOpenError(KayakoIOError):
+    '''
+    Raised without sending a request while the circuit breaker of its
+    controller is open.
+    '''
+
+    def __init__(self, controller, retry_after):
+        KayakoIOError.__init__(self, 'Circuit open for %s, retry in %.1fs' % (controller, retry_after))
+        self.controller = controller
+        self.retry_after = retry_after
+
+# DEADLINES
+
+class KayakoDeadlineExceededError(KayakoIOError):
+    '''
+    Raised when the deadline of an operation passes before it completes.
+    '''
     pass
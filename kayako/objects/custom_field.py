@@ -79,7 +79,7 @@ class CustomField(KayakoObject):
 	def get_all(cls, api):
 		response = api._request('%s' % (cls.controller), 'GET')
 		tree = etree.parse(response)
-		return [CustomField(api, **cls._parse_custom_field(custom_field_tree)) for custom_field_tree in tree.findall('customfield')]
+		return [CustomField._from_parameters(api, cls._parse_custom_field(custom_field_tree)) for custom_field_tree in tree.findall('customfield')]
 
 	@classmethod
 	def get(cls, api, customfieldid):
@@ -89,7 +89,7 @@ class CustomField(KayakoObject):
 		if node is None:
 			return None
 		params = cls._parse_custom_field(node)
-		return CustomField(api, **params)
+		return CustomField._from_parameters(api, params)
 
 	def __str__(self):
 		return '<CustomField (%s): %s>' % (self.id, self.fieldname)
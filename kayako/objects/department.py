@@ -13,6 +13,7 @@ Created on May 5, 2011
 from lxml import etree
 
 from kayako.core.object import KayakoObject
+from kayako.core.schema import BOOLEAN, INT, NODE, Field, Schema
 
 __all__ = [
     'Department',
@@ -42,56 +43,50 @@ class Department(KayakoObject):
     __save_parameters__ = ['title', 'type', 'displayorder', 'parentdepartmentid', 'uservisibilitycustom', 'usergroupid']
 
 
+    __schema__ = Schema([
+        Field('id', INT),
+        Field('title'),
+        Field('type'),
+        Field('module'),
+        Field('displayorder', INT),
+        Field('parentdepartmentid', INT, required=False),
+        Field('uservisibilitycustom', BOOLEAN),
+        Field('usergroupid', NODE, source='usergroups'),
+    ])
+
     @classmethod
-    def _parse_department(cls, department_tree):
-        usergroups = []
-        usergroups_node = department_tree.find('usergroups')
-        if usergroups_node is not None:
-            for id_node in usergroups_node.findall('id'):
-                id = cls._get_int(id_node)
-                usergroups.append(id)
-
-        params = dict(
-            id=cls._get_int(department_tree.find('id')),
-            title=cls._get_string(department_tree.find('title')),
-            type=cls._get_string(department_tree.find('type')),
-            module=cls._get_string(department_tree.find('module')),
-            displayorder=cls._get_int(department_tree.find('displayorder')),
-            parentdepartmentid=cls._get_int(department_tree.find('parentdepartmentid'), required=False),
-            uservisibilitycustom=cls._get_boolean(department_tree.find('uservisibilitycustom')),
-            usergroupid=usergroups,
-        )
+    def _parse_usergroups(cls, usergroups_node):
+        return [cls._get_int(id_node) for id_node in usergroups_node.findall('id')]
+
+    @classmethod
+    def _parse_node(cls, api, node, schema, **parameters):
+        params = super(Department, cls)._parse_node(api, node, schema, **parameters)
+        if 'usergroupid' in params:
+            usergroups_node = params['usergroupid']
+            params['usergroupid'] = cls._parse_usergroups(usergroups_node) if usergroups_node is not None else []
         return params
 
+    @classmethod
+    def _parse_department(cls, department_tree):
+        return cls._parse_node(None, department_tree, cls.__schema__)
+
+    def _decode(self, name, node, children):
+        value = KayakoObject._decode(self, name, node, children)
+        if name == 'usergroupid':
+            return self._parse_usergroups(value) if value is not None else []
+        return value
+
     def _update_from_response(self, department_tree):
+        self._api_schema(self.api).update(self, department_tree)
         usergroups_node = department_tree.find('usergroups')
         if usergroups_node is not None:
-            usergroups = []
-            for id_node in usergroups_node.findall('id'):
-                id = self._get_int(id_node)
-                usergroups.append(id)
-            self.usergroupid = usergroups
-
-        for int_node in ['id', 'displayorder', 'parentdepartmentid']:
-            node = department_tree.find(int_node)
-            if node is not None:
-                setattr(self, int_node, self._get_int(node, required=False))
-
-        for str_node in ['title', 'type', 'module']:
-            node = department_tree.find(str_node)
-            if node is not None:
-                setattr(self, str_node, self._get_string(node))
-
-        for bool_node in ['uservisibilitycustom']:
-            node = department_tree.find(bool_node)
-            if node is not None:
-                setattr(self, bool_node, self._get_boolean(node, required=False))
+            self.usergroupid = self._parse_usergroups(usergroups_node)
 
     @classmethod
-    def get_all(cls, api):
+    def get_all(cls, api, fields=None):
         response = api._request(cls.controller, 'GET')
         tree = etree.parse(response)
-        return [Department(api, **cls._parse_department(department_tree)) for department_tree in tree.findall('department')]
+        return [cls._load(api, department_tree, fields) for department_tree in tree.findall('department')]
 
     @classmethod
     def get(cls, api, id):
@@ -100,8 +95,7 @@ class Department(KayakoObject):
         node = tree.find('department')
         if node is None:
             return None
-        params = cls._parse_department(node)
-        return Department(api, **params)
+        return cls._load(api, node)
 
     def add(self):
         response = self._add(self.controller)
@@ -14,6 +14,7 @@ from lxml import etree
 
 from kayako.core.lib import UnsetParameter
 from kayako.core.object import KayakoObject
+from kayako.core.paginate import iter_offset_pages
 from kayako.exception import KayakoRequestError, KayakoResponseError
 
 
@@ -129,7 +130,17 @@ class KnowledgebaseArticle(KayakoObject):
 	def get_all(cls, api, categoryid, count=100, start=0):
 		response = api._request('%s/ListAll/%s/%s/%s' % (cls.controller, categoryid, count, start), 'GET')
 		tree = etree.parse(response)
-		return [KnowledgebaseArticle(api, **cls._parse_knowledgebase_article(api, knowledgebase_article_tree)) for knowledgebase_article_tree in tree.findall('kbarticle')]
+		return [KnowledgebaseArticle._from_parameters(api, cls._parse_knowledgebase_article(api, knowledgebase_article_tree)) for knowledgebase_article_tree in tree.findall('kbarticle')]
+
+	@classmethod
+	def iter_all(cls, api, categoryid, page_size=100, start=0, prefetch=0):
+		'''
+		Iterate over all articles of a category, requesting ``page_size``
+		articles at a time, from offset ``start``, as they are consumed. With
+		``prefetch``, up to that many pages are fetched ahead.
+		'''
+		fetch = api._bind_deadline(lambda count, start: cls.get_all(api, categoryid, count=count, start=start))
+		return iter_offset_pages(fetch, page_size, start, prefetch)
 
 	@classmethod
 	def get(cls, api, id):
@@ -139,7 +150,7 @@ class KnowledgebaseArticle(KayakoObject):
 		if node is None:
 			return None
 		params = cls._parse_knowledgebase_article(api, node)
-		return KnowledgebaseArticle(api, **params)
+		return KnowledgebaseArticle._from_parameters(api, params)
 
 	def add(self):
 		'''
@@ -178,7 +189,7 @@ class KnowledgebaseArticle(KayakoObject):
 			if required_parameter not in parameters:
 				raise KayakoRequestError('Cannot add %s: Missing required field: %s.' % (self.__class__.__name__, required_parameter))
 
-		response = self.api._request(self.controller, 'POST', **parameters)
+		response = self.api._request(self.controller, 'POST', _encoder=self._form_encoder('add'), **parameters)
 		tree = etree.parse(response)
 		node = tree.find('kbarticle')
 		self._update_from_response(node)
@@ -10,6 +10,7 @@ Created on Jan 30, 2014
 @author: Ravi Sharma <ravi.sharma@kayako.com>
 '''
 
+from kayako.core.attachment import Base64FileContents, download_attachment
 from kayako.core.lib import UnsetParameter
 from kayako.core.object import KayakoObject
 from kayako.exception import KayakoRequestError, KayakoResponseError
@@ -79,7 +80,7 @@ class KnowledgebaseAttachment(KayakoObject):
 		'''
 		response = api._request('%s/ListAll/%s' % (cls.controller, kbarticleid), 'GET')
 		tree = etree.parse(response)
-		return [KnowledgebaseAttachment(api, **cls._parse_knowledgebase_attachment(knowledgebase_attachment_tree)) for knowledgebase_attachment_tree in tree.findall('kbattachment')]
+		return [KnowledgebaseAttachment._from_parameters(api, cls._parse_knowledgebase_attachment(knowledgebase_attachment_tree)) for knowledgebase_attachment_tree in tree.findall('kbattachment')]
 
 	@classmethod
 	def get(cls, api, kbarticleid, attachmentid):
@@ -95,7 +96,29 @@ class KnowledgebaseAttachment(KayakoObject):
 		if node is None:
 			return None
 		params = cls._parse_knowledgebase_attachment(node)
-		return KnowledgebaseAttachment(api, **params)
+		return KnowledgebaseAttachment._from_parameters(api, params)
+
+	@classmethod
+	def download(cls, api, kbarticleid, attachmentid, output):
+		'''
+		Download the contents of an attachment into ``output``, a writable
+		file-like object or a file path, without holding them in memory.
+
+		Returns the attachment without its ``contents``, or None if it does
+		not exist. Raises KayakoResponseError if the size of the downloaded
+		contents does not match ``filesize``.
+		'''
+		try:
+			response = api._request('%s/%s/%s/' % (cls.controller, kbarticleid, attachmentid), 'GET', _stream=True)
+		except KayakoResponseError, error:
+			if 'HTTP Error 404' in str(error):
+				return None
+			else:
+				raise
+		node = download_attachment(response, 'kbattachment', output)
+		if node is None:
+			return None
+		return KnowledgebaseAttachment._from_parameters(api, cls._parse_knowledgebase_attachment(node))
 
 	def add(self):
 		'''
@@ -111,6 +134,24 @@ class KnowledgebaseAttachment(KayakoObject):
 		node = tree.find('kbattachment')
 		self._update_from_response(node)
 
+	def add_from_file(self, source):
+		'''
+		Add this attachment with its contents read from ``source``, a file
+		path, a file object or an ``mmap``. The contents are base64 and form
+		encoded while they are sent, so memory use does not depend on the size
+		of the file. ``filename`` defaults to the name of the source file.
+		'''
+		contents = Base64FileContents(source)
+		try:
+			if not self.filename and contents.filename:
+				self.filename = contents.filename
+			self.contents = contents
+			self.add()
+		finally:
+			contents.close()
+			if self.contents is contents:
+				self.contents = None
+
 	def delete(self):
 		if self.kbarticleid is None or self.kbarticleid is UnsetParameter:
 			raise KayakoRequestError('Cannot delete a Attachment without being attached to a . The ID of the  (kbarticleid) has not been specified.')
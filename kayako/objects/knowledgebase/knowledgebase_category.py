@@ -14,6 +14,7 @@ from lxml import etree
 
 from kayako.core.lib import UnsetParameter
 from kayako.core.object import KayakoObject
+from kayako.core.paginate import iter_offset_pages
 from kayako.exception import KayakoRequestError, KayakoResponseError
 
 
@@ -112,7 +113,17 @@ class KnowledgebaseCategory(KayakoObject):
 	def get_all(cls, api, count=100, start=0):
 		response = api._request('%s/ListAll/%s/%s/' % (cls.controller, count, start), 'GET')
 		tree = etree.parse(response)
-		return [KnowledgebaseCategory(api, **cls._parse_knowledgebase_category(api, _parse_knowledgebase_category)) for _parse_knowledgebase_category in tree.findall('kbcategory')]
+		return [KnowledgebaseCategory._from_parameters(api, cls._parse_knowledgebase_category(api, _parse_knowledgebase_category)) for _parse_knowledgebase_category in tree.findall('kbcategory')]
+
+	@classmethod
+	def iter_all(cls, api, page_size=100, start=0, prefetch=0):
+		'''
+		Iterate over all categories, requesting ``page_size`` categories at a
+		time, from offset ``start``, as they are consumed. With ``prefetch``,
+		up to that many pages are fetched ahead.
+		'''
+		fetch = api._bind_deadline(lambda count, start: cls.get_all(api, count=count, start=start))
+		return iter_offset_pages(fetch, page_size, start, prefetch)
 
 	@classmethod
 	def get(cls, api, id):
@@ -122,7 +133,7 @@ class KnowledgebaseCategory(KayakoObject):
 		if node is None:
 			return None
 		params = cls._parse_knowledgebase_category(api, node)
-		return KnowledgebaseCategory(api, **params)
+		return KnowledgebaseCategory._from_parameters(api, params)
 
 	def add(self):
 		response = self._add(self.controller)
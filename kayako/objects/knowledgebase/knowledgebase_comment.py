@@ -100,7 +100,7 @@ class KnowledgebaseComment(KayakoObject):
 		'''
 		response = api._request('%s/ListAll/%s' % (cls.controller, knowledgebasearticleid), 'GET')
 		tree = etree.parse(response)
-		return [KnowledgebaseComment(api, **cls._parse_knowledgebase_comment(knowledgebase_comment_tree, knowledgebasearticleid)) for knowledgebase_comment_tree in tree.findall('kbarticlecomment')]
+		return [KnowledgebaseComment._from_parameters(api, cls._parse_knowledgebase_comment(knowledgebase_comment_tree, knowledgebasearticleid)) for knowledgebase_comment_tree in tree.findall('kbarticlecomment')]
 
 	@classmethod
 	def get(cls, api, knowledgebasearticleid, id):
@@ -116,7 +116,7 @@ class KnowledgebaseComment(KayakoObject):
 		if node is None:
 			return None
 		params = cls._parse_knowledgebase_comment(node, knowledgebasearticleid)
-		return KnowledgebaseComment(api, **params)
+		return KnowledgebaseComment._from_parameters(api, params)
 
 	def add(self):
 		'''
@@ -141,7 +141,7 @@ class KnowledgebaseComment(KayakoObject):
 			if required_parameter not in parameters:
 				raise KayakoRequestError('Cannot add %s: Missing required field: %s.' % (self.__class__.__name__, required_parameter))
 
-		response = self.api._request(self.controller, 'POST', **parameters)
+		response = self.api._request(self.controller, 'POST', _encoder=self._form_encoder('add'), **parameters)
 		tree = etree.parse(response)
 		node = tree.find('kbarticlecomment')
 		self._update_from_response(node)
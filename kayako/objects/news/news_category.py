@@ -14,6 +14,7 @@ from lxml import etree
 
 from kayako.core.lib import UnsetParameter
 from kayako.core.object import KayakoObject
+from kayako.core.paginate import iter_offset_pages
 from kayako.exception import KayakoRequestError, KayakoResponseError
 
 
@@ -65,7 +66,17 @@ class NewsCategory(KayakoObject):
 	def get_all(cls, api, count=100, start=0):
 		response = api._request('%s/ListAll/%s/%s/' % (cls.controller, count, start), 'GET')
 		tree = etree.parse(response)
-		return [NewsCategory(api, **cls._parse_news_category(api, news_category_tree)) for news_category_tree in tree.findall('newscategory')]
+		return [NewsCategory._from_parameters(api, cls._parse_news_category(api, news_category_tree)) for news_category_tree in tree.findall('newscategory')]
+
+	@classmethod
+	def iter_all(cls, api, page_size=100, start=0, prefetch=0):
+		'''
+		Iterate over all categories, requesting ``page_size`` categories at a
+		time, from offset ``start``, as they are consumed. With ``prefetch``,
+		up to that many pages are fetched ahead.
+		'''
+		fetch = api._bind_deadline(lambda count, start: cls.get_all(api, count=count, start=start))
+		return iter_offset_pages(fetch, page_size, start, prefetch)
 
 	@classmethod
 	def get(cls, api, id):
@@ -75,7 +86,7 @@ class NewsCategory(KayakoObject):
 		if node is None:
 			return None
 		params = cls._parse_news_category(api, node)
-		return NewsCategory(api, **params)
+		return NewsCategory._from_parameters(api, params)
 
 	def add(self):
 		'''
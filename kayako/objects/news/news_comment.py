@@ -83,7 +83,7 @@ class NewsComment(KayakoObject):
 	def get_all(cls, api, newsitemid):
 		response = api._request('%s/ListAll/%s' % (cls.controller, newsitemid), 'GET')
 		tree = etree.parse(response)
-		return [NewsComment(api, **cls._parse_news_comment(api, news_comment_tree)) for news_comment_tree in tree.findall('newsitemcomment')]
+		return [NewsComment._from_parameters(api, cls._parse_news_comment(api, news_comment_tree)) for news_comment_tree in tree.findall('newsitemcomment')]
 
 
 	@classmethod
@@ -94,7 +94,7 @@ class NewsComment(KayakoObject):
 		if node is None:
 			return None
 		params = cls._parse_news_comment(api, node)
-		return NewsComment(api, **params)
+		return NewsComment._from_parameters(api, params)
 
 	def add(self):
 		parameters = self.add_parameters
@@ -103,7 +103,7 @@ class NewsComment(KayakoObject):
 			if required_parameter not in parameters:
 				raise KayakoRequestError('Cannot add %s: Missing required field: %s.' % (self.__class__.__name__, required_parameter))
 
-		response = self.api._request(self.controller, 'POST', **parameters)
+		response = self.api._request(self.controller, 'POST', _encoder=self._form_encoder('add'), **parameters)
 		tree = etree.parse(response)
 		node = tree.find('newsitemcomment')
 		self._update_from_response(node)
@@ -145,7 +145,7 @@ class NewsItem(KayakoObject):
 	def get_all(cls, api, categoryid):
 		response = api._request('%s/ListAll/%s' % (cls.controller, categoryid), 'GET')
 		tree = etree.parse(response)
-		return [NewsItem(api, **cls._parse_news_item(api, news_item_tree)) for news_item_tree in tree.findall('newsitem')]
+		return [NewsItem._from_parameters(api, cls._parse_news_item(api, news_item_tree)) for news_item_tree in tree.findall('newsitem')]
 
 
 	@classmethod
@@ -156,7 +156,7 @@ class NewsItem(KayakoObject):
 		if node is None:
 			return None
 		params = cls._parse_news_item(api, node)
-		return NewsItem(api, **params)
+		return NewsItem._from_parameters(api, params)
 
 	def add(self):
 		parameters = self.add_parameters
@@ -165,7 +165,7 @@ class NewsItem(KayakoObject):
 			if required_parameter not in parameters:
 				raise KayakoRequestError('Cannot add %s: Missing required field: %s.' % (self.__class__.__name__, required_parameter))
 
-		response = self.api._request(self.controller, 'POST', **parameters)
+		response = self.api._request(self.controller, 'POST', _encoder=self._form_encoder('add'), **parameters)
 		tree = etree.parse(response)
 		node = tree.find('newsitem')
 		self._update_from_response(node)
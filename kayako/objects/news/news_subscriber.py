@@ -74,7 +74,7 @@ class NewsSubscriber(KayakoObject):
 	def get_all(cls, api):
 		response = api._request('%s' % (cls.controller), 'GET')
 		tree = etree.parse(response)
-		return [NewsSubscriber(api, **cls._parse_news_subscriber(api, news_subscriber_tree)) for news_subscriber_tree in tree.findall('newssubscriber')]
+		return [NewsSubscriber._from_parameters(api, cls._parse_news_subscriber(api, news_subscriber_tree)) for news_subscriber_tree in tree.findall('newssubscriber')]
 
 
 	@classmethod
@@ -85,7 +85,7 @@ class NewsSubscriber(KayakoObject):
 		if node is None:
 			return None
 		params = cls._parse_news_subscriber(api, node)
-		return NewsSubscriber(api, **params)
+		return NewsSubscriber._from_parameters(api, params)
 
 	def add(self):
 		parameters = self.add_parameters
@@ -94,7 +94,7 @@ class NewsSubscriber(KayakoObject):
 			if required_parameter not in parameters:
 				raise KayakoRequestError('Cannot add %s: Missing required field: %s.' % (self.__class__.__name__, required_parameter))
 
-		response = self.api._request(self.controller, 'POST', **parameters)
+		response = self.api._request(self.controller, 'POST', _encoder=self._form_encoder('add'), **parameters)
 		tree = etree.parse(response)
 		node = tree.find('newssubscriber')
 		self._update_from_response(node)
@@ -13,6 +13,7 @@ Created on May 9, 2011
 from lxml import etree
 
 from kayako.core.object import KayakoObject
+from kayako.core.schema import BOOLEAN, INT, Field, Schema
 
 __all__ = [
     'Staff',
@@ -63,47 +64,35 @@ class Staff(KayakoObject):
     __required_save_parameters__ = ['firstname', 'lastname']
     __save_parameters__ = ['firstname', 'lastname', 'username', 'email', 'password', 'staffgroupid', 'designation', 'mobilenumber', 'signature', 'isenabled', 'greeting', 'timezone', 'enabledst']
 
+    __schema__ = Schema([
+        Field('id', INT, required=False),
+        Field('firstname'),
+        Field('lastname'),
+        Field('username'),
+        #password is never present in the response
+        Field('staffgroupid', INT),
+        Field('email'),
+        Field('designation'),
+        Field('mobilenumber'),
+        Field('signature'),
+        Field('isenabled', BOOLEAN),
+        Field('greeting'),
+        Field('timezone'),
+        Field('enabledst', BOOLEAN),
+    ])
+
     @classmethod
     def _parse_staff(cls, staff_tree):
-        params = dict(
-            id=cls._get_int(staff_tree.find('id'), required=False),
-            firstname=cls._get_string(staff_tree.find('firstname')),
-            lastname=cls._get_string(staff_tree.find('lastname')),
-            username=cls._get_string(staff_tree.find('username')),
-            #password is never present in the response
-            staffgroupid=cls._get_int(staff_tree.find('staffgroupid')),
-            email=cls._get_string(staff_tree.find('email')),
-            designation=cls._get_string(staff_tree.find('designation')),
-            mobilenumber=cls._get_string(staff_tree.find('mobilenumber')),
-            signature=cls._get_string(staff_tree.find('signature')),
-            isenabled=cls._get_boolean(staff_tree.find('isenabled')),
-            greeting=cls._get_string(staff_tree.find('greeting')),
-            timezone=cls._get_string(staff_tree.find('timezone')),
-            enabledst=cls._get_boolean(staff_tree.find('enabledst')),
-        )
-        return params
+        return cls.__schema__.parse(staff_tree)
 
     def _update_from_response(self, staff_tree):
-        for int_node in ['id', 'staffgroupid']:
-            node = staff_tree.find(int_node)
-            if node is not None:
-                setattr(self, int_node, self._get_int(node, required=False))
-
-        for str_node in ['firstname', 'lastname', 'username', 'email', 'designation', 'mobilenumber', 'signature', 'greeting', 'timezone', ]:
-            node = staff_tree.find(str_node)
-            if node is not None:
-                setattr(self, str_node, self._get_string(node))
-
-        for bool_node in ['isenabled', 'enabledst', ]:
-            node = staff_tree.find(bool_node)
-            if node is not None:
-                setattr(self, bool_node, self._get_boolean(node, required=False))
+        self._api_schema(self.api).update(self, staff_tree)
 
     @classmethod
-    def get_all(cls, api):
+    def get_all(cls, api, fields=None):
         response = api._request(cls.controller, 'GET')
         tree = etree.parse(response)
-        return [Staff(api, **cls._parse_staff(staff_tree)) for staff_tree in tree.findall('staff')]
+        return [cls._load(api, staff_tree, fields) for staff_tree in tree.findall('staff')]
 
     @classmethod
     def get(cls, api, id):
@@ -112,8 +101,7 @@ class Staff(KayakoObject):
         node = tree.find('staff')
         if node is None:
             return None
-        params = cls._parse_staff(node)
-        return Staff(api, **params)
+        return cls._load(api, node)
 
     def add(self):
         response = self._add(self.controller)
@@ -183,7 +171,7 @@ class StaffGroup(KayakoObject):
     def get_all(cls, api):
         response = api._request(cls.controller, 'GET')
         tree = etree.parse(response)
-        return [StaffGroup(api, **cls._parse_staff_group(staff_group_tree)) for staff_group_tree in tree.findall('staffgroup')]
+        return [StaffGroup._from_parameters(api, cls._parse_staff_group(staff_group_tree)) for staff_group_tree in tree.findall('staffgroup')]
 
     @classmethod
     def get(cls, api, id):
@@ -193,7 +181,7 @@ class StaffGroup(KayakoObject):
         if node is None:
             return None
         params = cls._parse_staff_group(node)
-        return StaffGroup(api, **params)
+        return StaffGroup._from_parameters(api, params)
 
     def add(self):
         response = self._add(self.controller)
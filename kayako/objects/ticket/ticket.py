@@ -12,13 +12,20 @@ Created on Jun 8, 2011
 
 from lxml import etree
 
-from kayako.core.lib import UnsetParameter
+from kayako.core.lib import LazyList, UnsetParameter
 from kayako.core.object import KayakoObject
+from kayako.core.paginate import iter_offset_pages
+from kayako.core.schema import BOOLEAN, DATE, INT, NODE, NODES, Field, Schema
+from kayako.core.stream import iter_nodes
 from kayako.objects.ticket.ticket_note import TicketNote
 from kayako.objects.ticket.ticket_post import TicketPost
 from kayako.objects.ticket.ticket_time_track import TicketTimeTrack
 from kayako.exception import KayakoRequestError, KayakoResponseError
 
+_NESTED = ('workflows', 'watchers')
+''' Ticket fields built from the attributes of child elements. '''
+_COLLECTIONS = ('notes', 'timetracks', 'posts')
+''' Ticket fields holding a ``LazyList`` of objects. '''
 
 class Ticket(KayakoObject):
 	'''
@@ -94,99 +101,141 @@ class Ticket(KayakoObject):
 
 	__save_parameters__ = ['subject', 'fullname', 'email', 'departmentid', 'ticketstatusid', 'ticketpriorityid', 'ownerstaffid', 'userid', 'autouserid']
 
-	@classmethod
-	def _parse_ticket(cls, api, ticket_tree):
-
-		ticketid = cls._parse_int(ticket_tree.get('id'))
-
-		workflows = [dict(id=workflow_node.get('id'), title=workflow_node.get('title')) for workflow_node in ticket_tree.findall('workflow')]
-		watchers = [dict(staffid=watcher_node.get('staffid'), name=watcher_node.get('name')) for watcher_node in ticket_tree.findall('watcher')]
-		notes = [TicketNote(api, **TicketNote._parse_ticket_note(ticket_note_tree, ticketid)) for ticket_note_tree in ticket_tree.findall('note') if ticket_note_tree.get('type') == 'ticket']
-		timetracks = [TicketTimeTrack(api, **TicketTimeTrack._parse_ticket_time_track(ticket_time_track_tree, ticketid)) for ticket_time_track_tree in ticket_tree.findall('note') if
-		              ticket_note_tree.get('type') == 'timetrack']
-
-		posts = []
-		posts_node = ticket_tree.find('posts')
-		if posts_node is not None:
-			posts = [TicketPost(api, **TicketPost._parse_ticket_post(ticket_post_tree, ticketid)) for ticket_post_tree in posts_node.findall('post')]
-
-		params = dict(
-			id=ticketid,
-			subject=cls._get_string(ticket_tree.find('subject')),
-			fullname=cls._get_string(ticket_tree.find('fullname')),
-			email=cls._get_string(ticket_tree.find('email')),
-			departmentid=cls._get_int(ticket_tree.find('departmentid')),
-			autouserid=cls._get_boolean(ticket_tree.find('autouserid'), required=False),
-			ticketstatusid=cls._get_int(ticket_tree.find('ticketstatusid'), required=False),
-			ticketpriorityid=cls._get_int(ticket_tree.find('priorityid')),  # Note the difference, request param is ticketpriorityid, response is priorityid
-			tickettypeid=cls._get_int(ticket_tree.find('tickettypeid'), required=False),
-			userid=cls._get_int(ticket_tree.find('userid')),
-			ownerstaffid=cls._get_int(ticket_tree.find('ownerstaffid')),
-			flagtype=cls._parse_int(ticket_tree.get('flagtype'), 'flagtype'),
-			displayid=cls._get_string(ticket_tree.find('displayid')),
-			statusid=cls._get_int(ticket_tree.find('statusid')),
-			typeid=cls._get_int(ticket_tree.find('typeid')),
-			userorganization=cls._get_string(ticket_tree.find('userorganization')),
-			userorganizationid=cls._get_int(ticket_tree.find('userorganizationid'), required=False),
-			ownerstaffname=cls._get_string(ticket_tree.find('ownerstaffname')),
-			lastreplier=cls._get_string(ticket_tree.find('lastreplier')),
-			creationtime=cls._get_date(ticket_tree.find('creationtime')),
-			lastactivity=cls._get_date(ticket_tree.find('lastactivity')),
-			laststaffreply=cls._get_date(ticket_tree.find('laststaffreply')),
-			lastuserreply=cls._get_date(ticket_tree.find('lastuserreply')),
-			slaplanid=cls._get_int(ticket_tree.find('slaplanid')),
-			nextreplydue=cls._get_date(ticket_tree.find('nextreplydue')),
-			resolutiondue=cls._get_date(ticket_tree.find('resolutiondue')),
-			replies=cls._get_int(ticket_tree.find('replies')),
-			ipaddress=cls._get_string(ticket_tree.find('ipaddress')),
-			creator=cls._get_int(ticket_tree.find('creator')),
-			creationmode=cls._get_int(ticket_tree.find('creationmode')),
-			creationtype=cls._get_int(ticket_tree.find('creationtype')),
-			isescalated=cls._get_boolean(ticket_tree.find('isescalated')),
-			escalationruleid=cls._get_int(ticket_tree.find('escalationruleid')),
-			tags=cls._get_string(ticket_tree.find('tags')),
-			templategroupname=cls._get_string(ticket_tree.find('templategroupname')),
-			watchers=watchers,
-			workflows=workflows,
-			notes=notes,
-			posts=posts,
-			timetracks=timetracks,
-		)
-		return params
-
-	def _update_from_response(self, ticket_tree):
+	__schema__ = Schema([
+		Field('id', INT, attribute=True),
+		Field('flagtype', INT, attribute=True),
+		Field('subject'),
+		Field('fullname'),
+		Field('email'),
+		Field('departmentid', INT),
+		Field('autouserid', BOOLEAN, required=False),
+		Field('ticketstatusid', INT, required=False),
+		Field('ticketpriorityid', INT, source='priorityid'),  # Note the difference, request param is ticketpriorityid, response is priorityid
+		Field('tickettypeid', INT, required=False),
+		Field('userid', INT),
+		Field('ownerstaffid', INT),
+		Field('displayid'),
+		Field('statusid', INT),
+		Field('typeid', INT),
+		Field('userorganization'),
+		Field('userorganizationid', INT, required=False),
+		Field('ownerstaffname'),
+		Field('lastreplier'),
+		Field('creationtime', DATE),
+		Field('lastactivity', DATE),
+		Field('laststaffreply', DATE),
+		Field('lastuserreply', DATE),
+		Field('slaplanid', INT),
+		Field('nextreplydue', DATE),
+		Field('resolutiondue', DATE),
+		Field('replies', INT),
+		Field('ipaddress'),
+		Field('creator', INT),
+		Field('creationmode', INT),
+		Field('creationtype', INT),
+		Field('isescalated', BOOLEAN),
+		Field('escalationruleid', INT),
+		Field('tags'),
+		Field('templategroupname'),
+		Field('watchers', NODES, source='watcher'),
+		Field('workflows', NODES, source='workflow'),
+		Field('notes', NODES, source='note'),
+		Field('timetracks', NODES, source='note'),
+		Field('posts', NODE),
+	])
 
-		ticketid = self._parse_int(ticket_tree.get('id'))
-		if ticketid is not None:
-			self.id = ticketid
-
-		priority_node = ticket_tree.find('priorityid')
-		if priority_node is not None:
-			self.ticketpriorityid = self._get_int(priority_node)
+	@classmethod
+	def _parse_nested(cls, name, value):
+		'''
+		Return the watchers or workflows of a ticket from the nodes read by
+		``__schema__``.
+		'''
+		if name == 'workflows':
+			return [dict(id=workflow_node.get('id'), title=workflow_node.get('title')) for workflow_node in value]
+		else:
+			return [dict(staffid=watcher_node.get('staffid'), name=watcher_node.get('name')) for watcher_node in value]
 
-		for int_node in ['departmentid', 'userid', 'ownerstaffid', 'flagtype', 'statusid', 'slaplanid', 'replies', 'creator', 'creationmode', 'creationtype', 'escalationruleid',
-		                 'ticketstatusid', 'tickettypeid', 'userorganizationid']:
-			node = ticket_tree.find(int_node)
-			if node is not None:
-				setattr(self, int_node, self._get_int(node, required=False))
+	@classmethod
+	def _parse_collections(cls, api, ticketid, note_nodes, posts_node, lazy=False):
+		'''
+		Return ``LazyList``s of the notes, timetracks and posts of a ticket,
+		keyed by name. They are built from the ticket's note elements and
+		posts element when first used, the note elements being split by type
+		in a single pass. Posts are decoded lazily if ``lazy`` is set.
+
+		A ticket without a posts element does not embed its posts, so they
+		are fetched from their own controller instead. Its notes and time
+		tracks are only fetched too if it has no note elements either.
+		'''
+		fetch = posts_node is None and api is not None
+		split = {}
+
+		def partition(type):
+			if not split:
+				split['ticket'], split['timetrack'] = [], []
+				for note_node in note_nodes:
+					split.setdefault(note_node.get('type'), []).append(note_node)
+			return split[type]
+
+		def notes():
+			if fetch and not note_nodes:
+				return TicketNote.get_all(api, ticketid)
+			return [TicketNote._from_parameters(api, TicketNote._parse_ticket_note(ticket_note_tree, ticketid)) for ticket_note_tree in partition('ticket')]
+
+		def timetracks():
+			if fetch and not note_nodes:
+				return TicketTimeTrack.get_all(api, ticketid)
+			return [TicketTimeTrack._from_parameters(api, TicketTimeTrack._parse_ticket_time_track(ticket_time_track_tree, ticketid)) for ticket_time_track_tree in partition('timetrack')]
+
+		def posts():
+			if fetch:
+				return TicketPost.get_all(api, ticketid)
+			if posts_node is None:
+				return []
+			return [TicketPost._load(api, ticket_post_tree, lazy=lazy, ticketid=ticketid) for ticket_post_tree in posts_node.findall('post')]
+
+		return dict(notes=LazyList(notes), timetracks=LazyList(timetracks), posts=LazyList(posts))
 
-		for str_node in ['subject', 'email', 'displayid', 'userorganization', 'ownerstaffname', 'lastreplier', 'ipaddress', 'tags']:
-			node = ticket_tree.find(str_node)
-			if node is not None:
-				setattr(self, str_node, self._get_string(node))
+	@classmethod
+	def _parse_node(cls, api, node, schema, **parameters):
+		params = super(Ticket, cls)._parse_node(api, node, schema, **parameters)
+		for name in _NESTED:
+			if name in params:
+				params[name] = cls._parse_nested(name, params[name])
+		wanted = [name for name in _COLLECTIONS if name in params]
+		if wanted:
+			note_nodes = params.get('notes', params.get('timetracks', ()))
+			posts_node = params['posts'] if 'posts' in params else node.find('posts')
+			collections = cls._parse_collections(api, params['id'], note_nodes, posts_node)
+			for name in wanted:
+				params[name] = collections[name]
+		return params
 
-		for bool_node in ['isescalated', 'autouserid']:
-			node = ticket_tree.find(bool_node)
-			if node is not None:
-				setattr(self, bool_node, self._get_boolean(node, required=False))
+	@classmethod
+	def _parse_ticket(cls, api, ticket_tree):
+		return cls._parse_node(api, ticket_tree, cls._api_schema(api))
+
+	def _decode(self, name, node, children):
+		if name in _COLLECTIONS:
+			collections = self._parse_collections(self.api, self.id, children.get('note', ()), children.get('posts'), lazy=True)
+			# Share the split of the note elements with the collections not read yet
+			for other, value in collections.iteritems():
+				if other != name:
+					try:
+						object.__getattribute__(self, other)
+					except AttributeError:
+						setattr(self, other, value)
+			return collections[name]
+		value = KayakoObject._decode(self, name, node, children)
+		if name in _NESTED:
+			return self._parse_nested(name, value)
+		return value
 
-		for date_node in ['creationtime', 'lastactivity', 'lastuserreply', 'nextreplydue', 'resolutiondue', ]:
-			node = ticket_tree.find(date_node)
-			if node is not None:
-				setattr(self, date_node, self._get_date(node, required=False))
+	def _update_from_response(self, ticket_tree):
+		self._api_schema(self.api).update(self, ticket_tree)
 
 	@classmethod
-	def get_all(cls, api, departmentid, ticketstatusid=-1, ownerstaffid=-1, userid=-1, count=1000, start=0):
+	def get_all(cls, api, departmentid, ticketstatusid=-1, ownerstaffid=-1, userid=-1, count=1000, start=0, stream=False, fields=None):
 		'''
 		Get all of the tickets filtered by the parameters:
 		Lists are converted to comma-separated values.
@@ -196,6 +245,8 @@ class Ticket(KayakoObject):
 			ticketstatusid   Filter the tickets by the specified ticket status id, you can specify multiple id's by separating the values using a comma. Example: 1,2,3
 			ownerstaffid     Filter the tickets by the specified owner staff id, you can specify multiple id's by separating the values using a comma. Example: 1,2,3
 			userid           Filter the tickets by the specified user id, you can specify multiple id's by separating the values using a comma. Example: 1,2,3
+			stream           If True, return a generator yielding each Ticket as soon as it is parsed from the response, see ``iter_nodes``.
+			fields           If given, only parse these fields (and id), see ``KayakoAPI.get_all``.
 		'''
 
 		if isinstance(departmentid, (list, tuple)):
@@ -207,9 +258,28 @@ class Ticket(KayakoObject):
 		if isinstance(userid, (list, tuple)):
 			userid = ','.join([str(id_item) for id_item in userid])
 
-		response = api._request('%s/ListAll/%s/%s/%s/%s/%s/%s' % (cls.controller, departmentid, ticketstatusid, ownerstaffid, userid, count, start), 'GET')
+		response = api._request('%s/ListAll/%s/%s/%s/%s/%s/%s' % (cls.controller, departmentid, ticketstatusid, ownerstaffid, userid, count, start), 'GET', _stream=stream)
+		if stream:
+			return cls._iter_tickets(api, response, fields)
 		tree = etree.parse(response)
-		return [Ticket(api, **cls._parse_ticket(api, ticket_tree)) for ticket_tree in tree.findall('ticket')]
+		return [cls._load(api, ticket_tree, fields) for ticket_tree in tree.findall('ticket')]
+
+	@classmethod
+	def iter_all(cls, api, departmentid, ticketstatusid=-1, ownerstaffid=-1, userid=-1, page_size=1000, start=0, prefetch=0):
+		'''
+		Iterate over all of the tickets filtered by the parameters of ``get_all``,
+		requesting ``page_size`` tickets at a time, from offset ``start``, as
+		the tickets are consumed. With ``prefetch``, up to that many pages are
+		fetched ahead on a background thread.
+		'''
+		fetch = api._bind_deadline(lambda count, start: cls.get_all(api, departmentid, ticketstatusid, ownerstaffid, userid, count=count, start=start, stream=True))
+		return iter_offset_pages(fetch, page_size, start, prefetch)
+
+	@classmethod
+	def _iter_tickets(cls, api, response, fields=None):
+		''' Yield a Ticket for each ticket element of a response as it is parsed. '''
+		for ticket_tree in iter_nodes(response, 'ticket'):
+			yield cls._load(api, ticket_tree, fields, lazy=False)
 
 	@classmethod
 	def get(cls, api, id):
@@ -224,8 +294,7 @@ class Ticket(KayakoObject):
 		node = tree.find('ticket')
 		if node is None:
 			return None
-		params = cls._parse_ticket(api, node)
-		return Ticket(api, **params)
+		return cls._load(api, node)
 
 	def add(self):
 		'''
@@ -258,7 +327,7 @@ class Ticket(KayakoObject):
 		if 'userid' not in parameters and 'staffid' not in parameters and 'email' not in parameters:
 			raise KayakoRequestError('To add a Ticket, at least one of the following parameters must be set: userid, staffid. (id: %s)' % self.id)
 
-		response = self.api._request(self.controller, 'POST', **parameters)
+		response = self.api._request(self.controller, 'POST', _encoder=self._form_encoder('add'), **parameters)
 		tree = etree.parse(response)
 		node = tree.find('ticket')
 		self._update_from_response(node)
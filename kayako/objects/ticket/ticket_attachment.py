@@ -10,6 +10,7 @@ Created on Jun 8, 2011
 @author: evan
 '''
 
+from kayako.core.attachment import Base64FileContents, download_attachment
 from kayako.core.lib import UnsetParameter
 from kayako.core.object import KayakoObject
 from kayako.exception import KayakoRequestError, KayakoResponseError
@@ -85,7 +86,7 @@ class TicketAttachment(KayakoObject):
         '''
         response = api._request('%s/ListAll/%s' % (cls.controller, ticketid), 'GET')
         tree = etree.parse(response)
-        return [TicketAttachment(api, **cls._parse_ticket_attachment(ticket_attachment_tree)) for ticket_attachment_tree in tree.findall('attachment')]
+        return [TicketAttachment._from_parameters(api, cls._parse_ticket_attachment(ticket_attachment_tree)) for ticket_attachment_tree in tree.findall('attachment')]
 
     @classmethod
     def get(cls, api, ticketid, attachmentid):
@@ -101,7 +102,29 @@ class TicketAttachment(KayakoObject):
         if node is None:
             return None
         params = cls._parse_ticket_attachment(node)
-        return TicketAttachment(api, **params)
+        return TicketAttachment._from_parameters(api, params)
+
+    @classmethod
+    def download(cls, api, ticketid, attachmentid, output):
+        '''
+        Download the contents of an attachment into ``output``, a writable
+        file-like object or a file path, without holding them in memory.
+
+        Returns the attachment without its ``contents``, or None if it does
+        not exist. Raises KayakoResponseError if the size of the downloaded
+        contents does not match ``filesize``.
+        '''
+        try:
+            response = api._request('%s/%s/%s/' % (cls.controller, ticketid, attachmentid), 'GET', _stream=True)
+        except KayakoResponseError, error:
+            if 'HTTP Error 404' in str(error):
+                return None
+            else:
+                raise
+        node = download_attachment(response, 'attachment', output)
+        if node is None:
+            return None
+        return TicketAttachment._from_parameters(api, cls._parse_ticket_attachment(node))
 
     def add(self):
         '''
@@ -118,6 +141,24 @@ class TicketAttachment(KayakoObject):
         node = tree.find('attachment')
         self._update_from_response(node)
 
+    def add_from_file(self, source):
+        '''
+        Add this attachment with its contents read from ``source``, a file
+        path, a file object or an ``mmap``. The contents are base64 and form
+        encoded while they are sent, so memory use does not depend on the size
+        of the file. ``filename`` defaults to the name of the source file.
+        '''
+        contents = Base64FileContents(source)
+        try:
+            if not self.filename and contents.filename:
+                self.filename = contents.filename
+            self.contents = contents
+            self.add()
+        finally:
+            contents.close()
+            if self.contents is contents:
+                self.contents = None
+
     def delete(self):
         if self.ticketid is None or self.ticketid is UnsetParameter:
             raise KayakoRequestError('Cannot delete a TicketAttachment without being attached to a ticket. The ID of the Ticket (ticketid) has not been specified.')
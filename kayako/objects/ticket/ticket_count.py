@@ -87,7 +87,7 @@ class TicketCountDepartment(KayakoObject):
             staff=tuple(TicketCountOwnerStaff._from_node(ownerstaff_node) for ownerstaff_node in ownerstaff_nodes),
         )
 
-        return TicketCountDepartment(None, **params)
+        return TicketCountDepartment._from_parameters(None, params)
 
     def __str__(self):
         return '<TicketCountDepartment (%s): totalitems:%s, lastactivity:%s, totalunresolveditems:%s, statuses:%s, types:%s, staff:%s>' % (self.id, self.totalitems, self.lastactivity, self.totalunresolveditems, len(self.statuses), len(self.types), len(self.staff))
@@ -154,6 +154,37 @@ class TicketCount(KayakoObject):
         tree = etree.parse(response)
         return TicketCount(**cls._parse_ticket_count(tree))
 
+    def plan_pages(self, page_size=1000, departments=None, statuses=None, staff=None):
+        '''
+        Return the ``(departmentid, ticketstatusid, ownerstaffid, start)``
+        arguments of the ``Ticket.get_all`` pages of ``page_size`` tickets that
+        list every ticket counted here, so they can be requested at once.
+
+        ``departments``, ``statuses`` and ``staff`` are lists of ids to limit
+        the tickets to; owner staff id 0 selects unassigned tickets. Pages are
+        planned per department, per status and per owner as given, using the
+        ``totalitems`` of the matching breakdown. When filtering by both status
+        and owner, the smaller of the two totals is used as an upper bound.
+        '''
+        unassigned = dict((item.id, item.totalitems) for item in self.unassigned)
+        pages = []
+        for department in self.departments:
+            if departments is not None and department.id not in departments:
+                continue
+            status_totals = dict((item.id, item.totalitems) for item in department.statuses)
+            staff_totals = dict((item.id, item.totalitems) for item in department.staff)
+            staff_totals[0] = unassigned.get(department.id, 0)
+            for ticketstatusid in statuses or [-1]:
+                for ownerstaffid in staff or [-1]:
+                    total = department.totalitems
+                    if ticketstatusid != -1:
+                        total = min(total, status_totals.get(ticketstatusid, 0))
+                    if ownerstaffid != -1:
+                        total = min(total, staff_totals.get(ownerstaffid, 0))
+                    for start in xrange(0, total, page_size):
+                        pages.append((department.id, ticketstatusid, ownerstaffid, start))
+        return pages
+
     def __str__(self):
         return '<TicketCount: departments:%s, statuses:%s, staff:%s, unassigned:%s>' % (len(self.departments), len(self.statuses), len(self.staff), len(self.unassigned))
 
@@ -133,7 +133,7 @@ class TicketCustomField(KayakoObject):
 
         groups = []
         for group_tree in tree.findall('group'):
-            fields = [TicketCustomField(api, **cls._parse_ticket_custom_field(custom_field, ticketid)) for custom_field in group_tree.findall('field')]
+            fields = [TicketCustomField._from_parameters(api, cls._parse_ticket_custom_field(custom_field, ticketid)) for custom_field in group_tree.findall('field')]
             ticket_group = TicketCustomFieldGroup(cls._parse_int(group_tree.get('id')), group_tree.get('title'), fields)
             groups.append(ticket_group)
         return groups
@@ -64,7 +64,7 @@ class TicketPriority(KayakoObject):
     def get_all(cls, api):
         response = api._request(cls.controller, 'GET')
         tree = etree.parse(response)
-        return [TicketPriority(api, **cls._parse_ticket_priority(ticket_priority_tree)) for ticket_priority_tree in tree.findall('ticketpriority')]
+        return [TicketPriority._from_parameters(api, cls._parse_ticket_priority(ticket_priority_tree)) for ticket_priority_tree in tree.findall('ticketpriority')]
 
     @classmethod
     def get(cls, api, id):
@@ -74,7 +74,7 @@ class TicketPriority(KayakoObject):
         if node is None:
             return None
         params = cls._parse_ticket_priority(tree.find('ticketpriority'))
-        return TicketPriority(api, **params)
+        return TicketPriority._from_parameters(api, params)
 
     def __str__(self):
         return '<TicketPriority (%s): %s>' % (self.id, self.title)
@@ -144,7 +144,7 @@ class TicketStatus(KayakoObject):
     def get_all(cls, api):
         response = api._request(cls.controller, 'GET')
         tree = etree.parse(response)
-        return [TicketStatus(api, **cls._parse_ticket_status(ticket_status_tree)) for ticket_status_tree in tree.findall('ticketstatus')]
+        return [TicketStatus._from_parameters(api, cls._parse_ticket_status(ticket_status_tree)) for ticket_status_tree in tree.findall('ticketstatus')]
 
     @classmethod
     def get(cls, api, id):
@@ -154,7 +154,7 @@ class TicketStatus(KayakoObject):
         if node is None:
             return None
         params = cls._parse_ticket_status(node)
-        return TicketStatus(api, **params)
+        return TicketStatus._from_parameters(api, params)
 
     def __str__(self):
         return '<TicketStatus (%s): %s>' % (self.id, self.title)
@@ -203,7 +203,7 @@ class TicketType(KayakoObject):
     def get_all(cls, api):
         response = api._request(cls.controller, 'GET')
         tree = etree.parse(response)
-        return [TicketType(api, **cls._parse_ticket_type(ticket_type_tree)) for ticket_type_tree in tree.findall('tickettype')]
+        return [TicketType._from_parameters(api, cls._parse_ticket_type(ticket_type_tree)) for ticket_type_tree in tree.findall('tickettype')]
 
     @classmethod
     def get(cls, api, id):
@@ -213,7 +213,7 @@ class TicketType(KayakoObject):
         if node is None:
             return None
         params = cls._parse_ticket_type(node)
-        return TicketType(api, **params)
+        return TicketType._from_parameters(api, params)
 
     def __str__(self):
         return '<TicketType (%s): %s>' % (self.id, self.title)
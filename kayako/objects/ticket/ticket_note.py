@@ -92,7 +92,7 @@ class TicketNote(KayakoObject):
         '''
         response = api._request('%s/ListAll/%s' % (cls.controller, ticketid), 'GET')
         tree = etree.parse(response)
-        return [TicketNote(api, **cls._parse_ticket_note(ticket_note_tree, ticketid)) for ticket_note_tree in tree.findall('note')]
+        return [TicketNote._from_parameters(api, cls._parse_ticket_note(ticket_note_tree, ticketid)) for ticket_note_tree in tree.findall('note')]
 
     @classmethod
     def get(cls, api, ticketid, id):
@@ -108,7 +108,7 @@ class TicketNote(KayakoObject):
         if node is None:
             return None
         params = cls._parse_ticket_note(node, ticketid)
-        return TicketNote(api, **params)
+        return TicketNote._from_parameters(api, params)
 
     def add(self):
         '''
@@ -136,7 +136,7 @@ class TicketNote(KayakoObject):
         if ('fullname' not in parameters and 'staffid' not in parameters) or ('fullname' in parameters and 'staffid' in parameters):
             raise KayakoRequestError('To add a TicketNote, just one of the following parameters must be set: fullname, staffid. (id: %s)' % self.id)
 
-        response = self.api._request(self.controller, 'POST', **parameters)
+        response = self.api._request(self.controller, 'POST', _encoder=self._form_encoder('add'), **parameters)
         tree = etree.parse(response)
         node = tree.find('note')
         self._update_from_response(node)
@@ -14,6 +14,7 @@ from lxml import etree
 
 from kayako.core.lib import UnsetParameter
 from kayako.core.object import KayakoObject
+from kayako.core.schema import BOOLEAN, DATE, INT, Field, Schema
 from kayako.exception import KayakoRequestError, KayakoResponseError
 
 class TicketPost(KayakoObject):
@@ -64,67 +65,45 @@ class TicketPost(KayakoObject):
 
     controller = '/Tickets/TicketPost'
 
+    __schema__ = Schema([
+        Field('id', INT),
+        #Field('subject'), # Not updated
+        Field('contents'),
+        Field('userid', INT),
+        Field('staffid', INT),
+        Field('dateline', DATE),
+        Field('fullname'),
+        Field('email'),
+        Field('emailto'),
+        Field('ipaddress'),
+        Field('hasattachments', BOOLEAN),
+        Field('creator', INT),
+        Field('isthirdparty', BOOLEAN),
+        Field('ishtml', BOOLEAN),
+        Field('isemailed', BOOLEAN),
+        Field('issurveycomment', BOOLEAN),
+        Field('isprivate', BOOLEAN),
+    ])
+
     @classmethod
     def _parse_ticket_post(cls, ticket_post_tree, ticket_id):
-
-        params = dict(
-            id=cls._get_int(ticket_post_tree.find('id')),
-            ticketid=ticket_id,
-            #subject=cls._get_string(ticket_post_tree.find('subject')), # Not updated
-            contents=cls._get_string(ticket_post_tree.find('contents')),
-            userid=cls._get_int(ticket_post_tree.find('userid')),
-            staffid=cls._get_int(ticket_post_tree.find('staffid')),
-            dateline=cls._get_date(ticket_post_tree.find('dateline')),
-            fullname=cls._get_string(ticket_post_tree.find('fullname')),
-            email=cls._get_string(ticket_post_tree.find('email')),
-            emailto=cls._get_string(ticket_post_tree.find('emailto')),
-            ipaddress=cls._get_string(ticket_post_tree.find('ipaddress')),
-            hasattachments=cls._get_boolean(ticket_post_tree.find('hasattachments')),
-            creator=cls._get_int(ticket_post_tree.find('creator')),
-            isthirdparty=cls._get_boolean(ticket_post_tree.find('isthirdparty')),
-            ishtml=cls._get_boolean(ticket_post_tree.find('ishtml')),
-            isemailed=cls._get_boolean(ticket_post_tree.find('isemailed')),
-            issurveycomment=cls._get_boolean(ticket_post_tree.find('issurveycomment')),
-            isprivate=cls._get_boolean(ticket_post_tree.find('isprivate')),
-        )
-        return params
+        return cls._parse_node(None, ticket_post_tree, cls.__schema__, ticketid=ticket_id)
 
     def _update_from_response(self, ticket_post_tree):
-
-        ticketpostid_node = ticket_post_tree.find('id')
-        if ticketpostid_node is not None:
-            self.id = self._get_int(ticketpostid_node)
-
-        for int_node in ['userid', 'staffid', 'creator']:
-            node = ticket_post_tree.find(int_node)
-            if node is not None:
-                setattr(self, int_node, self._get_int(node, required=False))
-
-        for str_node in ['contents', 'fullname', 'email', 'emailto', 'ipaddress']:
-            node = ticket_post_tree.find(str_node)
-            if node is not None:
-                setattr(self, str_node, self._get_string(node))
-
-        for bool_node in ['hasattachments', 'isthirdparty', 'ishtml', 'isemailed', 'issurveycomment']:
-            node = ticket_post_tree.find(bool_node)
-            if node is not None:
-                setattr(self, bool_node, self._get_boolean(node, required=False))
-
-        for date_node in ['dateline']:
-            node = ticket_post_tree.find(date_node)
-            if node is not None:
-                setattr(self, date_node, self._get_date(node, required=False))
+        self._api_schema(self.api).update(self, ticket_post_tree)
 
     @classmethod
-    def get_all(cls, api, ticketid):
+    def get_all(cls, api, ticketid, fields=None):
         '''
         Get all of the TicketPosts for a ticket.
         Required:
             ticketid     The unique numeric identifier of the ticket. 
+        Optional:
+            fields       If given, only parse these fields (and id), see ``KayakoAPI.get_all``.
         '''
         response = api._request('%s/ListAll/%s' % (cls.controller, ticketid), 'GET')
         tree = etree.parse(response)
-        return [TicketPost(api, **cls._parse_ticket_post(ticket_post_tree, ticketid)) for ticket_post_tree in tree.findall('post')]
+        return [cls._load(api, ticket_post_tree, fields, ticketid=ticketid) for ticket_post_tree in tree.findall('post')]
 
     @classmethod
     def get(cls, api, ticketid, id):
@@ -139,8 +118,7 @@ class TicketPost(KayakoObject):
         node = tree.find('post')
         if node is None:
             return None
-        params = cls._parse_ticket_post(node, ticketid)
-        return TicketPost(api, **params)
+        return cls._load(api, node, ticketid=ticketid)
 
     def add(self):
         '''
@@ -166,7 +144,7 @@ class TicketPost(KayakoObject):
         if ('userid' not in parameters and 'staffid' not in parameters) or ('userid' in parameters and 'staffid' in parameters):
             raise KayakoRequestError('To add a TicketPost, just one of the following parameters must be set: userid, staffid. (id: %s)' % self.id)
 
-        response = self.api._request(self.controller, 'POST', **parameters)
+        response = self.api._request(self.controller, 'POST', _encoder=self._form_encoder('add'), **parameters)
         tree = etree.parse(response)
         node = tree.find('post')
         self._update_from_response(node)
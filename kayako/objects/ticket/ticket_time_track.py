@@ -97,7 +97,7 @@ class TicketTimeTrack(KayakoObject):
         '''
         response = api._request('%s/ListAll/%s' % (cls.controller, ticketid), 'GET')
         tree = etree.parse(response)
-        return [TicketTimeTrack(api, **cls._parse_ticket_time_track(ticket_time_track_tree, ticketid)) for ticket_time_track_tree in tree.findall('timetrack')]
+        return [TicketTimeTrack._from_parameters(api, cls._parse_ticket_time_track(ticket_time_track_tree, ticketid)) for ticket_time_track_tree in tree.findall('timetrack')]
 
     @classmethod
     def get(cls, api, ticketid, id):
@@ -116,7 +116,7 @@ class TicketTimeTrack(KayakoObject):
         if node is None:
             return None
         params = cls._parse_ticket_time_track(node, ticketid)
-        return TicketTimeTrack(api, **params)
+        return TicketTimeTrack._from_parameters(api, params)
 
     def add(self):
         '''
@@ -143,7 +143,7 @@ class TicketTimeTrack(KayakoObject):
             if required_parameter not in parameters:
                 raise KayakoRequestError('Cannot add %s: Missing required field: %s.' % (self.__class__.__name__, required_parameter))
 
-        response = self.api._request(self.controller, 'POST', **parameters)
+        response = self.api._request(self.controller, 'POST', _encoder=self._form_encoder('add'), **parameters)
         tree = etree.parse(response)
         node = tree.find('timetrack')
         self._update_from_response(node)
@@ -10,6 +10,7 @@ Created on Feb 14, 2014
 @author: Ravi Sharma
 '''
 
+from kayako.core.attachment import Base64FileContents, download_attachment
 from kayako.core.lib import UnsetParameter
 from kayako.core.object import KayakoObject
 from kayako.exception import KayakoRequestError, KayakoResponseError
@@ -83,7 +84,7 @@ class TroubleshooterAttachment(KayakoObject):
 		'''
 		response = api._request('%s/ListAll/%s' % (cls.controller, troubleshooterstepid), 'GET')
 		tree = etree.parse(response)
-		return [TroubleshooterAttachment(api, **cls._parse_troubleshooter_attachment(troubleshooter_attachment_tree)) for troubleshooter_attachment_tree in tree.findall('troubleshooterattachment')]
+		return [TroubleshooterAttachment._from_parameters(api, cls._parse_troubleshooter_attachment(troubleshooter_attachment_tree)) for troubleshooter_attachment_tree in tree.findall('troubleshooterattachment')]
 
 	@classmethod
 	def get(cls, api, troubleshooterstepid, attachmentid):
@@ -99,7 +100,29 @@ class TroubleshooterAttachment(KayakoObject):
 		if node is None:
 			return None
 		params = cls._parse_troubleshooter_attachment(node)
-		return TroubleshooterAttachment(api, **params)
+		return TroubleshooterAttachment._from_parameters(api, params)
+
+	@classmethod
+	def download(cls, api, troubleshooterstepid, attachmentid, output):
+		'''
+		Download the contents of an attachment into ``output``, a writable
+		file-like object or a file path, without holding them in memory.
+
+		Returns the attachment without its ``contents``, or None if it does
+		not exist. Raises KayakoResponseError if the size of the downloaded
+		contents does not match ``filesize``.
+		'''
+		try:
+			response = api._request('%s/%s/%s/' % (cls.controller, troubleshooterstepid, attachmentid), 'GET', _stream=True)
+		except KayakoResponseError, error:
+			if 'HTTP Error 404' in str(error):
+				return None
+			else:
+				raise
+		node = download_attachment(response, 'troubleshooterattachment', output)
+		if node is None:
+			return None
+		return TroubleshooterAttachment._from_parameters(api, cls._parse_troubleshooter_attachment(node))
 
 	def add(self):
 		'''
@@ -115,6 +138,24 @@ class TroubleshooterAttachment(KayakoObject):
 		node = tree.find('troubleshooterattachment')
 		self._update_from_response(node)
 
+	def add_from_file(self, source):
+		'''
+		Add this attachment with its contents read from ``source``, a file
+		path, a file object or an ``mmap``. The contents are base64 and form
+		encoded while they are sent, so memory use does not depend on the size
+		of the file. ``filename`` defaults to the name of the source file.
+		'''
+		contents = Base64FileContents(source)
+		try:
+			if not self.filename and contents.filename:
+				self.filename = contents.filename
+			self.contents = contents
+			self.add()
+		finally:
+			contents.close()
+			if self.contents is contents:
+				self.contents = None
+
 	def delete(self):
 		if self.troubleshooterstepid is None or self.troubleshooterstepid is UnsetParameter:
 			raise KayakoRequestError('Cannot delete a TroubleshooterAttachment without being attached to a step. The ID of the Step (troubleshooterstepid) has not been specified.')
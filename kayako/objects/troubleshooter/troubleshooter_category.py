@@ -101,7 +101,7 @@ class TroubleshooterCategory(KayakoObject):
 	def get_all(cls, api):
 		response = api._request('%s/' % (cls.controller), 'GET')
 		tree = etree.parse(response)
-		return [TroubleshooterCategory(api, **cls._parse_troubleshooter_category(api, troubleshooter_category_tree)) for troubleshooter_category_tree in tree.findall('troubleshootercategory')]
+		return [TroubleshooterCategory._from_parameters(api, cls._parse_troubleshooter_category(api, troubleshooter_category_tree)) for troubleshooter_category_tree in tree.findall('troubleshootercategory')]
 
 	@classmethod
 	def get(cls, api, id):
@@ -111,7 +111,7 @@ class TroubleshooterCategory(KayakoObject):
 		if node is None:
 			return None
 		params = cls._parse_troubleshooter_category(api, node)
-		return TroubleshooterCategory(api, **params)
+		return TroubleshooterCategory._from_parameters(api, params)
 
 	def add(self):
 		'''
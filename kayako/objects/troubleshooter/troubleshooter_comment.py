@@ -85,7 +85,7 @@ class TroubleshooterComment(KayakoObject):
 	def get_all(cls, api, troubleshooterstepid):
 		response = api._request('%s/ListAll/%s' % (cls.controller, troubleshooterstepid), 'GET')
 		tree = etree.parse(response)
-		return [TroubleshooterComment(api, **cls._parse_troubleshooter_comment(api, troubleshooter_comment_tree)) for troubleshooter_comment_tree in tree.findall('troubleshooterstepcomment')]
+		return [TroubleshooterComment._from_parameters(api, cls._parse_troubleshooter_comment(api, troubleshooter_comment_tree)) for troubleshooter_comment_tree in tree.findall('troubleshooterstepcomment')]
 
 	@classmethod
 	def get(cls, api, id):
@@ -95,7 +95,7 @@ class TroubleshooterComment(KayakoObject):
 		if node is None:
 			return None
 		params = cls._parse_troubleshooter_comment(api, node)
-		return TroubleshooterComment(api, **params)
+		return TroubleshooterComment._from_parameters(api, params)
 
 	def add(self):
 		'''
@@ -116,7 +116,7 @@ class TroubleshooterComment(KayakoObject):
 			if required_parameter not in parameters:
 				raise KayakoRequestError('Cannot add %s: Missing required field: %s.' % (self.__class__.__name__, required_parameter))
 
-		response = self.api._request(self.controller, 'POST', **parameters)
+		response = self.api._request(self.controller, 'POST', _encoder=self._form_encoder('add'), **parameters)
 		tree = etree.parse(response)
 		node = tree.find('troubleshooterstepcomment')
 		self._update_from_response(node)
@@ -119,7 +119,7 @@ class TroubleshooterStep(KayakoObject):
 	def get_all(cls, api):
 		response = api._request('%s/' % (cls.controller), 'GET')
 		tree = etree.parse(response)
-		return [TroubleshooterStep(api, **cls._parse_troubleshooter_step(api, troubleshooter_step_tree)) for troubleshooter_step_tree in tree.findall('troubleshooterstep')]
+		return [TroubleshooterStep._from_parameters(api, cls._parse_troubleshooter_step(api, troubleshooter_step_tree)) for troubleshooter_step_tree in tree.findall('troubleshooterstep')]
 
 	@classmethod
 	def get(cls, api, id):
@@ -129,7 +129,7 @@ class TroubleshooterStep(KayakoObject):
 		if node is None:
 			return None
 		params = cls._parse_troubleshooter_step(api, node)
-		return TroubleshooterStep(api, **params)
+		return TroubleshooterStep._from_parameters(api, params)
 
 	def add(self):
 		'''
@@ -157,7 +157,7 @@ class TroubleshooterStep(KayakoObject):
 			if required_parameter not in parameters:
 				raise KayakoRequestError('Cannot add %s: Missing required field: %s.' % (self.__class__.__name__, required_parameter))
 
-		response = self.api._request(self.controller, 'POST', **parameters)
+		response = self.api._request(self.controller, 'POST', _encoder=self._form_encoder('add'), **parameters)
 		tree = etree.parse(response)
 		node = tree.find('troubleshooterstep')
 		self._update_from_response(node)
@@ -13,6 +13,9 @@ Created on May 9, 2011
 from lxml import etree
 
 from kayako.core.object import KayakoObject
+from kayako.core.paginate import iter_marker_pages
+from kayako.core.schema import BOOLEAN, DATE, INT, LIST, Field, Schema
+from kayako.core.stream import iter_nodes
 
 __all__ = [
     'User',
@@ -73,63 +76,64 @@ class User(KayakoObject):
     __required_save_parameters__ = ['fullname']
     __save_parameters__ = ['fullname', 'usergroupid', 'email', 'userorganizationid', 'salutation', 'designation', 'phone', 'isenabled', 'userrole', 'timezone', 'enabledst', 'slaplanid', 'slaplanexpiry', 'userexpiry']
 
+    __schema__ = Schema([
+        Field('id', INT),
+        Field('fullname'),
+        Field('usergroupid', INT),
+        Field('email', LIST),
+        Field('userorganizationid', INT, required=False),
+        Field('salutation'),
+        Field('designation'),
+        Field('phone'),
+        Field('isenabled', BOOLEAN),
+        Field('userrole'),
+        Field('timezone'),
+        Field('enabledst', BOOLEAN),
+        Field('slaplanid', INT, required=False),
+        Field('slaplanexpiry', DATE, required=False),
+        Field('userexpiry', DATE),
+        Field('dateline', DATE, required=False),
+        Field('lastvisit', DATE),
+    ])
+
     @classmethod
     def _parse_user(cls, user_tree):
-        emails = [cls._get_string(email_node) for email_node in user_tree.findall('email')]
-        params = dict(
-            id=cls._get_int(user_tree.find('id')),
-            fullname=cls._get_string(user_tree.find('fullname')),
-            usergroupid=cls._get_int(user_tree.find('usergroupid')),
-            email=emails,
-            userorganizationid=cls._get_int(user_tree.find('userorganizationid'), required=False),
-            salutation=cls._get_string(user_tree.find('salutation')),
-            designation=cls._get_string(user_tree.find('designation')),
-            phone=cls._get_string(user_tree.find('phone')),
-            isenabled=cls._get_boolean(user_tree.find('isenabled')),
-            userrole=cls._get_string(user_tree.find('userrole')),
-            timezone=cls._get_string(user_tree.find('timezone')),
-            enabledst=cls._get_boolean(user_tree.find('enabledst')),
-            slaplanid=cls._get_int(user_tree.find('slaplanid'), required=False),
-            slaplanexpiry=cls._get_date(user_tree.find('slaplanexpiry'), required=False),
-            userexpiry=cls._get_date(user_tree.find('userexpiry')),
-            dateline=cls._get_date(user_tree.find('dateline'), required=False),
-            lastvisit=cls._get_date(user_tree.find('lastvisit')),
-        )
-        return params
+        return cls.__schema__.parse(user_tree)
 
     def _update_from_response(self, user_tree):
-
-        self.emails = [self._get_string(email_node) for email_node in user_tree.findall('email')]
-
-        for int_node in ['id', 'usergroupid', 'userorganizationid', 'slaplanid']:
-            node = user_tree.find(int_node)
-            if node is not None:
-                setattr(self, int_node, self._get_int(node, required=False))
-
-        for str_node in ['fullname', 'salutation', 'designation', 'phone', 'userrole', 'timezone']:
-            node = user_tree.find(str_node)
-            if node is not None:
-                setattr(self, str_node, self._get_string(node))
-
-        for bool_node in ['isenabled', 'enabledst']:
-            node = user_tree.find(bool_node)
-            if node is not None:
-                setattr(self, bool_node, self._get_boolean(node, required=False))
-
-        for date_node in ['slaplanexpiry', 'userexpiry', 'dateline', 'lastvisit']:
-            node = user_tree.find(date_node)
-            if node is not None:
-                setattr(self, date_node, self._get_date(node))
+        self._api_schema(self.api).update(self, user_tree)
 
     @classmethod
-    def get_all(cls, api, marker=0, maxitems=1000):
+    def get_all(cls, api, marker=0, maxitems=1000, stream=False, fields=None):
         '''
         Returns the users starting at User ID ``marker`` pulling in a maximum
         ``maxitems`` number of Users.
+
+        If ``stream`` is True, returns a generator yielding each User as soon
+        as it is parsed from the response instead. With ``fields``, only those
+        fields (and id) are parsed, see ``KayakoAPI.get_all``.
         '''
-        response = api._request('%s/Filter/%s/%s/' % (cls.controller, marker, maxitems), 'GET')
+        response = api._request('%s/Filter/%s/%s/' % (cls.controller, marker, maxitems), 'GET', _stream=stream)
+        if stream:
+            return cls._iter_users(api, response, fields)
         tree = etree.parse(response)
-        return [User(api, **cls._parse_user(user_tree)) for user_tree in tree.findall('user')]
+        return [cls._load(api, user_tree, fields) for user_tree in tree.findall('user')]
+
+    @classmethod
+    def iter_all(cls, api, marker=0, page_size=1000, prefetch=0):
+        '''
+        Iterate over all users starting at User ID ``marker``, requesting
+        ``page_size`` Users at a time as they are consumed. With ``prefetch``,
+        up to that many pages are fetched ahead on a background thread.
+        '''
+        fetch = api._bind_deadline(lambda count, marker: cls.get_all(api, marker=marker, maxitems=count, stream=True))
+        return iter_marker_pages(fetch, page_size, marker, lambda user: user.id, prefetch)
+
+    @classmethod
+    def _iter_users(cls, api, response, fields=None):
+        ''' Yield a User for each user element of a response as it is parsed. '''
+        for user_tree in iter_nodes(response, 'user'):
+            yield cls._load(api, user_tree, fields, lazy=False)
 
     @classmethod
     def get(cls, api, id):
@@ -138,8 +142,7 @@ class User(KayakoObject):
         node = tree.find('user')
         if node is None:
             return None
-        params = cls._parse_user(node)
-        return User(api, **params)
+        return cls._load(api, node)
 
     def add(self):
         response = self._add(self.controller)
@@ -213,7 +216,7 @@ class UserGroup(KayakoObject):
     def get_all(cls, api):
         response = api._request(cls.controller, 'GET')
         tree = etree.parse(response)
-        return [UserGroup(api, **cls._parse_user_group(user_group_tree)) for user_group_tree in tree.findall('usergroup')]
+        return [UserGroup._from_parameters(api, cls._parse_user_group(user_group_tree)) for user_group_tree in tree.findall('usergroup')]
 
     @classmethod
     def get(cls, api, id):
@@ -223,7 +226,7 @@ class UserGroup(KayakoObject):
         if node is None:
             return None
         params = cls._parse_user_group(node)
-        return UserGroup(api, **params)
+        return UserGroup._from_parameters(api, params)
 
     def add(self):
         response = self._add(self.controller)
@@ -328,7 +331,7 @@ class UserOrganization(KayakoObject):
     def get_all(cls, api):
         response = api._request(cls.controller, 'GET')
         tree = etree.parse(response)
-        return [UserOrganization(api, **cls._parse_user_organization(user_organization_tree)) for user_organization_tree in tree.findall('userorganization')]
+        return [UserOrganization._from_parameters(api, cls._parse_user_organization(user_organization_tree)) for user_organization_tree in tree.findall('userorganization')]
 
     @classmethod
     def get(cls, api, id):
@@ -338,7 +341,7 @@ class UserOrganization(KayakoObject):
         if node is None:
             return node
         params = cls._parse_user_organization(node)
-        return UserOrganization(api, **params)
+        return UserOrganization._from_parameters(api, params)
 
     def add(self):
         response = self._add(self.controller)
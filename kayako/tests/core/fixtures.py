@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+'''
+Kayako XML responses, fake APIs and local HTTP servers for tests that do
+not use a live server.
+'''
+
+import BaseHTTPServer
+import re
+import socket
+import sys
+import threading
+import urllib
+from SocketServer import ThreadingMixIn
+
+API_URL = 'http://localhost/api/index.php'
+
+TICKET = '''
+    <ticket id="%(id)s" flagtype="0">
+        <displayid>ABC-%(id)s</displayid>
+        <departmentid>%(departmentid)s</departmentid>
+        <statusid>%(statusid)s</statusid>
+        <priorityid>1</priorityid>
+        <typeid>1</typeid>
+        <userid>%(userid)s</userid>
+        <userorganization>Acme</userorganization>
+        <userorganizationid>2</userorganizationid>
+        <ownerstaffid>%(ownerstaffid)s</ownerstaffid>
+        <ownerstaffname>Staff</ownerstaffname>
+        <fullname>User %(id)s</fullname>
+        <email>user%(id)s@example.com</email>
+        <lastreplier>User %(id)s</lastreplier>
+        <subject>Ticket %(id)s</subject>
+        <creationtime>1309262424</creationtime>
+        <lastactivity>1309262500</lastactivity>
+        <laststaffreply>0</laststaffreply>
+        <lastuserreply>1309262424</lastuserreply>
+        <slaplanid>0</slaplanid>
+        <nextreplydue>0</nextreplydue>
+        <resolutiondue>0</resolutiondue>
+        <replies>1</replies>
+        <ipaddress>127.0.0.1</ipaddress>
+        <creator>1</creator>
+        <creationmode>1</creationmode>
+        <creationtype>1</creationtype>
+        <isescalated>0</isescalated>
+        <escalationruleid>0</escalationruleid>
+        <tags>a b</tags>
+        <templategroupname>Default</templategroupname>
+        <watcher staffid="1" name="Staff" />
+        <workflow id="1" title="Close" />
+        <note type="timetrack" id="%(id)s2" ticketid="%(id)s" timeworked="60" timebillable="60" billdate="1309262424" workdate="1309262424" workerstaffid="1" workerstaffname="Staff" creatorstaffid="1" creatorstaffname="Staff" creationdate="1309262424" notecolor="1"><![CDATA[Worked]]></note>
+        <note type="ticket" id="%(id)s1" ticketid="%(id)s" notecolor="1" creatorstaffid="1" forstaffid="0" creatorstaffname="Staff" creationdate="1309262424"><![CDATA[A note]]></note>
+        <posts>
+            <post>
+                <id>%(id)s3</id>
+                <ticketpostid>%(id)s3</ticketpostid>
+                <ticketid>%(id)s</ticketid>
+                <dateline>1309262424</dateline>
+                <userid>%(userid)s</userid>
+                <fullname>User %(id)s</fullname>
+                <email>user%(id)s@example.com</email>
+                <emailto></emailto>
+                <ipaddress>127.0.0.1</ipaddress>
+                <hasattachments>0</hasattachments>
+                <creator>2</creator>
+                <isthirdparty>0</isthirdparty>
+                <ishtml>0</ishtml>
+                <isemailed>0</isemailed>
+                <staffid>0</staffid>
+                <issurveycomment>0</issurveycomment>
+                <isprivate>0</isprivate>
+                <contents><![CDATA[Hello]]></contents>
+            </post>
+        </posts>
+    </ticket>'''
+
+USER = '''
+    <user>
+        <id>%(id)s</id>
+        <usergroupid>2</usergroupid>
+        <userrole>user</userrole>
+        <userorganizationid>0</userorganizationid>
+        <salutation></salutation>
+        <userexpiry>0</userexpiry>
+        <fullname>User %(id)s</fullname>
+        <email>user%(id)s@example.com</email>
+        <designation></designation>
+        <phone></phone>
+        <dateline>1309262424</dateline>
+        <lastvisit>1309262424</lastvisit>
+        <isenabled>1</isenabled>
+        <timezone></timezone>
+        <enabledst>0</enabledst>
+        <slaplanid>0</slaplanid>
+        <slaplanexpiry>0</slaplanexpiry>
+    </user>'''
+
+def tickets(ids, departmentid=1, statusid=1, userid=1, ownerstaffid=1):
+    ''' Return a ticket list response for the given ticket ids. '''
+    return ticket_rows([(id, departmentid, statusid, ownerstaffid) for id in ids], userid=userid)
+
+def ticket_rows(rows, userid=1):
+    ''' Return a ticket list response for ``(id, departmentid, statusid, ownerstaffid)`` rows. '''
+    return '<?xml version="1.0" encoding="UTF-8"?>\n<tickets>%s\n</tickets>' % ''.join(TICKET % dict(id=id, departmentid=departmentid, statusid=statusid, ownerstaffid=ownerstaffid, userid=userid) for id, departmentid, statusid, ownerstaffid in rows)
+
+def ticket_count(rows):
+    ''' Return a TicketCount response counting ``(id, departmentid, statusid, ownerstaffid)`` rows. '''
+    def count(items):
+        totals = {}
+        for item in items:
+            totals[item] = totals.get(item, 0) + 1
+        return sorted(totals.items())
+
+    def breakdown(tag, items):
+        return ''.join('<%s id="%s" lastactivity="1309262424" totalitems="%s" />' % (tag, id, total) for id, total in count(items))
+
+    departments = []
+    for departmentid, total in count(row[1] for row in rows):
+        department = [row for row in rows if row[1] == departmentid]
+        departments.append('<department id="%s"><lastactivity>1309262424</lastactivity><totalitems>%s</totalitems><totalunresolveditems>%s</totalunresolveditems>%s%s</department>' % (
+            departmentid, total, total, breakdown('ticketstatus', [row[2] for row in department]), breakdown('ownerstaff', [row[3] for row in department if row[3]])))
+    return '<?xml version="1.0" encoding="UTF-8"?>\n<ticketcount><departments>%s</departments><statuses>%s</statuses><owners>%s</owners><unassigned>%s</unassigned></ticketcount>' % (
+        ''.join(departments), breakdown('ticketstatus', [row[2] for row in rows]), breakdown('ownerstaff', [row[3] for row in rows if row[3]]), breakdown('department', [row[1] for row in rows if not row[3]]))
+
+def users(ids):
+    ''' Return a user list response for the given user ids. '''
+    return '<?xml version="1.0" encoding="UTF-8"?>\n<users>%s\n</users>' % ''.join(USER % dict(id=id) for id in ids)
+
+def request_controller(url):
+    ''' Return the controller path (the ``e`` argument) of a request URL. '''
+    return urllib.unquote(re.search(r'e=([^&]*)', url).group(1))
+
+def fake_api(handler, **kwargs):
+    '''
+    Return a KayakoAPI sending its requests to ``handler`` through an
+    ``InProcessTransport``. Other keyword arguments are passed to KayakoAPI.
+    '''
+    from kayako.api import KayakoAPI
+    from kayako.core.transport import InProcessTransport
+    return KayakoAPI(API_URL, 'key', 'secret', transport=InProcessTransport(handler), **kwargs)
+
+class Server(ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    '''
+    A local HTTP server for ``handler_class`` on a free port, serving on a
+    daemon thread until ``close`` is called. ``url`` is its API URL.
+    '''
+
+    daemon_threads = True
+
+    def __init__(self, handler_class):
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), handler_class)
+        self.url = 'http://127.0.0.1:%s/api/index.php' % self.server_address[1]
+        self.thread = threading.Thread(target=self.serve_forever, kwargs=dict(poll_interval=0.01))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on slow responses
+        if not isinstance(sys.exc_info()[1], socket.error):
+            BaseHTTPServer.HTTPServer.handle_error(self, request, client_address)
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
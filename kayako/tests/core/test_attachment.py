@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+import base64
+import os
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import fake_api
+
+ATTACHMENT = '''<?xml version="1.0" encoding="UTF-8"?>
+<%(root)s>
+    <%(tag)s>
+        <id>7</id>
+        <%(parent)s>3</%(parent)s>
+        <ticketpostid>5</ticketpostid>
+        <filename>logs.tar.gz</filename>
+        <filesize>%(filesize)s</filesize>
+        <filetype>application/x-gzip</filetype>
+        <dateline>1309262424</dateline>
+        <contents><![CDATA[%(contents)s]]></contents>
+    </%(tag)s>
+</%(root)s>'''
+
+def _wrap(text, width=76):
+    return '\n'.join(text[start:start + width] for start in range(0, len(text), width))
+
+class TestBase64StreamDecoder(KayakoTest):
+
+    def test_decode_in_pieces(self):
+        import random
+        from StringIO import StringIO
+        from kayako.core.attachment import Base64StreamDecoder
+        data = os.urandom(10000)
+        text = _wrap(base64.b64encode(data))
+        output = StringIO()
+        decoder = Base64StreamDecoder(output, buffer_size=100)
+        position = 0
+        while position < len(text):
+            size = random.randint(1, 50)
+            decoder.feed(text[position:position + size])
+            position += size
+        assert decoder.close() == len(data)
+        assert output.getvalue() == data
+
+class TestAttachmentDownload(KayakoTest):
+
+    CLASSES = [
+        ('kayako.objects.ticket.ticket_attachment', 'TicketAttachment', 'attachments', 'attachment', 'ticketid'),
+        ('kayako.objects.knowledgebase.knowledgebase_attachment', 'KnowledgebaseAttachment', 'kbattachments', 'kbattachment', 'kbarticleid'),
+        ('kayako.objects.troubleshooter.troubleshooter_attachment', 'TroubleshooterAttachment', 'troubleshooterattachments', 'troubleshooterattachment', 'troubleshooterstepid'),
+    ]
+
+    def _api(self, document):
+        self.sent = []
+
+        def handler(method, url, body, headers):
+            self.sent.append(url)
+            if '/404/' in url:
+                return 404, {}, '[Error]: Attachment not found'
+            return document
+
+        return fake_api(handler)
+
+    def _document(self, names, data, filesize=None):
+        module, name, root, tag, parent = names
+        return ATTACHMENT % dict(root=root, tag=tag, parent=parent, contents=_wrap(base64.b64encode(data)), filesize=len(data) if filesize is None else filesize)
+
+    def test_download_to_file_object(self):
+        from StringIO import StringIO
+        data = os.urandom(200000)
+        for names in self.CLASSES:
+            cls = getattr(__import__(names[0], fromlist=[names[1]]), names[1])
+            api = self._api(self._document(names, data))
+            output = StringIO()
+            attachment = cls.download(api, 3, 7, output)
+            assert output.getvalue() == data
+            assert isinstance(attachment, cls)
+            assert attachment.id == 7
+            assert getattr(attachment, names[4]) == 3
+            assert attachment.filename == 'logs.tar.gz'
+            assert attachment.filesize == len(data)
+            assert attachment.contents is None
+
+    def test_download_to_path(self):
+        import tempfile
+        from kayako.objects.ticket.ticket_attachment import TicketAttachment
+        data = os.urandom(1000)
+        api = self._api(self._document(self.CLASSES[0], data))
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'logs.tar.gz')
+        try:
+            TicketAttachment.download(api, 3, 7, path)
+            with open(path, 'rb') as downloaded:
+                assert downloaded.read() == data
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+            os.rmdir(directory)
+
+    def test_size_mismatch(self):
+        import tempfile
+        from kayako.exception import KayakoResponseError
+        from kayako.objects.ticket.ticket_attachment import TicketAttachment
+        api = self._api(self._document(self.CLASSES[0], 'truncated', filesize=100))
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'logs.tar.gz')
+        try:
+            self.assertRaises(KayakoResponseError, TicketAttachment.download, api, 3, 7, path)
+            # Partial downloads are removed
+            assert not os.path.exists(path)
+        finally:
+            os.rmdir(directory)
+
+    def test_missing(self):
+        from StringIO import StringIO
+        from kayako.objects.ticket.ticket_attachment import TicketAttachment
+        api = self._api('<?xml version="1.0" encoding="UTF-8"?><attachments></attachments>')
+        assert TicketAttachment.download(api, 3, 7, StringIO()) is None
+        assert TicketAttachment.download(api, 3, 404, StringIO()) is None
+
+    def test_missing_to_path(self):
+        import tempfile
+        from kayako.objects.ticket.ticket_attachment import TicketAttachment
+        api = self._api('<?xml version="1.0" encoding="UTF-8"?><attachments></attachments>')
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'logs.tar.gz')
+        try:
+            assert TicketAttachment.download(api, 3, 7, path) is None
+            assert not os.path.exists(path)
+        finally:
+            os.rmdir(directory)
+
+    def test_response_is_streamed(self):
+        from StringIO import StringIO
+        from kayako.objects.ticket.ticket_attachment import TicketAttachment
+        data = os.urandom(300000)
+        api = self._api(self._document(self.CLASSES[0], data))
+        reads = []
+        send = api.transport.send
+
+        def counting_send(*args, **kwargs):
+            response = send(*args, **kwargs)
+            read = response.read
+
+            def counting_read(amt=None):
+                reads.append(amt)
+                return read(amt)
+
+            response.read = counting_read
+            return response
+
+        api.transport.send = counting_send
+        TicketAttachment.download(api, 3, 7, StringIO())
+        assert len(reads) > 1
+        assert None not in reads
+
+class TestAttachmentUpload(KayakoTest):
+
+    def _api(self):
+        import urlparse
+        self.fields = []
+        self.bodies = []
+
+        def handler(method, url, body, headers):
+            fields = urlparse.parse_qs(body, keep_blank_values=True)
+            self.fields.append(fields)
+            assert int(headers['Content-Length']) == len(body)
+            for tag, parent in (('kbattachment', 'kbarticleid'), ('troubleshooterattachment', 'troubleshooterstepid'), ('attachment', 'ticketid')):
+                if parent in fields:
+                    break
+            return ATTACHMENT % dict(root=tag + 's', tag=tag, parent=parent, contents='', filesize=len(base64.b64decode(fields['contents'][0])))
+
+        api = fake_api(handler)
+        send = api.transport.send
+
+        def recording_send(method, url, body=None, headers=None, timeout=None):
+            self.bodies.append(body)
+            return send(method, url, body, headers, timeout)
+
+        api.transport.send = recording_send
+        return api
+
+    def test_add_from_path(self):
+        import tempfile
+        from kayako.core.form import IterReader
+        from kayako.objects.ticket.ticket_attachment import TicketAttachment
+        api = self._api()
+        api.STREAM_THRESHOLD = 1024
+        data = os.urandom(100000)
+        handle, path = tempfile.mkstemp(suffix='.log')
+        try:
+            os.write(handle, data)
+            os.close(handle)
+            attachment = api.create(TicketAttachment, ticketid=3, ticketpostid=5)
+            attachment.add_from_file(path)
+        finally:
+            os.remove(path)
+        assert self.fields[0]['contents'] == [base64.b64encode(data)]
+        assert self.fields[0]['filename'] == [os.path.basename(path)]
+        assert isinstance(self.bodies[0], IterReader)
+        assert attachment.id == 7
+        assert attachment.filesize == len(data)
+
+    def test_add_from_file_objects(self):
+        import mmap
+        import tempfile
+        from StringIO import StringIO
+        from kayako.objects.knowledgebase.knowledgebase_attachment import KnowledgebaseAttachment
+        from kayako.objects.troubleshooter.troubleshooter_attachment import TroubleshooterAttachment
+
+        class Pipe(object):
+            ''' A file object that cannot seek and returns short reads. '''
+            def __init__(self, data):
+                self.data = StringIO(data)
+            def read(self, size=-1):
+                return self.data.read(min(size, 1000) if size > 0 else size)
+
+        data = os.urandom(50001)
+        mapped_file = tempfile.TemporaryFile()
+        mapped_file.write(data)
+        mapped_file.flush()
+        mapped = mmap.mmap(mapped_file.fileno(), 0, access=mmap.ACCESS_READ)
+        api = self._api()
+        try:
+            for source in (lambda: StringIO(data), lambda: Pipe(data), lambda: mapped):
+                api.create(KnowledgebaseAttachment, kbarticleid=3, filename='data.bin').add_from_file(source())
+                api.create(TroubleshooterAttachment, troubleshooterstepid=3, filename='data.bin').add_from_file(source())
+        finally:
+            mapped.close()
+            mapped_file.close()
+        assert len(self.fields) == 6
+        for fields in self.fields:
+            assert fields['contents'] == [base64.b64encode(data)]
+            assert fields['filename'] == ['data.bin']
+
+    def test_contents(self):
+        from StringIO import StringIO
+        from kayako.core.attachment import Base64FileContents
+        from kayako.core.form import default_encoder
+        for size in (0, 1, 2, 3, 100, 49152, 49153):
+            data = os.urandom(size)
+            contents = Base64FileContents(StringIO(data), chunk_size=300)
+            assert len(contents) == len(base64.b64encode(data))
+            assert ''.join(contents.iter_chunks()) == base64.b64encode(data)
+            parameters = dict(contents=contents, filename='a b')
+            assert default_encoder.content_length(parameters) == len(default_encoder.encode(parameters))
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import fake_api
+
+class TestCircuit(KayakoTest):
+
+    def test_states(self):
+        from kayako.core.breaker import Circuit, CLOSED, OPEN, HALF_OPEN
+        from kayako.exception import KayakoCircuitOpenError
+        changes = []
+        circuit = Circuit('/Tickets/TicketSearch', failure_threshold=2, cooldown=0.05, listeners=[lambda *change: changes.append(change)])
+
+        circuit.before_request()
+        circuit.record_failure()
+        assert circuit.state == CLOSED
+        circuit.record_failure()
+        assert circuit.state == OPEN
+        self.assertRaises(KayakoCircuitOpenError, circuit.before_request)
+
+        import time
+        time.sleep(0.06)
+        circuit.before_request()
+        assert circuit.state == HALF_OPEN
+        # Only one trial request at a time
+        self.assertRaises(KayakoCircuitOpenError, circuit.before_request)
+        circuit.record_failure()
+        assert circuit.state == OPEN
+
+        time.sleep(0.06)
+        circuit.before_request()
+        circuit.record_success()
+        assert circuit.state == CLOSED
+        assert circuit.failures == 0
+        assert changes == [
+            ('/Tickets/TicketSearch', CLOSED, OPEN),
+            ('/Tickets/TicketSearch', OPEN, HALF_OPEN),
+            ('/Tickets/TicketSearch', HALF_OPEN, OPEN),
+            ('/Tickets/TicketSearch', OPEN, HALF_OPEN),
+            ('/Tickets/TicketSearch', HALF_OPEN, CLOSED),
+        ]
+
+    def test_success_resets_failures(self):
+        from kayako.core.breaker import Circuit, CLOSED
+        circuit = Circuit('/Tickets/Ticket', failure_threshold=2)
+        circuit.record_failure()
+        circuit.record_success()
+        circuit.record_failure()
+        assert circuit.state == CLOSED
+
+    def test_open_error(self):
+        from kayako.core.breaker import Circuit
+        from kayako.exception import KayakoCircuitOpenError
+        circuit = Circuit('/Tickets/Ticket', failure_threshold=1, cooldown=30)
+        circuit.record_failure()
+        try:
+            circuit.before_request()
+        except KayakoCircuitOpenError, error:
+            assert error.controller == '/Tickets/Ticket'
+            assert 29 < error.retry_after <= 30
+        else:
+            assert False, 'KayakoCircuitOpenError not raised'
+
+class TestCircuitBreaker(KayakoTest):
+
+    def test_keys(self):
+        from kayako.core.breaker import CircuitBreaker
+        breaker = CircuitBreaker(controllers={'/Tickets/TicketSearch/': dict(failure_threshold=1)})
+        assert breaker.key('/Tickets/Ticket/123/') == '/Tickets/Ticket'
+        assert breaker.circuit_for('/Tickets/Ticket/1/') is breaker.circuit_for('/Tickets/Ticket/ListAll/1/-1/')
+        assert breaker.circuit_for('/Tickets/TicketSearch').failure_threshold == 1
+        assert breaker.circuit_for('/Tickets/Ticket').failure_threshold == 5
+
+    def _api(self, breaker):
+        from kayako.core.retry import NO_RETRY
+        self.sent = []
+
+        def handler(method, url, body, headers):
+            self.sent.append(url)
+            if 'TicketSearch' in url:
+                return 503, {}, 'overloaded'
+            if 'Missing' in url:
+                return 404, {}, 'not found'
+            if 'Fail' in url:
+                return 500, {}, 'error'
+            if 'Broken' in url:
+                raise ValueError('handler error')
+            return '<ok/>'
+
+        return fake_api(handler, retry_policy=NO_RETRY, circuit_breaker=breaker)
+
+    def test_api_fails_fast(self):
+        from kayako.core.breaker import CircuitBreaker, OPEN, CLOSED
+        from kayako.exception import KayakoCircuitOpenError, KayakoResponseError
+        changes = []
+        breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+        breaker.add_listener(lambda *change: changes.append(change))
+        api = self._api(breaker)
+
+        for _ in range(3):
+            self.assertRaises(KayakoResponseError, api._request, '/Tickets/TicketSearch', 'POST', query='a')
+        assert breaker.state('/Tickets/TicketSearch') == OPEN
+        self.assertRaises(KayakoCircuitOpenError, api._request, '/Tickets/TicketSearch', 'POST', query='a')
+        assert len(self.sent) == 3
+        assert changes == [('/Tickets/TicketSearch', CLOSED, OPEN)]
+
+        # Other controllers are not affected
+        assert api._request('/Tickets/Ticket/1/', 'GET').read() == '<ok/>'
+
+    def test_client_errors_are_not_failures(self):
+        from kayako.core.breaker import CircuitBreaker, CLOSED
+        from kayako.exception import KayakoResponseError
+        breaker = CircuitBreaker(failure_threshold=1)
+        api = self._api(breaker)
+        self.assertRaises(KayakoResponseError, api._request, '/Core/Missing', 'GET')
+        assert breaker.state('/Core/Missing') == CLOSED
+
+    def test_retries_stop_when_open(self):
+        from kayako.core.breaker import CircuitBreaker
+        from kayako.core.retry import RetryPolicy
+        from kayako.exception import KayakoCircuitOpenError
+        api = self._api(CircuitBreaker(failure_threshold=2))
+        api.retry_policy = RetryPolicy(max_attempts=5, backoff=0, methods=('GET', 'POST'))
+        self.assertRaises(KayakoCircuitOpenError, api._request, '/Tickets/TicketSearch', 'POST')
+        assert len(self.sent) == 2
+
+    def test_rate_limited_trial(self):
+        import time
+        from kayako.core.breaker import CircuitBreaker, CLOSED
+        from kayako.core.ratelimit import RateLimiter
+        from kayako.exception import KayakoDeadlineExceededError, KayakoResponseError
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0.01)
+        api = self._api(breaker)
+        self.assertRaises(KayakoResponseError, api._request, '/Tickets/Ticket/Fail', 'GET')
+        time.sleep(0.02)
+        api.rate_limiter = RateLimiter(rate=1, capacity=1)
+        api.rate_limiter.bucket.acquire()
+        # Timing out on the rate limiter must not use up the half-open trial
+        with api.deadline(0.01):
+            self.assertRaises(KayakoDeadlineExceededError, api._request, '/Tickets/Ticket/1/', 'GET')
+        assert breaker.circuit_for('/Tickets/Ticket')._trials == 0
+        api.rate_limiter = None
+        assert api._request('/Tickets/Ticket/1/', 'GET').read() == '<ok/>'
+        assert breaker.state('/Tickets/Ticket') == CLOSED
+
+    def test_unexpected_error_releases_trial(self):
+        import time
+        from kayako.core.breaker import CircuitBreaker, CLOSED
+        from kayako.exception import KayakoResponseError
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0.01)
+        api = self._api(breaker)
+        self.assertRaises(KayakoResponseError, api._request, '/Tickets/Ticket/Fail', 'GET')
+        time.sleep(0.02)
+        self.assertRaises(ValueError, api._request, '/Tickets/Ticket/Broken', 'GET')
+        assert breaker.circuit_for('/Tickets/Ticket')._trials == 0
+        assert api._request('/Tickets/Ticket/1/', 'GET').read() == '<ok/>'
+        assert breaker.state('/Tickets/Ticket') == CLOSED
+
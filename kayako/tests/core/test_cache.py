@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+import time
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import fake_api, request_controller
+
+DEPARTMENT = '''<?xml version="1.0" encoding="UTF-8"?>
+<departments>
+    <department><id>%s</id><title>%s</title><type>public</type><module>tickets</module><displayorder>1</displayorder><parentdepartmentid>0</parentdepartmentid><uservisibilitycustom>0</uservisibilitycustom></department>
+</departments>'''
+
+STATUS = '''<?xml version="1.0" encoding="UTF-8"?>
+<ticketstatuses>
+    <ticketstatus><id>%s</id><title>Open</title><displayorder>1</displayorder><departmentid>0</departmentid><displayicon></displayicon><type>public</type><displayinmainlist>1</displayinmainlist><markasresolved>0</markasresolved><displaycount>1</displaycount><statuscolor>#000000</statuscolor><statusbgcolor>#ffffff</statusbgcolor><resetduetime>0</resetduetime><displayorder>1</displayorder><triggersurvey>0</triggersurvey><staffvisibilitycustom>0</staffvisibilitycustom></ticketstatus>
+</ticketstatuses>'''
+
+def _wait_for(condition, timeout=5):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(0.001)
+
+class TestEntityCache(KayakoTest):
+
+    def _api(self, cache, title='General'):
+        self.requested = []
+        self.title = title
+
+        def handler(method, url, body, headers):
+            controller = request_controller(url)
+            self.requested.append((method, controller))
+            id = controller.rstrip('/').split('/')[-1]
+            if controller.startswith('/Tickets/TicketStatus'):
+                return STATUS % id
+            if method == 'DELETE':
+                return ''
+            return DEPARTMENT % (id, self.title)
+
+        return fake_api(handler, cache=cache)
+
+    def test_hits_and_misses(self):
+        from kayako.core.cache import EntityCache
+        from kayako.objects import Department, TicketStatus, Ticket
+        cache = EntityCache({Department: 60, TicketStatus: 60})
+        api = self._api(cache)
+        department = api.get(Department, 1)
+        cached = api.get(Department, 1)
+        assert cached is not department and cached.parameters == department.parameters
+        assert api.get(Department, 2).id == 2
+        assert api.get(TicketStatus, 1).title == 'Open'
+        assert api.get(TicketStatus, 1).id == 1
+        assert len(self.requested) == 3
+        assert (cache.hits, cache.misses) == (2, 3)
+        assert len(cache) == 3
+        # Classes not listed are not cached
+        assert not cache.caches(Ticket)
+
+    def test_copies_are_returned(self):
+        from kayako.core.cache import EntityCache
+        from kayako.objects import Department
+        api = self._api(EntityCache({Department: 60}))
+        department = api.get(Department, 1)
+        department.title = 'Unsaved'
+        department.usergroupid.append(1)
+        cached = api.get(Department, 1)
+        assert cached.title == 'General' and cached.usergroupid == []
+        cached.title = 'Also unsaved'
+        assert api.get(Department, 1).title == 'General'
+        assert cached.api is api
+        assert len(self.requested) == 1
+
+    def test_get_many(self):
+        from kayako.core.cache import EntityCache
+        from kayako.objects import Department
+        cache = EntityCache({Department: 60})
+        api = self._api(cache)
+        api.get(Department, 1)
+        result = api.get_many(Department, [1, 2])
+        assert [department.id for department in result] == [1, 2]
+        assert len(self.requested) == 2
+        assert cache.hits == 1
+
+    def test_expires(self):
+        from kayako.core.cache import EntityCache
+        from kayako.objects import Department
+        cache = EntityCache({Department: 0.05})
+        api = self._api(cache)
+        api.get(Department, 1)
+        time.sleep(0.06)
+        self.title = 'Changed'
+        assert api.get(Department, 1).title == 'Changed'
+        assert cache.misses == 2
+
+    def test_least_recently_used(self):
+        from kayako.core.cache import EntityCache
+        from kayako.objects import Department
+        cache = EntityCache({Department: 60}, size=2)
+        api = self._api(cache)
+        api.get(Department, 1)
+        api.get(Department, 2)
+        api.get(Department, 1)
+        api.get(Department, 3)
+        assert cache.evictions == 1
+        del self.requested[:]
+        api.get(Department, 1)
+        assert self.requested == []
+        api.get(Department, 2)
+        assert len(self.requested) == 1
+
+    def test_stale_while_revalidate(self):
+        from kayako.core.cache import EntityCache
+        from kayako.objects import Department
+        cache = EntityCache({Department: 0.05}, stale=60)
+        api = self._api(cache)
+        api.get(Department, 1)
+        time.sleep(0.06)
+        self.title = 'Changed'
+        # The stale object is returned while it is fetched again
+        assert api.get(Department, 1).title == 'General'
+        assert cache.stale_hits == 1
+        _wait_for(lambda: api.get(Department, 1).title == 'Changed')
+        assert api.get(Department, 1).title == 'Changed'
+        assert cache.refreshes == 1
+        assert cache.misses == 1
+
+    def test_save_and_delete_invalidate(self):
+        from kayako.core.cache import EntityCache
+        from kayako.objects import Department
+        cache = EntityCache({Department: 60})
+        api = self._api(cache)
+        department = api.get(Department, 1)
+        department.title = 'Changed'
+        self.title = 'Changed'
+        department.save()
+        assert len(cache) == 0
+        fetched = api.get(Department, 1)
+        assert fetched is not department and fetched.title == 'Changed'
+        fetched.delete()
+        assert len(cache) == 0
+        assert [method for method, controller in self.requested] == ['GET', 'PUT', 'GET', 'DELETE']
+
+    def test_string_ids(self):
+        from kayako.core.cache import EntityCache
+        from kayako.objects import Department
+        cache = EntityCache({Department: 60})
+        api = self._api(cache)
+        department = api.get(Department, '1')
+        assert api.get(Department, 1).title == 'General'
+        assert cache.hits == 1
+        department.title = 'Changed'
+        self.title = 'Changed'
+        department.save()
+        assert len(cache) == 0
+        assert api.get(Department, '1').title == 'Changed'
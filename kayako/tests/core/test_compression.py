@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+import gzip
+import zlib
+from StringIO import StringIO
+
+from kayako.tests import KayakoTest
+
+BODY = '<?xml version="1.0"?><tickets>%s</tickets>' % ('<ticket id="1"><subject>Repeated subject</subject></ticket>' * 5000)
+
+class _Response(StringIO):
+
+    def __init__(self, body, encoding=None):
+        StringIO.__init__(self, body)
+        import mimetools
+        self.headers = mimetools.Message(StringIO('Content-Encoding: %s\r\n\r\n' % encoding if encoding else '\r\n'))
+        self.reads = []
+
+    def read(self, n=-1):
+        data = StringIO.read(self, n)
+        self.reads.append(len(data))
+        return data
+
+    def info(self):
+        return self.headers
+
+    def getcode(self):
+        return 200
+
+class TestDecodingResponse(KayakoTest):
+
+    def _gzip(self, data):
+        out = StringIO()
+        with gzip.GzipFile(fileobj=out, mode='wb') as compressed:
+            compressed.write(data)
+        return out.getvalue()
+
+    def test_gzip_streaming(self):
+        from kayako.core.compression import decode_response
+        compressed = self._gzip(BODY)
+        raw = _Response(compressed, 'gzip')
+        response = decode_response(raw)
+        chunks = []
+        while True:
+            chunk = response.read(1000)
+            if not chunk:
+                break
+            assert len(chunk) <= 1000
+            chunks.append(chunk)
+        assert ''.join(chunks) == BODY
+        assert response.compressed_bytes == len(compressed)
+        assert response.decompressed_bytes == len(BODY)
+        assert max(raw.reads) <= response.CHUNK_SIZE
+
+    def test_deflate(self):
+        from kayako.core.compression import decode_response
+        assert decode_response(_Response(zlib.compress(BODY), 'deflate')).read() == BODY
+
+    def test_raw_deflate(self):
+        from kayako.core.compression import decode_response
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        data = compressor.compress(BODY) + compressor.flush()
+        assert decode_response(_Response(data, 'deflate')).read() == BODY
+
+    def test_identity(self):
+        from kayako.core.compression import decode_response
+        response = decode_response(_Response(BODY))
+        assert response.read(10) + response.read() == BODY
+        assert response.compressed_bytes == response.decompressed_bytes == len(BODY)
+
+    def test_etree_parse(self):
+        from lxml import etree
+        from kayako.core.compression import decode_response
+        tree = etree.parse(decode_response(_Response(self._gzip(BODY), 'gzip')))
+        assert len(tree.findall('ticket')) == 5000
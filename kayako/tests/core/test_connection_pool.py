@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+import BaseHTTPServer
+import threading
+import time
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import Server
+
+class _KeepAliveHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self):
+        length = int(self.headers.getheader('Content-Length') or 0)
+        self.server.body = self.rfile.read(length) if length else ''
+        self.server.connections.add(self.client_address)
+        self.server.requests.append(self.command)
+        if 'Slow' in self.path:
+            time.sleep(0.2)
+        if 'Missing' in self.path:
+            status, body = 404, '[Error]: not found'
+        else:
+            status, body = 200, '<?xml version="1.0"?><ok>%s</ok>' % self.command
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+    def log_message(self, *args):
+        pass
+
+class TestConnectionPool(KayakoTest):
+
+    def setUp(self):
+        self.server = Server(_KeepAliveHandler)
+        self.server.connections = set()
+        self.server.requests = []
+        self.url = self.server.url
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_connection_reused(self):
+        from kayako.core.pool import ConnectionPool
+        pool = ConnectionPool(maxsize=2)
+        for _ in range(5):
+            response = pool.urlopen('GET', self.url)
+            assert response.read() == '<?xml version="1.0"?><ok>GET</ok>'
+            assert response.getcode() == 200
+        assert len(self.server.connections) == 1
+        assert pool.idle_count() == 1
+        pool.clear()
+        assert pool.idle_count() == 0
+
+    def test_high_file_descriptors_are_reused(self):
+        import os
+        from kayako.core.pool import ConnectionPool
+        pool = ConnectionPool()
+        pool.urlopen('GET', self.url).read()
+        connection = pool._idle.values()[0][0][0]
+        sock = connection.sock
+
+        class HighSocket(object):
+            # A copy of the socket above the file descriptors select can watch
+            def fileno(self):
+                return 1500
+
+        os.dup2(sock.fileno(), 1500)
+        try:
+            connection.sock = HighSocket()
+            assert not pool._is_dropped(connection)
+        finally:
+            connection.sock = sock
+            os.close(1500)
+        assert pool.urlopen('GET', self.url).read() == '<?xml version="1.0"?><ok>GET</ok>'
+        assert len(self.server.connections) == 1
+        pool.clear()
+
+    def test_unread_response_is_drained(self):
+        from kayako.core.pool import ConnectionPool
+        pool = ConnectionPool(maxsize=2)
+        pool.urlopen('DELETE', self.url).close()
+        pool.urlopen('DELETE', self.url).close()
+        assert len(self.server.connections) == 1
+
+    def test_idle_eviction(self):
+        from kayako.core.pool import ConnectionPool
+        pool = ConnectionPool(maxsize=2, idle_timeout=0)
+        pool.urlopen('GET', self.url).read()
+        import time
+        time.sleep(0.01)
+        assert pool.evict_idle() == 1
+        assert pool.idle_count() == 0
+
+    def test_maxsize(self):
+        from kayako.core.pool import ConnectionPool
+        pool = ConnectionPool(maxsize=1)
+        responses = [pool.urlopen('GET', self.url) for _ in range(3)]
+        for response in responses:
+            response.read()
+        assert len(self.server.connections) == 3
+        assert pool.idle_count() == 1
+
+    def test_threads_share_pool(self):
+        from kayako.core.pool import ConnectionPool
+        pool = ConnectionPool(maxsize=4)
+        errors = []
+
+        def work():
+            try:
+                for _ in range(20):
+                    assert pool.urlopen('GET', self.url).read().endswith('<ok>GET</ok>')
+            except Exception, error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, errors
+        assert len(self.server.connections) <= 4
+
+    def test_timeouts_are_not_replayed(self):
+        import socket
+        from kayako.core.pool import ConnectionPool
+        pool = ConnectionPool(maxsize=2)
+        pool.urlopen('GET', self.url).read()
+        for method in ('POST', 'GET'):
+            del self.server.requests[:]
+            self.assertRaises(socket.timeout, pool.urlopen, method, self.url + '?e=/Slow', 'a=1', timeout=(1, 0.05))
+            time.sleep(0.2)
+            assert self.server.requests == [method]
+            pool.urlopen('GET', self.url).read()
+
+    def test_replayable(self):
+        import errno
+        import httplib
+        import socket
+        from kayako.core.pool import ConnectionPool
+        pool = ConnectionPool()
+        reset = socket.error(errno.ECONNRESET, 'Connection reset by peer')
+        assert pool._replayable('GET', None, reset, False)
+        assert pool._replayable('GET', None, httplib.BadStatusLine(''), True)
+        assert not pool._replayable('GET', None, httplib.BadStatusLine('HTTP/1.1 x'), True)
+        assert not pool._replayable('GET', None, socket.timeout('timed out'), True)
+        assert not pool._replayable('GET', None, socket.timeout('timed out'), False)
+        assert not pool._replayable('POST', 'a=1', reset, False)
+        assert not pool._replayable('PUT', 'a=1', httplib.BadStatusLine(''), True)
+
+    def test_api_request(self):
+        from kayako.api import KayakoAPI
+        from kayako.exception import KayakoResponseError
+        api = KayakoAPI(self.url, 'key', 'secret')
+        assert api._request('/Core/TestAPI', 'GET', test='just a test').read().endswith('<ok>GET</ok>')
+        assert api._request('/Core/TestAPI', 'POST', test='just a test').read().endswith('<ok>POST</ok>')
+        assert api._request('/Core/TestAPI/1', 'PUT', x=234).read().endswith('<ok>PUT</ok>')
+        assert api._request('/Core/TestAPI/1', 'DELETE').read().endswith('<ok>DELETE</ok>')
+        assert len(self.server.connections) == 1
+        try:
+            api._request('/Core/Missing', 'GET')
+        except KayakoResponseError, error:
+            assert 'HTTP Error 404' in str(error)
+        else:
+            assert False, 'KayakoResponseError not raised'
+
+    def test_api_without_pool(self):
+        from kayako.api import KayakoAPI
+        api = KayakoAPI(self.url, 'key', 'secret', pool_size=0)
+        from kayako.core.transport import UrllibTransport
+        assert isinstance(api.transport, UrllibTransport)
+        assert api._request('/Core/TestAPI', 'GET').read().endswith('<ok>GET</ok>')
+
+    def test_api_streamed_post(self):
+        import base64
+        import os
+        import urllib
+        from kayako.api import KayakoAPI
+        api = KayakoAPI(self.url, 'key', 'secret')
+        api.STREAM_THRESHOLD = 1024
+        contents = base64.b64encode(os.urandom(100000))
+        assert api._request('/Tickets/TicketAttachment', 'POST', contents=contents, filename='a.bin').read().endswith('<ok>POST</ok>')
+        assert 'contents=%s&' % urllib.quote(contents) in self.server.body
+
+    def test_api_streamed_post_without_pool(self):
+        import urllib
+        from kayako.api import KayakoAPI
+        api = KayakoAPI(self.url, 'key', 'secret', pool_size=0)
+        api.STREAM_THRESHOLD = 1024
+        contents = 'a+b/c=' * 10000
+        assert api._request('/Tickets/TicketAttachment', 'POST', contents=contents).read().endswith('<ok>POST</ok>')
+        assert '&contents=%s&' % urllib.quote(contents) in self.server.body
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+import threading
+import time
+import urllib
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import ticket_count, ticket_rows, fake_api, request_controller
+
+# (id, departmentid, statusid, ownerstaffid)
+ROWS = [(id, 1 + id % 3, 1 + id % 2, id % 4) for id in range(1, 101)]
+
+class FakeTickets(object):
+    ''' Serves TicketCount and Ticket ListAll from a list of rows. '''
+
+    DEPARTMENT = '<department><id>%s</id><title>Department %s</title><type>public</type><module>%s</module><displayorder>1</displayorder><parentdepartmentid>0</parentdepartmentid><uservisibilitycustom>0</uservisibilitycustom></department>'
+
+    def __init__(self, rows, delay=0):
+        self.rows = rows
+        self.counted = rows
+        self.delay = delay
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def __call__(self, method, url, body, headers):
+        controller = request_controller(url)
+        with self.lock:
+            self.sent.append(controller)
+        if controller.startswith('/Tickets/TicketCount'):
+            return ticket_count(self.counted)
+        if controller.startswith('/Base/Department'):
+            ids = sorted(set(row[1] for row in self.rows))
+            return '<departments>%s%s</departments>' % (''.join(self.DEPARTMENT % (id, id, 'tickets') for id in ids), self.DEPARTMENT % (99, 99, 'livechat'))
+        time.sleep(self.delay)
+        departments, statuses, staff, users, count, start = controller.split('/')[4:10]
+        selected = [row for row in self.rows
+                    if str(row[1]) in departments.split(',')
+                    and (statuses == '-1' or str(row[2]) in statuses.split(','))
+                    and (staff == '-1' or str(row[3]) in staff.split(','))]
+        return ticket_rows(selected[int(start):int(start) + int(count)])
+
+    def pages(self):
+        return [controller for controller in self.sent if 'ListAll' in controller]
+
+class TestTicketCountPlan(KayakoTest):
+
+    def test_plan_pages(self):
+        from kayako.objects import TicketCount
+        from lxml import etree
+        from StringIO import StringIO
+        counts = TicketCount(**TicketCount._parse_ticket_count(etree.parse(StringIO(ticket_count(ROWS)))))
+        # 33, 34 and 33 tickets
+        assert counts.plan_pages(10) == [(1, -1, -1, start) for start in range(0, 33, 10)] + [(2, -1, -1, start) for start in range(0, 34, 10)] + [(3, -1, -1, start) for start in range(0, 33, 10)]
+        assert counts.plan_pages(10, departments=[2], statuses=[1, 2]) == [(2, 1, -1, 0), (2, 1, -1, 10), (2, 2, -1, 0), (2, 2, -1, 10)]
+        # Unassigned tickets
+        assert counts.plan_pages(10, departments=[1], staff=[0]) == [(1, -1, 0, 0)]
+        assert counts.plan_pages(10, departments=[4]) == []
+
+class TestGetAllTickets(KayakoTest):
+
+    def _api(self, rows):
+        self.server = FakeTickets(rows)
+        return fake_api(self.server)
+
+    def test_all_tickets(self):
+        api = self._api(ROWS)
+        tickets = api.get_all_tickets(page_size=10, workers=4)
+        assert sorted(ticket.id for ticket in tickets) == range(1, 101)
+        assert not tickets.errors
+        # One request per planned page
+        assert len(self.server.pages()) == 12
+
+    def test_filters(self):
+        api = self._api(ROWS)
+        tickets = api.get_all_tickets(departments=[1, 2], statuses=[2], staff=[1, 3], page_size=5)
+        expected = [row[0] for row in ROWS if row[1] in (1, 2) and row[2] == 2 and row[3] in (1, 3)]
+        assert sorted(ticket.id for ticket in tickets) == sorted(expected)
+
+    def test_stale_counts(self):
+        api = self._api(ROWS)
+        # Tickets were added after they were counted
+        self.server.counted = [row for row in ROWS if row[0] <= 60]
+        tickets = api.get_all_tickets(page_size=10)
+        assert sorted(ticket.id for ticket in tickets) == range(1, 101)
+
+    def test_duplicates(self):
+        # A ticket listed under two statuses while they are crawled
+        api = self._api(ROWS + [(2, 3, 2, 2)])
+        tickets = api.get_all_tickets(statuses=[1, 2], page_size=10)
+        assert sorted(ticket.id for ticket in tickets) == range(1, 101)
+
+    def test_errors(self):
+        api = self._api(ROWS)
+        handler = api.transport.handler
+        api.transport.handler = lambda method, url, body, headers: (404, {}, 'missing') if 'ListAll/2/' in urllib.unquote(url) else handler(method, url, body, headers)
+        tickets = api.get_all_tickets(page_size=10)
+        assert len(tickets) == 66
+        assert sorted(tickets.errors) == [(2, -1, -1, start) for start in range(0, 34, 10)]
+
+class TestCrawlTickets(KayakoTest):
+
+    def _api(self, rows, delay=0):
+        self.server = FakeTickets(rows, delay)
+        return fake_api(self.server)
+
+    def test_crawl(self):
+        api = self._api(ROWS)
+        updates = []
+        crawl = api.crawl_tickets(workers=2, page_size=10, progress=lambda shard: updates.append((shard.key, shard.pages, shard.done)))
+        assert sorted(ticket.id for ticket in crawl) == range(1, 101)
+        assert crawl.done and not crawl.errors
+        # The livechat department is not crawled
+        assert [shard.key for shard in crawl.shards] == [(1, -1), (2, -1), (3, -1)]
+        assert [(shard.pages, shard.tickets) for shard in crawl.shards] == [(4, 33), (4, 34), (4, 33)]
+        assert ((2, -1), 4, True) in updates
+        assert len(updates) == 15
+
+    def test_shard_by_status(self):
+        api = self._api(ROWS)
+        crawl = api.crawl_tickets(departments=[1, 3], statuses=[1, 2], page_size=10)
+        assert sorted(ticket.id for ticket in crawl) == sorted(row[0] for row in ROWS if row[1] in (1, 3))
+        assert [shard.key for shard in crawl.shards] == [(1, 1), (1, 2), (3, 1), (3, 2)]
+
+    def test_shards_run_concurrently(self):
+        rows = [(id, 1 + id % 8, 1, 1) for id in range(1, 81)]
+        api = self._api(rows, delay=0.1)
+        start = time.time()
+        assert len(list(api.crawl_tickets(departments=range(1, 9), workers=8, page_size=10))) == 80
+        # Two pages per department: about 0.2s rather than 1.6s
+        assert time.time() - start < 0.8
+
+    def test_errors(self):
+        from kayako.exception import KayakoResponseError
+        api = self._api(ROWS)
+        handler = api.transport.handler
+        api.transport.handler = lambda method, url, body, headers: (500, {}, 'error') if 'ListAll/2/-1/-1/-1/10/10' in urllib.unquote(url) else handler(method, url, body, headers)
+        crawl = api.crawl_tickets(departments=[1, 2, 3], page_size=10)
+        # Tickets of the first page of the failed shard are kept
+        assert len(list(crawl)) == 76
+        assert crawl.errors.keys() == [(2, -1)]
+        assert isinstance(crawl.errors[(2, -1)], KayakoResponseError)
+
+    def test_consumer_stops(self):
+        api = self._api(ROWS)
+        crawl = api.crawl_tickets(page_size=1, workers=3)
+        tickets = iter(crawl)
+        tickets.next()
+        tickets.close()
+        time.sleep(0.3)
+        sent = len(self.server.sent)
+        time.sleep(0.2)
+        assert len(self.server.sent) == sent < 50
+        assert not [thread for thread in threading.enumerate() if thread.name.startswith('kayako-crawl')]
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+import BaseHTTPServer
+import threading
+import time
+from StringIO import StringIO
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import Server, fake_api
+
+DEPARTMENTS = '''<?xml version="1.0" encoding="UTF-8"?>
+<departments>
+    <department><id>1</id><title>General</title><type>public</type><module>tickets</module><displayorder>1</displayorder><parentdepartmentid>0</parentdepartmentid><uservisibilitycustom>0</uservisibilitycustom></department>
+</departments>'''
+
+class _SlowHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if 'Slow' in self.path:
+            time.sleep(1)
+        body = '<ok/>'
+        if 'Department' in self.path:
+            # A body sent slowly, in pieces that each arrive within the timeouts
+            body = DEPARTMENTS.replace('<departments>', '<departments><!-- %s -->' % ('x' * 2000000))
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        for start in xrange(0, len(body), 100000):
+            self.wfile.write(body[start:start + 100000])
+            time.sleep(0.1 if 'Department' in self.path else 0)
+
+    def log_message(self, *args):
+        pass
+
+class _SlowBody(object):
+
+    def __init__(self, body):
+        self.body = StringIO(body)
+
+    def read(self, amt=None):
+        time.sleep(0.02)
+        return self.body.read(1000)
+
+class TestDeadline(KayakoTest):
+
+    def test_deadline(self):
+        from kayako.core.deadline import Deadline
+        from kayako.exception import KayakoDeadlineExceededError
+        deadline = Deadline(0.05)
+        assert 0 < deadline.remaining() <= 0.05
+        deadline.check()
+        time.sleep(0.06)
+        assert deadline.expired()
+        assert deadline.remaining() == 0
+        self.assertRaises(KayakoDeadlineExceededError, deadline.check)
+
+    def test_coerce_and_earliest(self):
+        from kayako.core.deadline import Deadline
+        deadline = Deadline(10)
+        assert Deadline.coerce(deadline) is deadline
+        assert Deadline.coerce(None) is None
+        assert 4 < Deadline.coerce(5).remaining() <= 5
+        assert Deadline.earliest(None, deadline, Deadline(20)) is deadline
+        assert Deadline.earliest(None, None) is None
+
+class TestTimeouts(KayakoTest):
+
+    def setUp(self):
+        self.server = Server(_SlowHandler)
+        self.url = self.server.url
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_read_timeout(self):
+        from kayako.api import KayakoAPI
+        from kayako.core.retry import NO_RETRY
+        from kayako.exception import KayakoRequestError
+        for pool_size in (10, 0):
+            api = KayakoAPI(self.url, 'key', 'secret', pool_size=pool_size, retry_policy=NO_RETRY, connect_timeout=0.1, read_timeout=0.1)
+            start = time.time()
+            self.assertRaises(KayakoRequestError, api._request, '/Core/Slow', 'GET')
+            assert time.time() - start < 0.9
+            assert api._request('/Core/Fast', 'GET').read() == '<ok/>'
+
+    def test_deadline_cuts_read_timeout(self):
+        from kayako.api import KayakoAPI
+        from kayako.exception import KayakoDeadlineExceededError
+        api = KayakoAPI(self.url, 'key', 'secret')
+        start = time.time()
+        with api.deadline(0.1):
+            self.assertRaises(KayakoDeadlineExceededError, api._request, '/Core/Slow', 'GET')
+        assert time.time() - start < 0.9
+
+    def test_deadline_limits_slow_body(self):
+        from kayako.api import KayakoAPI
+        from kayako.exception import KayakoDeadlineExceededError
+        from kayako.objects import Department
+        api = KayakoAPI(self.url, 'key', 'secret')
+        start = time.time()
+        self.assertRaises(KayakoDeadlineExceededError, api.get_all, Department, deadline=0.2)
+        assert time.time() - start < 0.9
+
+class TestDeadlinePropagation(KayakoTest):
+
+    def _api(self, delay=0, **kwargs):
+        self.sent = []
+
+        def handler(method, url, body, headers):
+            self.sent.append(url)
+            time.sleep(delay)
+            return DEPARTMENTS
+
+        return fake_api(handler, **kwargs)
+
+    def test_methods_accept_deadline(self):
+        from kayako.core.deadline import Deadline
+        from kayako.exception import KayakoDeadlineExceededError
+        from kayako.objects import Department
+        api = self._api()
+        assert len(api.get_all(Department, deadline=5)) == 1
+        assert api.get(Department, 1, deadline=Deadline(5)).id == 1
+        assert api.filter(Department, module='tickets', deadline=5)[0].id == 1
+        assert api.first(Department, title='General', deadline=5).id == 1
+        expired = Deadline(0)
+        for call in (lambda: api.get_all(Department, deadline=expired),
+                     lambda: api.get(Department, 1, deadline=expired),
+                     lambda: api.filter(Department, deadline=expired),
+                     lambda: api.first(Department, deadline=expired),
+                     lambda: api.ticket_search('a', deadline=expired),
+                     lambda: api.ticket_search_full('a', deadline=expired),
+                     lambda: api.user_search('a', deadline=expired)):
+            self.assertRaises(KayakoDeadlineExceededError, call)
+        assert len(self.sent) == 4
+        assert api._current_deadline() is None
+
+    def test_search_bodies_are_limited(self):
+        from kayako.exception import KayakoDeadlineExceededError
+        api = self._api()
+        api.transport.handler = lambda method, url, body, headers: (200, {}, _SlowBody('<tickets><!-- %s --></tickets>' % ('x' * 200000)))
+        for call in (lambda: api.ticket_search('a', deadline=0.1),
+                     lambda: api.ticket_search_full('a', deadline=0.1),
+                     lambda: api.user_search('a', deadline=0.1)):
+            start = time.time()
+            self.assertRaises(KayakoDeadlineExceededError, call)
+            assert time.time() - start < 0.5
+
+    def test_sub_requests_share_deadline(self):
+        from kayako.exception import KayakoDeadlineExceededError
+        from kayako.objects import Department
+        api = self._api(delay=0.04)
+        with api.deadline(0.1):
+            # A nested, later deadline does not extend the outer one
+            with api.deadline(60) as deadline:
+                assert deadline.remaining() <= 0.1
+                self.assertRaises(KayakoDeadlineExceededError, lambda: [api.get(Department, 1) for _ in range(10)])
+        assert 2 <= len(self.sent) <= 3
+
+    def test_get_many_cancels_pending_items(self):
+        from kayako.exception import KayakoDeadlineExceededError
+        from kayako.objects import Department
+        api = self._api(delay=0.04)
+        result = api.get_many(Department, range(10), workers=2, deadline=0.1)
+        assert 2 <= len(self.sent) <= 6
+        # Requests that were not sent in time fail, as do responses that
+        # arrived after the deadline
+        assert len(result.errors) >= 10 - len(self.sent)
+        assert len(result.errors) + len(filter(None, result)) == 10
+        assert all(isinstance(error, KayakoDeadlineExceededError) for error in result.errors.values())
+
+    def test_retry_delay_beyond_deadline(self):
+        from kayako.core.retry import RetryPolicy
+        from kayako.exception import KayakoResponseError
+        api = self._api(retry_policy=RetryPolicy(backoff=10, jitter=0))
+        api.transport.handler = lambda method, url, body, headers: self.sent.append(url) or (503, {}, 'down')
+        start = time.time()
+        with api.deadline(1):
+            self.assertRaises(KayakoResponseError, api._request, '/Core/Test', 'GET')
+        assert time.time() - start < 0.5
+        assert len(self.sent) == 1
+
+    def test_rate_limiter_wait_beyond_deadline(self):
+        from kayako.core.ratelimit import RateLimiter
+        from kayako.exception import KayakoDeadlineExceededError
+        api = self._api(rate_limiter=RateLimiter(rate=0.1, capacity=1))
+        api._request('/Core/Test', 'POST')
+        start = time.time()
+        with api.deadline(0.1):
+            self.assertRaises(KayakoDeadlineExceededError, api._request, '/Core/Test', 'POST')
+        assert time.time() - start < 0.5
+
+    def test_shared_request_wait_is_limited(self):
+        from kayako.exception import KayakoDeadlineExceededError
+        api = self._api(delay=0.5, single_flight=True)
+        leader = threading.Thread(target=api._request, args=('/Core/Test', 'GET'))
+        leader.start()
+        while not self.sent:
+            time.sleep(0.001)
+        start = time.time()
+        with api.deadline(0.05):
+            self.assertRaises(KayakoDeadlineExceededError, api._request, '/Core/Test', 'GET')
+        assert time.time() - start < 0.3
+        leader.join()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import fake_api
+
+class TestFormEncoder(KayakoTest):
+
+    def test_encode_matches_quote(self):
+        import urllib
+        from kayako.core.form import default_encoder
+        value = ''.join(chr(i) for i in range(256)) * 3
+        assert default_encoder.encode(dict(data=value)) == 'data=%s' % urllib.quote(value)
+
+    def test_order(self):
+        from kayako.core.form import FormEncoder
+        encoder = FormEncoder(['subject', 'contents', 'tags'])
+        parameters = dict(signature='s', contents='b c', subject='a', apikey='k', tags=['x', 'y'], empty=[])
+        assert encoder.encode(parameters) == 'subject=a&contents=b%20c&tags[]=x&tags[]=y&apikey=k&empty[]=&signature=s'
+
+    def test_custom_add_uses_class_order(self):
+        from kayako.objects import TicketNote
+        bodies = []
+
+        def handler(method, url, body, headers):
+            bodies.append(body)
+            raise ValueError('stop after sending')
+
+        api = fake_api(handler)
+        note = api.create(TicketNote, notecolor=1, staffid=2, contents='a note', ticketid=3)
+        self.assertRaises(ValueError, note.add)
+        assert bodies[0].startswith('ticketid=3&contents=a%20note&staffid=2&notecolor=1&')
+
+    def test_empty(self):
+        from kayako.core.form import default_encoder
+        assert default_encoder.encode({}) is None
+        assert default_encoder.content_length({}) == 0
+
+    def test_chunks_and_length(self):
+        import base64
+        import os
+        from kayako.core.form import FormEncoder
+        encoder = FormEncoder(['filename', 'contents'], chunk_size=1000)
+        parameters = dict(filename='a b.txt', contents=base64.b64encode(os.urandom(30000)), ticketid='1')
+        chunks = list(encoder.iter_encode(parameters))
+        assert max(len(chunk) for chunk in chunks) <= 3000
+        body = ''.join(chunks)
+        assert body == encoder.encode(parameters)
+        assert encoder.content_length(parameters) == len(body)
+
+class TestIterReader(KayakoTest):
+
+    def test_read(self):
+        from kayako.core.form import IterReader
+        chunks = ['abc', 'defgh', '', 'ij']
+        reader = IterReader(chunks, length=10)
+        assert len(reader) == 10
+        assert [reader.read(4) for _ in range(4)] == ['abcd', 'efgh', 'ij', '']
+        reader = IterReader(chunks)
+        assert reader.read(2) + reader.read() == 'abcdefghij'
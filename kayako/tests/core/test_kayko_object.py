@@ -43,3 +43,24 @@ class TestKayakoObject(KayakoTest):
     def test_kayko_delete(self):
         from kayako.exception import KayakoMethodNotImplementedError
         self.assertRaises(KayakoMethodNotImplementedError, self.kayako_object.delete)
+
+    def test_kayako_object_defaults(self):
+        from kayako.core.lib import UnsetParameter
+        from kayako.core.object import KayakoObject
+        o = KayakoObject(None)
+        assert o.id is UnsetParameter
+        assert o.api is None
+        del o.api
+        assert o.api is None
+
+    def test_from_parameters(self):
+        from kayako.core.lib import UnsetParameter
+        from kayako.objects import Department
+        api = self.api
+        department = Department._from_parameters(api, dict(id=1, title='Support'))
+        assert type(department) is Department
+        assert department.api is api
+        assert department.id == 1
+        assert department.title == 'Support'
+        assert department.module is UnsetParameter
+        assert department.parameters == Department(api, id=1, title='Support').parameters
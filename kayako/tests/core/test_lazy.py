@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import tickets, users, fake_api, request_controller
+
+class TestLazyObjects(KayakoTest):
+
+    def _api(self, lazy=True, body=None):
+        def handler(method, url, body_=None, headers=None):
+            if body is not None:
+                return body
+            if 'User' in url:
+                return users(range(1, 4))
+            return tickets(range(1, 4))
+
+        return fake_api(handler, lazy=lazy)
+
+    def _decoded(self, object, name):
+        ''' Return whether ``name`` has been set on ``object``, without decoding it. '''
+        try:
+            object.__getattribute__(name)
+        except AttributeError:
+            return False
+        return True
+
+    def test_matches_eager(self):
+        from kayako.objects import Ticket, User
+        lazy = self._api()
+        eager = self._api(lazy=False)
+        for lazy_objects, eager_objects in ((lazy.get_all(Ticket, 1), eager.get_all(Ticket, 1)),
+                                            (lazy.ticket_search('a'), eager.ticket_search('a')),
+                                            (lazy.get_all(User), eager.get_all(User)),
+                                            (lazy.user_search('a'), eager.user_search('a'))):
+            assert len(lazy_objects) == len(eager_objects) == 3
+            for lazy_object, eager_object in zip(lazy_objects, eager_objects):
+                lazy_parameters = lazy_object.parameters
+                eager_parameters = eager_object.parameters
+                assert sorted(lazy_parameters) == sorted(eager_parameters)
+                for name, value in eager_parameters.iteritems():
+                    if name in ('notes', 'timetracks', 'posts'):
+                        assert [item.parameters for item in lazy_parameters[name]] == [item.parameters for item in value]
+                    else:
+                        assert lazy_parameters[name] == value, name
+
+    def test_decodes_fields_used(self):
+        from kayako.objects import Ticket
+        ticket = self._api().get(Ticket, 1)
+        assert not self._decoded(ticket, 'subject')
+        assert ticket.subject == 'Ticket 1'
+        assert self._decoded(ticket, 'subject')
+        assert not self._decoded(ticket, 'lastactivity')
+        assert not self._decoded(ticket, 'posts')
+        post = ticket.posts[0]
+        assert not self._decoded(post, 'contents')
+        assert post.contents == 'Hello'
+        assert post.ticketid == 1
+
+    def test_write_overrides(self):
+        from kayako.core.lib import UnsetParameter
+        from kayako.objects import Ticket
+        ticket = self._api().get(Ticket, 1)
+        ticket.subject = 'Changed'
+        assert ticket.subject == 'Changed'
+        assert ticket.save_parameters['subject'] == 'Changed'
+        assert ticket.save_parameters['departmentid'] == 1
+        # Parameters outside the schema are unset, as when parsed at once
+        assert ticket.contents is UnsetParameter
+        assert 'contents' not in ticket.parameters
+
+    def test_invalid_field_raises_when_read(self):
+        from kayako.exception import KayakoResponseError
+        from kayako.objects import Ticket
+        api = self._api(body=tickets([1]).replace('<replies>1</replies>', '<replies>x</replies>'))
+        ticket = api.get(Ticket, 1)
+        assert ticket.subject == 'Ticket 1'
+        self.assertRaises(KayakoResponseError, getattr, ticket, 'replies')
+        self.assertRaises(KayakoResponseError, self._api(lazy=False, body=tickets([1]).replace('<replies>1</replies>', '<replies>x</replies>')).get, Ticket, 1)
+
+    def test_streamed_are_decoded(self):
+        from kayako.objects import Ticket
+        streamed = list(self._api().get_all(Ticket, 1, stream=True))
+        assert self._decoded(streamed[0], 'subject')
+        assert [ticket.subject for ticket in streamed] == ['Ticket 1', 'Ticket 2', 'Ticket 3']
+        assert streamed[0].posts[0].contents == 'Hello'
+
+class TestLazyCollections(KayakoTest):
+
+    def _api(self, body, lazy=False):
+        import re
+        self.requested = []
+
+        def handler(method, url, body_, headers):
+            controller = request_controller(url)
+            self.requested.append(controller)
+            if controller.startswith('/Tickets/TicketPost/'):
+                return '<posts>%s</posts>' % re.search(r'<post>.*</post>', tickets([1]), re.S).group(0)
+            if controller.startswith('/Tickets/TicketNote/'):
+                return '<notes></notes>'
+            if controller.startswith('/Tickets/TicketTimeTrack/'):
+                return '<timetracks></timetracks>'
+            return body
+
+        return fake_api(handler, lazy=lazy)
+
+    def test_lazy_list(self):
+        from kayako.core.lib import LazyList
+        calls = []
+
+        def load():
+            calls.append(1)
+            return [1, 2, 3]
+
+        items = LazyList(load)
+        assert not items.loaded
+        assert 'not loaded' in repr(items)
+        assert len(items) == 3
+        assert items.loaded
+        assert items[1] == 2 and 3 in items and list(items) == [1, 2, 3]
+        assert items == [1, 2, 3] and items == LazyList(lambda: [1, 2, 3])
+        assert calls == [1]
+        assert not LazyList(list)
+
+    def test_built_when_used(self):
+        from kayako.core.lib import LazyList
+        from kayako.objects import Ticket
+        ticket = self._api(tickets([1])).get_all(Ticket, 1)[0]
+        assert isinstance(ticket.posts, LazyList)
+        assert not ticket.posts.loaded and not ticket.notes.loaded and not ticket.timetracks.loaded
+        assert [note.contents for note in ticket.notes] == ['A note']
+        assert not ticket.timetracks.loaded
+        assert [timetrack.contents for timetrack in ticket.timetracks] == ['Worked']
+        assert [post.contents for post in ticket.posts] == ['Hello']
+        assert self.requested == ['/Tickets/Ticket/ListAll/1/-1/-1/-1/1000/0']
+
+    def test_lazy_ticket_shares_notes(self):
+        from kayako.objects import Ticket
+        ticket = self._api(tickets([1]), lazy=True).get(Ticket, 1)
+        notes = ticket.notes
+        # Reading the notes also set the time tracks, sharing the split of the note elements
+        timetracks = object.__getattribute__(ticket, 'timetracks')
+        assert not timetracks.loaded
+        assert [note.contents for note in notes] == ['A note']
+        assert [timetrack.contents for timetrack in ticket.timetracks] == ['Worked']
+        assert ticket.timetracks is timetracks
+
+    def test_fetched_without_posts_element(self):
+        import re
+        from kayako.objects import Ticket
+        body = re.sub(r'<posts>.*</posts>', '', tickets([1]), flags=re.S)
+        ticket = self._api(body).get_all(Ticket, 1)[0]
+        assert self.requested == ['/Tickets/Ticket/ListAll/1/-1/-1/-1/1000/0']
+        assert [post.contents for post in ticket.posts] == ['Hello']
+        assert self.requested[-1] == '/Tickets/TicketPost/ListAll/1'
+        # Embedded notes are still used
+        assert [note.contents for note in ticket.notes] == ['A note']
+        assert [timetrack.contents for timetrack in ticket.timetracks] == ['Worked']
+        assert self.requested[1:] == ['/Tickets/TicketPost/ListAll/1']
+
+    def test_fetched_without_posts_or_notes(self):
+        import re
+        from kayako.objects import Ticket
+        body = re.sub(r'<note .*?</note>', '', re.sub(r'<posts>.*</posts>', '', tickets([1]), flags=re.S), flags=re.S)
+        ticket = self._api(body).get_all(Ticket, 1)[0]
+        assert list(ticket.notes) == [] and list(ticket.timetracks) == []
+        assert self.requested[1:] == ['/Tickets/TicketNote/ListAll/1', '/Tickets/TicketTimeTrack/ListAll/1']
@@ -145,6 +145,23 @@ class TestNodeParser(KayakoTest):
         assert NodeParser._get_date(self._etree_with_data(''), required=False, strict=True) == None
         self.assertRaises(ValueError, NodeParser._get_date, self._etree_with_data('abc'), required=False, strict=True)
 
+    def test__parse_epoch(self):
+        from kayako.core.lib import NodeParser, FOREVER
 
+        assert NodeParser._parse_epoch('1309262424') == 1309262424
+        assert NodeParser._parse_epoch('0') is FOREVER
+        assert NodeParser._parse_epoch(None, required=False) is None
+        self.assertRaises(ValueError, NodeParser._parse_epoch, 'abc')
 
-
+    def test_fromtimestamp(self):
+        from datetime import datetime
+        from kayako.core.lib import fromtimestamp, fromtimestamps, FOREVER, UTC
+
+        assert fromtimestamp(1309262424) == datetime.fromtimestamp(1309262424)
+        # Conversions are remembered
+        assert fromtimestamp(1309262424) is fromtimestamp(1309262424)
+        converted = fromtimestamps([1309262424, FOREVER, None, 60])
+        assert converted[0] == datetime(2011, 6, 28, 12, 0, 24, tzinfo=UTC)
+        assert converted[0].utcoffset().seconds == 0
+        assert converted[1] is FOREVER and converted[2] is None
+        assert converted[3] == datetime(1970, 1, 1, 0, 1, tzinfo=UTC)
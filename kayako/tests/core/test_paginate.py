@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+import re
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import tickets, users, fake_api, request_controller
+
+NEWS_CATEGORY = '<newscategory><id>%s</id><title>Category %s</title><newsitemcount>0</newsitemcount><visibilitytype>public</visibilitytype></newscategory>'
+
+class TestPaginate(KayakoTest):
+
+    def test_offset_pages(self):
+        from kayako.core.paginate import iter_offset_pages
+        pages = []
+
+        def fetch(count, start):
+            pages.append((count, start))
+            return range(start, min(start + count, 25))
+
+        assert list(iter_offset_pages(fetch, 10)) == range(25)
+        assert pages == [(10, 0), (10, 10), (10, 20)]
+        assert list(iter_offset_pages(fetch, 5, start=20)) == range(20, 25)
+        # Exact multiples need one more, empty, page
+        del pages[:]
+        assert list(iter_offset_pages(fetch, 5, start=15)) == range(15, 25)
+        assert pages == [(5, 15), (5, 20), (5, 25)]
+
+    def test_marker_pages(self):
+        from kayako.core.paginate import iter_marker_pages
+        ids = [1, 2, 5, 8, 9, 12, 20]
+        pages = []
+
+        def fetch(count, marker):
+            pages.append(marker)
+            return [id for id in ids if id >= marker][:count]
+
+        assert list(iter_marker_pages(fetch, 3, 0, lambda id: id)) == ids
+        assert pages == [0, 6, 13]
+        assert list(iter_marker_pages(fetch, 3, 9, lambda id: id)) == [9, 12, 20]
+
+class TestReadAhead(KayakoTest):
+
+    def test_bounded(self):
+        import time
+        from kayako.core.paginate import read_ahead
+        produced = []
+
+        def pages():
+            for number in range(10):
+                produced.append(number)
+                yield number
+
+        pages = read_ahead(pages(), 2)
+        assert pages.next() == 0
+        time.sleep(0.05)
+        # One item consumed, two queued and one waiting to be queued
+        assert len(produced) == 4
+        assert list(pages) == range(1, 10)
+
+    def test_errors(self):
+        from kayako.core.paginate import read_ahead
+        from kayako.exception import KayakoResponseError
+
+        def pages():
+            yield 1
+            raise KayakoResponseError('HTTP Error 500: Internal Server Error: ')
+
+        pages = read_ahead(pages(), 2)
+        assert pages.next() == 1
+        self.assertRaises(KayakoResponseError, pages.next)
+
+    def test_consumer_stops(self):
+        import threading
+        import time
+        from kayako.core.paginate import read_ahead
+
+        def pages():
+            number = 0
+            while True:
+                yield number
+                number += 1
+
+        pages = read_ahead(pages(), 1)
+        pages.next()
+        pages.close()
+        time.sleep(0.3)
+        assert not [thread for thread in threading.enumerate() if thread.name == 'kayako-read-ahead']
+
+    def test_prefetched_pages(self):
+        from kayako.core.paginate import iter_offset_pages, iter_marker_pages
+        fetch = lambda count, start: range(start, min(start + count, 25))
+        assert list(iter_offset_pages(fetch, 10, prefetch=2)) == range(25)
+        assert list(iter_offset_pages(fetch, 5, start=15, prefetch=1)) == range(15, 25)
+        assert list(iter_marker_pages(fetch, 10, 3, lambda id: id, prefetch=2)) == range(3, 25)
+
+class TestIterAll(KayakoTest):
+
+    def _api(self, total=25):
+        self.sent = []
+
+        def handler(method, url, body, headers):
+            controller = request_controller(url)
+            self.sent.append(controller)
+            numbers = [int(number) for number in re.findall(r'-?\d+', controller)]
+            if controller.startswith('/Base/User/Filter'):
+                marker, count = numbers
+                return users(range(max(marker, 1), total + 1)[:count])
+            count, start = numbers[-2:]
+            ids = range(start + 1, min(start + count, total) + 1)
+            if controller.startswith('/News/Category'):
+                return '<newscategories>%s</newscategories>' % ''.join(NEWS_CATEGORY % (id, id) for id in ids)
+            return tickets(ids)
+
+        return fake_api(handler)
+
+    def test_tickets(self):
+        from kayako.objects import Ticket
+        api = self._api()
+        assert [ticket.id for ticket in api.iter_all(Ticket, 1, page_size=10)] == range(1, 26)
+        assert self.sent == ['/Tickets/Ticket/ListAll/1/-1/-1/-1/10/0', '/Tickets/Ticket/ListAll/1/-1/-1/-1/10/10', '/Tickets/Ticket/ListAll/1/-1/-1/-1/10/20']
+
+    def test_stops_early(self):
+        from itertools import islice
+        from kayako.objects import Ticket
+        api = self._api()
+        assert [ticket.id for ticket in islice(Ticket.iter_all(api, [1, 2], ticketstatusid=3, page_size=10, start=5), 3)] == [6, 7, 8]
+        assert self.sent == ['/Tickets/Ticket/ListAll/1,2/3/-1/-1/10/5']
+
+    def test_users(self):
+        from kayako.objects import User
+        api = self._api()
+        assert [user.id for user in api.iter_all(User, page_size=10)] == range(1, 26)
+        assert self.sent == ['/Base/User/Filter/0/10/', '/Base/User/Filter/11/10/', '/Base/User/Filter/21/10/']
+        del self.sent[:]
+        assert [user.id for user in User.iter_all(api, marker=20, page_size=10)] == range(20, 26)
+
+    def test_news_categories(self):
+        from kayako.objects import NewsCategory
+        api = self._api(total=4)
+        assert [category.title for category in api.iter_all(NewsCategory, page_size=2)] == ['Category 1', 'Category 2', 'Category 3', 'Category 4']
+        assert len(self.sent) == 3
+
+    def test_prefetch(self):
+        from kayako.objects import KnowledgebaseCategory, Ticket, User
+        api = self._api()
+        assert [ticket.id for ticket in api.iter_all(Ticket, 1, page_size=10, prefetch=2)] == range(1, 26)
+        assert [user.id for user in api.iter_all(User, page_size=10, prefetch=1)] == range(1, 26)
+        assert len(self.sent) == 6
+
+    def test_prefetch_keeps_deadline(self):
+        from kayako.exception import KayakoDeadlineExceededError
+        from kayako.objects import Ticket
+        api = self._api()
+        with api.deadline(0):
+            tickets = api.iter_all(Ticket, 1, page_size=10, prefetch=2)
+        self.assertRaises(KayakoDeadlineExceededError, list, tickets)
+        assert not self.sent
+
+    def test_not_paginated(self):
+        from kayako.exception import KayakoMethodNotImplementedError
+        from kayako.objects import Department
+        self.assertRaises(KayakoMethodNotImplementedError, self._api().iter_all, Department)
@@ -80,4 +80,41 @@ class TestParameterObject(KayakoTest):
         assert o.b == 3
         assert o.c is UnsetParameter
 
+    def test_slots(self):
+        from kayako.core.lib import ParameterObject, UnsetParameter
+
+        class obj(ParameterObject):
+            __parameters__ = ['a', 'b']
+
+        class subobj(obj):
+            __parameters__ = ['a', 'b', 'c']
+
+        assert obj.__slots__ == ('a', 'b')
+        assert subobj.__slots__ == ('c',)
 
+        o = subobj(a=1, c=3)
+        assert o.a == 1
+        assert o.b is UnsetParameter
+        assert o.c == 3
+        assert o.__dict__ == {}
+        assert o.parameters == dict(a=1, c=3)
+        self.assertRaises(AttributeError, getattr, o, 'd')
+
+        o.d = 4
+        assert o.d == 4
+        assert o.parameters == dict(a=1, c=3)
+
+    def test_pickle(self):
+        import pickle
+        from kayako.core.lib import UnsetParameter
+        from kayako.objects import Department
+
+        department = Department(None, id=1, title='x', usergroupid=[1, 2])
+        department.extra = 'kept'
+        for protocol in (0, 2):
+            o = pickle.loads(pickle.dumps(department, protocol))
+            assert type(o) is Department
+            assert o.parameters == department.parameters
+            assert o.api is None
+            assert o.type is UnsetParameter
+            assert o.extra == 'kept'
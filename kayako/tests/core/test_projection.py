@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import tickets, users, fake_api, request_controller
+
+PRIORITIES = '''<?xml version="1.0" encoding="UTF-8"?>
+<ticketpriorities>
+    <ticketpriority><id>1</id><title>Low</title><displayorder>1</displayorder><type>public</type><uservisibilitycustom>0</uservisibilitycustom></ticketpriority>
+    <ticketpriority><id>2</id><title>High</title><displayorder>2</displayorder><type>private</type><uservisibilitycustom>0</uservisibilitycustom></ticketpriority>
+</ticketpriorities>'''
+
+class TestProjection(KayakoTest):
+
+    def _api(self):
+        def handler(method, url, body, headers):
+            controller = request_controller(url)
+            if controller.startswith('/Tickets/TicketPriority'):
+                return PRIORITIES
+            if 'User' in controller:
+                return users(range(1, 4))
+            return tickets(range(1, 4))
+
+        return fake_api(handler)
+
+    def test_get_all_fields(self):
+        from kayako.core.lib import NotLoaded
+        from kayako.objects import Ticket
+        ticket = self._api().get_all(Ticket, 1, fields=['subject', 'lastactivity'])[0]
+        assert ticket.partial
+        assert ticket.id == 1
+        assert ticket.subject == 'Ticket 1'
+        assert ticket.lastactivity is not NotLoaded
+        assert ticket.statusid is NotLoaded
+        assert not ticket.statusid
+        # Nested objects are only built when asked for
+        assert ticket.posts is NotLoaded
+        assert ticket.notes is NotLoaded
+        assert sorted(ticket.parameters) == ['id', 'lastactivity', 'subject']
+        assert ticket.save_parameters == dict(subject='Ticket 1')
+
+    def test_nested_fields(self):
+        from kayako.core.lib import NotLoaded
+        from kayako.objects import Ticket
+        ticket = self._api().get_all(Ticket, 1, fields=['posts', 'timetracks'])[0]
+        assert [post.contents for post in ticket.posts] == ['Hello']
+        assert [timetrack.contents for timetrack in ticket.timetracks] == ['Worked']
+        assert ticket.notes is NotLoaded
+
+    def test_full_objects_are_not_partial(self):
+        from kayako.objects import Ticket
+        ticket = self._api().get_all(Ticket, 1)[0]
+        assert not ticket.partial
+        assert ticket.statusid == 1
+
+    def test_streams_and_searches(self):
+        from kayako.core.lib import NotLoaded
+        from kayako.objects import Ticket, User
+        api = self._api()
+        for results in (api.get_all(Ticket, 1, stream=True, fields=['subject']),
+                        api.ticket_search('a', fields=['subject']),
+                        api.ticket_search_full('a', stream=True, fields=['subject'])):
+            results = list(results)
+            assert [ticket.subject for ticket in results] == ['Ticket 1', 'Ticket 2', 'Ticket 3']
+            assert all(ticket.statusid is NotLoaded for ticket in results)
+        for results in (api.get_all(User, fields=['email']), api.user_search('a', fields=['email'])):
+            assert [user.email for user in results] == [['user1@example.com'], ['user2@example.com'], ['user3@example.com']]
+            assert all(user.fullname is NotLoaded for user in results)
+
+    def test_objects_without_schema_are_trimmed(self):
+        from kayako.core.lib import NotLoaded
+        from kayako.objects import TicketPriority
+        priorities = self._api().get_all(TicketPriority, fields=['title'])
+        assert [priority.title for priority in priorities] == ['Low', 'High']
+        assert [priority.id for priority in priorities] == [1, 2]
+        assert priorities[0].displayorder is NotLoaded
+        assert priorities[0].parameters == dict(id=1, title='Low')
+
+    def test_filter_and_first(self):
+        from kayako.core.lib import NotLoaded
+        from kayako.objects import Ticket, TicketPriority
+        api = self._api()
+        priorities = api.filter(TicketPriority, fields=['title'], type='private')
+        assert [priority.title for priority in priorities] == ['High']
+        assert priorities[0].type == 'private'
+        assert priorities[0].displayorder is NotLoaded
+        ticket = api.first(Ticket, args=(1,), fields=['subject'], subject='Ticket 2')
+        assert ticket.id == 2
+        assert ticket.posts is NotLoaded
+
+    def test_unknown_field(self):
+        from kayako.objects import Ticket, TicketPriority
+        api = self._api()
+        self.assertRaises(TypeError, api.get_all, Ticket, 1, fields=['subject', 'nothing'])
+        self.assertRaises(TypeError, api.get_all, TicketPriority, fields=['nothing'])
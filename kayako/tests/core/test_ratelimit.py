@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+from kayako.tests import KayakoTest
+
+class TestTokenBucket(KayakoTest):
+
+    def test_burst_then_wait(self):
+        from kayako.core.ratelimit import TokenBucket
+        bucket = TokenBucket(rate=10, capacity=2)
+        assert bucket.try_acquire()[0]
+        assert bucket.try_acquire()[0]
+        acquired, wait = bucket.try_acquire()
+        assert not acquired
+        assert 0 < wait <= 0.1
+
+    def test_acquire_blocks(self):
+        import time
+        from kayako.core.ratelimit import TokenBucket
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.time()
+        for _ in range(4):
+            assert bucket.acquire()
+        assert time.time() - start >= 0.05
+
+    def test_acquire_timeout(self):
+        from kayako.core.ratelimit import TokenBucket
+        bucket = TokenBucket(rate=1, capacity=1)
+        assert bucket.acquire()
+        assert not bucket.acquire(timeout=0.01)
+
+class TestRateLimiter(KayakoTest):
+
+    def test_bucket_for(self):
+        from kayako.core.ratelimit import RateLimiter
+        limiter = RateLimiter(controllers={'/Tickets/Ticket': (10, 10), '/Tickets/TicketSearch': (1, 1)})
+        assert limiter.bucket_for('/Tickets/Ticket/123/') is limiter.controllers['/Tickets/Ticket']
+        assert limiter.bucket_for('/Tickets/Ticket/ListAll/1/-1/-1/-1/1000/0') is limiter.controllers['/Tickets/Ticket']
+        assert limiter.bucket_for('/Tickets/TicketSearch') is limiter.controllers['/Tickets/TicketSearch']
+        assert limiter.bucket_for('/Tickets/TicketPost/1/2/') is None
+
+    def test_controller_token_returned_on_timeout(self):
+        from kayako.core.ratelimit import RateLimiter
+        limiter = RateLimiter(rate=0.1, capacity=1, controllers={'/Tickets/TicketSearch': (0.1, 1)})
+        limiter.bucket.acquire()
+        assert not limiter.acquire('/Tickets/TicketSearch', timeout=0.01)
+        acquired, wait = limiter.controllers['/Tickets/TicketSearch'].try_acquire()
+        assert acquired
+
+    def test_shared_between_apis(self):
+        from StringIO import StringIO
+        from kayako.api import KayakoAPI
+        from kayako.core.ratelimit import RateLimiter
+        limiter = RateLimiter(rate=1, capacity=2, controllers={'/Tickets/TicketSearch': (1, 1)})
+        sent = []
+        apis = [KayakoAPI('http://localhost/api/index.php', 'key', 'secret', rate_limiter=limiter) for _ in range(2)]
+        for api in apis:
+            api._send_request = lambda controller, method, parameters, encoder=None: sent.append(controller) or StringIO('')
+        apis[0]._request('/Tickets/TicketSearch', 'POST')
+        assert not limiter.controllers['/Tickets/TicketSearch'].try_acquire()[0]
+        apis[1]._request('/Tickets/Ticket/1/', 'GET')
+        assert not limiter.bucket.try_acquire()[0]
+        assert sent == ['/Tickets/TicketSearch', '/Tickets/Ticket/1/']
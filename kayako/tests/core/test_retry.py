@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+from kayako.tests import KayakoTest
+
+class TestRetryPolicy(KayakoTest):
+
+    def _error(self, code):
+        from kayako.exception import KayakoResponseError
+        error = KayakoResponseError('HTTP Error %s: ' % code)
+        error.code = code
+        return error
+
+    def test_should_retry(self):
+        from kayako.core.retry import RetryPolicy
+        from kayako.exception import KayakoRequestError
+        policy = RetryPolicy(max_attempts=3)
+        assert policy.should_retry('GET', self._error(502), 1)
+        assert policy.should_retry('GET', KayakoRequestError('connection refused'), 2)
+        assert not policy.should_retry('GET', self._error(502), 3)
+        assert not policy.should_retry('GET', self._error(404), 1)
+        assert not policy.should_retry('POST', self._error(502), 1)
+        assert not policy.should_retry('POST', KayakoRequestError('connection refused'), 1)
+        assert RetryPolicy(methods=('GET', 'POST')).should_retry('POST', self._error(503), 1)
+
+    def test_delay(self):
+        from kayako.core.retry import RetryPolicy
+        policy = RetryPolicy(backoff=1, max_backoff=5, jitter=0)
+        assert [policy.delay(attempt) for attempt in range(1, 5)] == [1, 2, 4, 5]
+        policy = RetryPolicy(backoff=1, jitter=1)
+        for _ in range(100):
+            assert 0 <= policy.delay(2) <= 2
+
+    def test_budget(self):
+        from kayako.core.retry import RetryBudget
+        budget = RetryBudget(ratio=0.5, minimum=1)
+        assert budget.withdraw()
+        assert not budget.withdraw()
+        budget.record_request()
+        budget.record_request()
+        assert budget.withdraw()
+        assert not budget.withdraw()
+
+class TestKayakoAPIRetry(KayakoTest):
+
+    def _api(self, failures, **policy):
+        from StringIO import StringIO
+        from kayako.api import KayakoAPI
+        from kayako.core.retry import RetryPolicy
+        api = KayakoAPI('http://localhost/api/index.php', 'key', 'secret', retry_policy=RetryPolicy(backoff=0, **policy))
+        api.attempts = []
+        real_signature = api._generate_signature
+
+        def send_request(controller, method, parameters, encoder=None):
+            api.attempts.append(real_signature()[0])
+            if failures:
+                raise failures.pop(0)
+            return StringIO('response')
+
+        api._send_request = send_request
+        return api
+
+    def test_get_retried(self):
+        from kayako.exception import KayakoRequestError, KayakoResponseError
+        error = KayakoResponseError('HTTP Error 502: Bad Gateway')
+        error.code = 502
+        api = self._api([error, KayakoRequestError('reset')])
+        assert api._request('/Tickets/Ticket/1/', 'GET').read() == 'response'
+        assert len(api.attempts) == 3
+        assert len(set(api.attempts)) == 3
+
+    def test_max_attempts(self):
+        from kayako.exception import KayakoRequestError
+        api = self._api([KayakoRequestError('reset')] * 3, max_attempts=2)
+        self.assertRaises(KayakoRequestError, api._request, '/Tickets/Ticket/1/', 'GET')
+        assert len(api.attempts) == 2
+
+    def test_post_not_retried(self):
+        from kayako.exception import KayakoRequestError
+        api = self._api([KayakoRequestError('reset')])
+        self.assertRaises(KayakoRequestError, api._request, '/Tickets/Ticket', 'POST')
+        assert len(api.attempts) == 1
+
+    def test_budget_exhausted(self):
+        from kayako.exception import KayakoRequestError
+        api = self._api([KayakoRequestError('reset')] * 3, budget_ratio=0, budget_minimum=1)
+        self.assertRaises(KayakoRequestError, api._request, '/Tickets/Ticket/1/', 'GET')
+        assert len(api.attempts) == 2
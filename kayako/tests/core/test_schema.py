@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import fake_api
+
+class TestSchema(KayakoTest):
+
+    def _schema(self):
+        from kayako.core.schema import Schema, Field, INT, BOOLEAN, DATE, LIST, NODE, NODES
+        return Schema([
+            Field('id', INT, attribute=True),
+            Field('title'),
+            Field('count', INT, source='total'),
+            Field('optional', INT, required=False),
+            Field('enabled', BOOLEAN),
+            Field('created', DATE),
+            Field('expires', DATE),
+            Field('email', LIST),
+            Field('children', NODE),
+            Field('notes', NODES, source='note'),
+        ])
+
+    def _node(self, xml):
+        from lxml import etree
+        return etree.fromstring(xml)
+
+    def test_parse(self):
+        from datetime import datetime
+        from kayako.core.lib import FOREVER
+        node = self._node('<item id="3"><title>A</title><total>5</total><enabled>1</enabled><created>1309262424</created><expires>0</expires>'
+                          '<email>a@example.com</email><note>1</note><email>b@example.com</email><children><x/></children><note>2</note><title>B</title></item>')
+        values = self._schema().parse(node)
+        assert values['id'] == 3
+        # The first child with a tag is used, as with find
+        assert values['title'] == 'A'
+        assert values['count'] == 5
+        assert values['optional'] is None
+        assert values['enabled'] is True
+        assert values['created'] == datetime.fromtimestamp(1309262424)
+        assert values['expires'] is FOREVER
+        assert values['email'] == ['a@example.com', 'b@example.com']
+        assert values['children'].tag == 'children'
+        assert [note.text for note in values['notes']] == ['1', '2']
+
+    def test_missing_and_invalid(self):
+        from kayako.exception import KayakoResponseError
+        schema = self._schema()
+        valid = '<item id="3"><total>5</total><enabled>1</enabled><created>1</created><expires>1</expires>%s</item>'
+        values = schema.parse(self._node(valid % ''))
+        assert values['title'] is None
+        assert values['email'] == [] and values['notes'] == [] and values['children'] is None
+        self.assertRaises(KayakoResponseError, schema.parse, self._node('<item id="3"><enabled>1</enabled><created>1</created><expires>1</expires></item>'))
+        self.assertRaises(KayakoResponseError, schema.parse, self._node(valid.replace('<enabled>1', '<enabled>2')))
+        self.assertRaises(KayakoResponseError, schema.parse, self._node(valid % '<optional>x</optional>'))
+
+    def test_update(self):
+        class Item(object):
+            title = count = optional = enabled = None
+
+        item = Item()
+        self._schema().update(item, self._node('<item id="4"><total>7</total><optional></optional></item>'))
+        assert item.id == 4
+        assert item.count == 7
+        assert item.optional is None
+        # Fields not in the response are left as they are
+        assert not hasattr(item, 'email')
+        assert not hasattr(item, 'notes')
+
+    def test_epoch(self):
+        from kayako.core.lib import FOREVER
+        schema = self._schema()
+        assert schema.epoch() is schema.epoch()
+        values = schema.epoch().parse(self._node('<item id="3"><total>5</total><enabled>1</enabled><created>1309262424</created><expires>0</expires></item>'))
+        assert values['created'] == 1309262424
+        assert values['expires'] is FOREVER
+        assert values['count'] == 5
+
+class TestSchemaObjects(KayakoTest):
+
+    def test_ticket(self):
+        from lxml import etree
+        from kayako.objects import Ticket
+        from kayako.tests.core.fixtures import tickets
+        node = etree.fromstring(tickets([12], departmentid=4, statusid=2, ownerstaffid=0))[0]
+        ticket = Ticket(None, **Ticket._parse_ticket(None, node))
+        assert (ticket.id, ticket.departmentid, ticket.statusid, ticket.ownerstaffid, ticket.ticketpriorityid) == (12, 4, 2, 0, 1)
+        assert ticket.subject == 'Ticket 12'
+        assert ticket.isescalated is False
+        assert ticket.watchers == [dict(staffid='1', name='Staff')]
+        assert [post.id for post in ticket.posts] == [123]
+        assert [note.id for note in ticket.notes] == [121]
+        assert [timetrack.id for timetrack in ticket.timetracks] == [122]
+
+        ticket = Ticket(None)
+        ticket._update_from_response(node)
+        assert ticket.id == 12 and ticket.ticketpriorityid == 1 and ticket.tags == 'a b'
+
+    def test_user(self):
+        from lxml import etree
+        from kayako.objects import User
+        from kayako.tests.core.fixtures import users
+        node = etree.fromstring(users([5]))[0]
+        user = User(None, **User._parse_user(node))
+        assert user.id == 5
+        assert user.email == ['user5@example.com']
+        assert user.isenabled is True
+
+    def test_epoch_dates(self):
+        from datetime import datetime
+        from kayako.core.lib import FOREVER
+        from kayako.objects import Ticket
+        from kayako.tests.core.fixtures import tickets
+        for lazy in (False, True):
+            api = fake_api(lambda *args: tickets([1]), lazy=lazy, epoch_dates=True)
+            ticket = api.get_all(Ticket, 1)[0]
+            assert ticket.creationtime == 1309262424
+            assert ticket.laststaffreply is FOREVER
+            assert ticket.posts[0].dateline == 1309262424
+            assert api.get_all(Ticket, 1, fields=['lastactivity'])[0].lastactivity == 1309262500
+        api = fake_api(lambda *args: tickets([1]))
+        assert api.get_all(Ticket, 1)[0].creationtime == datetime.fromtimestamp(1309262424)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+import threading
+import time
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import fake_api
+
+DEPARTMENTS = '''<?xml version="1.0" encoding="UTF-8"?>
+<departments>
+    <department><id>1</id><title>General</title><type>public</type><module>tickets</module><displayorder>1</displayorder><parentdepartmentid>0</parentdepartmentid><uservisibilitycustom>0</uservisibilitycustom></department>
+</departments>'''
+
+def _wait_for(condition, timeout=5):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(0.001)
+
+def _run_threads(target, count):
+    results = [None] * count
+
+    def run(index):
+        try:
+            results[index] = target()
+        except Exception, error:
+            results[index] = error
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+class TestSingleFlight(KayakoTest):
+
+    def test_shared_result(self):
+        from kayako.core.singleflight import SingleFlight
+        flight = SingleFlight()
+        calls = []
+
+        def work():
+            calls.append(1)
+            _wait_for(lambda: flight.shared == 4)
+            return object()
+
+        results = _run_threads(lambda: flight.do('key', work), 5)
+        assert len(calls) == 1
+        assert len(set(map(id, results))) == 1
+        assert flight.calls == 1 and flight.shared == 4
+        assert flight.in_flight() == 0
+
+    def test_shared_error(self):
+        from kayako.core.singleflight import SingleFlight
+        flight = SingleFlight()
+
+        def work():
+            _wait_for(lambda: flight.shared == 2)
+            raise ValueError('failed')
+
+        results = _run_threads(lambda: flight.do('key', work), 3)
+        assert all(isinstance(result, ValueError) for result in results)
+        # The key is released, so the next call runs again
+        assert flight.do('key', lambda: 'again') == 'again'
+
+    def test_different_keys(self):
+        from kayako.core.singleflight import SingleFlight
+        flight = SingleFlight()
+        assert flight.do('a', lambda: 1) == 1
+        assert flight.do('b', lambda: 2) == 2
+        assert flight.calls == 2 and flight.shared == 0
+
+class TestKayakoAPISingleFlight(KayakoTest):
+
+    def _api(self, single_flight=True):
+        self.sent = []
+
+        def handler(method, url, body, headers):
+            self.sent.append(method)
+            if method == 'GET':
+                _wait_for(lambda: api.single_flight.shared == 7)
+            return DEPARTMENTS
+
+        api = fake_api(handler, single_flight=single_flight)
+        return api
+
+    def test_concurrent_gets_share_request(self):
+        from kayako.objects import Department
+        api = self._api()
+        departments = _run_threads(lambda: api.get(Department, 1), 8)
+        assert self.sent == ['GET']
+        assert [department.title for department in departments] == ['General'] * 8
+        # Every caller parses its own copy
+        assert len(set(map(id, departments))) == 8
+
+    def test_queries_are_keyed(self):
+        api = self._api()
+        api.single_flight.shared = 7
+        api._request('/Base/Department', 'GET', a='1')
+        api._request('/Base/Department', 'GET', a='2')
+        api._request('/Base/Department', 'GET', a='1')
+        assert self.sent == ['GET'] * 3
+
+    def test_writes_bypass(self):
+        api = self._api()
+        _run_threads(lambda: api._request('/Base/Department', 'POST', title='Sales').read(), 8)
+        assert self.sent == ['POST'] * 8
+
+    def test_disabled(self):
+        from kayako.objects import Department
+        api = self._api(single_flight=False)
+        assert api.single_flight is None
+        # Single flight is opt-in
+        assert fake_api(lambda *args: '').single_flight is None
+        self.sent = []
+        # Without single flight the handler does not wait for followers
+        api.transport.handler = lambda method, url, body, headers: self.sent.append(method) or DEPARTMENTS
+        _run_threads(lambda: api.get(Department, 1), 4)
+        assert self.sent == ['GET'] * 4
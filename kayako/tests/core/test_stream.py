@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import tickets, users, fake_api
+
+class _Response(object):
+    ''' A response that records how much of the body has been read. '''
+
+    def __init__(self, body):
+        from StringIO import StringIO
+        self.body = StringIO(body)
+        self.closed = False
+
+    def read(self, size=-1):
+        return self.body.read(size)
+
+    def position(self):
+        return self.body.tell()
+
+    def close(self):
+        self.closed = True
+
+class TestIterNodes(KayakoTest):
+
+    def test_nodes_are_yielded_and_cleared(self):
+        from kayako.core.stream import iter_nodes
+        body = tickets(range(1, 2001))
+        response = _Response(body)
+        previous = None
+        count = 0
+        for node in iter_nodes(response, 'ticket'):
+            count += 1
+            assert node.get('id') == str(count)
+            # Earlier tickets have been removed from the tree
+            assert node.getprevious() is None
+            if previous is not None:
+                assert len(previous) == 0
+            if count == 1:
+                # The first ticket is available before the whole body is read
+                assert response.position() < len(body)
+            previous = node
+        assert count == 2000
+        assert response.closed
+
+    def test_only_children_of_root(self):
+        from kayako.core.stream import iter_nodes
+        response = _Response('<tickets><ticket id="1"><ticket id="2"/></ticket><other/><ticket id="3"/></tickets>')
+        assert [node.get('id') for node in iter_nodes(response, 'ticket')] == ['1', '3']
+
+    def test_close_closes_response(self):
+        from kayako.core.stream import iter_nodes
+        response = _Response(tickets(range(1, 10)))
+        nodes = iter_nodes(response, 'ticket')
+        nodes.next()
+        nodes.close()
+        assert response.closed
+
+class TestStreamedLists(KayakoTest):
+
+    def _api(self):
+        self.sent = []
+
+        def handler(method, url, body, headers):
+            self.sent.append((method, url))
+            if 'User' in url:
+                return users(range(1, 51))
+            return tickets(range(1, 51))
+
+        return fake_api(handler)
+
+    def test_streamed_matches_parsed(self):
+        import types
+        from kayako.objects import Ticket, User
+        api = self._api()
+        for streamed, parsed in ((api.get_all(Ticket, 1, stream=True), api.get_all(Ticket, 1)),
+                                 (api.get_all(User, stream=True), api.get_all(User)),
+                                 (api.ticket_search('a', stream=True), api.ticket_search('a')),
+                                 (api.ticket_search_full('a', stream=True), api.ticket_search_full('a')),
+                                 (api.user_search('a', stream=True), api.user_search('a'))):
+            assert isinstance(streamed, types.GeneratorType)
+            streamed = list(streamed)
+            assert len(streamed) == len(parsed) == 50
+            for streamed_object, parsed_object in zip(streamed, parsed):
+                assert type(streamed_object) is type(parsed_object)
+                assert streamed_object.parameters.keys() == parsed_object.parameters.keys()
+                assert streamed_object.id == parsed_object.id
+
+    def test_ticket_children(self):
+        from kayako.objects import Ticket
+        api = self._api()
+        ticket = api.get_all(Ticket, 1, stream=True).next()
+        assert ticket.subject == 'Ticket 1'
+        assert [post.contents for post in ticket.posts] == ['Hello']
+        assert [note.contents for note in ticket.notes] == ['A note']
+
+    def test_request_is_sent_immediately(self):
+        from kayako.exception import KayakoDeadlineExceededError
+        from kayako.objects import Ticket
+        api = self._api()
+        api.get_all(Ticket, 1, stream=True)
+        assert len(self.sent) == 1
+        self.assertRaises(KayakoDeadlineExceededError, api.get_all, Ticket, 1, stream=True, deadline=0)
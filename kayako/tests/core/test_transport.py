@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+import BaseHTTPServer
+import urlparse
+from xml.sax.saxutils import escape
+
+from kayako.tests import KayakoTest
+from kayako.tests.core.fixtures import Server, fake_api
+
+DEPARTMENT = '<department><id>%s</id><title>%s</title><type>public</type><module>tickets</module><displayorder>1</displayorder><parentdepartmentid>0</parentdepartmentid><uservisibilitycustom>0</uservisibilitycustom></department>'
+
+class FakeKayako(object):
+    ''' A tiny in-memory Department controller. '''
+
+    def __init__(self):
+        self.departments = {1: 'General'}
+        self.requests = []
+
+    def _document(self, ids):
+        return '<?xml version="1.0" encoding="UTF-8"?><departments>%s</departments>' % ''.join(DEPARTMENT % (id, escape(self.departments[id])) for id in ids)
+
+    def __call__(self, method, url, body, headers):
+        query = urlparse.parse_qs(urlparse.urlparse(url).query)
+        fields = urlparse.parse_qs(body or '')
+        path = [part for part in query['e'][0].split('/') if part]
+        self.requests.append((method, '/'.join(path)))
+        if path == ['Base', 'Department']:
+            if method == 'GET':
+                return self._document(sorted(self.departments))
+            if method == 'POST':
+                id = max(self.departments) + 1
+                self.departments[id] = fields['title'][0]
+                return self._document([id])
+        elif path[:2] == ['Base', 'Department']:
+            id = int(path[2])
+            if method == 'GET':
+                return self._document([id] if id in self.departments else [])
+            if method == 'PUT' and id in self.departments:
+                self.departments[id] = fields['title'][0]
+                return self._document([id])
+            if method == 'DELETE' and id in self.departments:
+                del self.departments[id]
+                return ''
+        return 404, {'Content-Type': 'text/plain'}, '[Error]: Department not found'
+
+class _HandlerServer(BaseHTTPServer.BaseHTTPRequestHandler):
+    ''' Serves requests with the handler of an InProcessTransport. '''
+
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self):
+        length = int(self.headers.getheader('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        result = self.server.handler(self.command, self.path, body, dict(self.headers))
+        if isinstance(result, basestring):
+            result = 200, {}, result
+        status, headers, body = result
+        self.send_response(status)
+        for name, value in headers.iteritems():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+    def log_message(self, *args):
+        pass
+
+class TestTransport(KayakoTest):
+
+    def setUp(self):
+        self.kayako = FakeKayako()
+        self.server = Server(_HandlerServer)
+        self.server.handler = self.kayako
+        self.url = self.server.url
+
+    def tearDown(self):
+        self.server.close()
+
+    def _check_crud(self, api):
+        from kayako.exception import KayakoResponseError
+        from kayako.objects import Department
+
+        assert [dept.title for dept in api.get_all(Department)] == ['General']
+
+        department = api.create(Department, title='Sales', module='tickets', type='public')
+        department.add()
+        assert department.id == 2
+
+        department.title = 'Sales & Marketing'
+        department.save()
+        assert api.get(Department, 2).title == 'Sales & Marketing'
+
+        department.delete()
+        assert api.get(Department, 2) is None
+        self.assertRaises(KayakoResponseError, api._request, '/Base/Department/2/', 'DELETE')
+        assert self.kayako.departments == {1: 'General'}
+        api.close()
+
+    def test_in_process_transport(self):
+        api = fake_api(self.kayako)
+        self._check_crud(api)
+
+    def test_pooled_transport(self):
+        from kayako.api import KayakoAPI
+        from kayako.core.transport import PooledTransport
+        api = KayakoAPI(self.url, 'key', 'secret')
+        assert isinstance(api.transport, PooledTransport)
+        self._check_crud(api)
+
+    def test_urllib_transport(self):
+        from kayako.api import KayakoAPI
+        api = KayakoAPI(self.url, 'key', 'secret', pool_size=0)
+        self._check_crud(api)
+
+    def test_urllib_transport_timeouts(self):
+        import socket
+        from kayako.core import transport
+        timeouts = []
+        urlopen = transport.urllib2.urlopen
+        transport.urllib2.urlopen = lambda request, timeout: timeouts.append(timeout)
+        try:
+            for timeout in (None, (None, None), (2, None), (None, 3), (2, 3)):
+                transport.UrllibTransport().send('GET', self.url, timeout=timeout)
+        finally:
+            transport.urllib2.urlopen = urlopen
+        default = socket._GLOBAL_DEFAULT_TIMEOUT
+        assert timeouts == [default, default, 2, 3, 3]
+
+    def test_in_process_error_and_compression(self):
+        import gzip
+        from StringIO import StringIO
+        from kayako.exception import KayakoResponseError
+
+        compressed = StringIO()
+        with gzip.GzipFile(fileobj=compressed, mode='wb') as gzip_file:
+            gzip_file.write('<ok/>')
+        seen = []
+
+        def handler(method, url, body, headers):
+            seen.append(headers)
+            if 'Missing' in url:
+                return 503, {}, 'down'
+            return 200, {'content-encoding': 'gzip'}, StringIO(compressed.getvalue())
+
+        api = fake_api(handler)
+        assert api._request('/Core/Test', 'GET').read() == '<ok/>'
+        assert seen[0]['Accept-Encoding'] == 'gzip, deflate'
+        try:
+            api._send_request('/Core/Missing', 'GET', {})
+        except KayakoResponseError, error:
+            assert str(error) == 'HTTP Error 503: Service Unavailable: down'
+            assert error.code == 503
+        else:
+            assert False, 'KayakoResponseError not raised'
+
+    def test_connection_error(self):
+        import socket
+        from kayako.api import KayakoAPI
+        from kayako.core.retry import NO_RETRY
+        from kayako.exception import KayakoRequestError
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        url = 'http://127.0.0.1:%s/api/index.php' % sock.getsockname()[1]
+        sock.close()
+        for pool_size in (0, 10):
+            api = KayakoAPI(url, 'key', 'secret', pool_size=pool_size, retry_policy=NO_RETRY)
+            self.assertRaises(KayakoRequestError, api._request, '/Core/Test', 'GET')
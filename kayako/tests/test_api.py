@@ -10,7 +10,7 @@ Created on May 5, 2011
 @author: evan
 '''
 
-from kayako.tests import KayakoAPITest
+from kayako.tests import KayakoTest, KayakoAPITest
 
 class TestKayakoAPI(KayakoAPITest):
 
@@ -187,7 +187,36 @@ class TestKayakoAPI(KayakoAPITest):
     def test_ticket_search_full(self):
         assert isinstance(self.api.ticket_search_full('testonly'), list)
 
+class TestKayakoAPIGetMany(KayakoTest):
 
+    POST = '''<?xml version="1.0" encoding="UTF-8"?>
+<posts><post><id>%s</id><ticketpostid>%s</ticketpostid><ticketid>%s</ticketid><dateline>1305000000</dateline><userid>1</userid><fullname>Test</fullname><email>test@example.com</email><emailto></emailto><ipaddress></ipaddress><hasattachments>0</hasattachments><creator>2</creator><isthirdparty>0</isthirdparty><ishtml>0</ishtml><isemailed>0</isemailed><staffid>0</staffid><issurveycomment>0</issurveycomment><contents>Post</contents><isprivate>0</isprivate></post></posts>'''
 
-
-
+    @property
+    def api(self):
+        from kayako.api import KayakoAPI
+        api = KayakoAPI('http://localhost/api/index.php', 'key', 'secret')
+        api._request = self._request
+        return api
+
+    def _request(self, controller, method, **parameters):
+        from StringIO import StringIO
+        from kayako.exception import KayakoResponseError
+        ticketid, postid = controller.strip('/').split('/')[-2:]
+        if postid == '404':
+            raise KayakoResponseError('HTTP Error 404: Not Found: ')
+        if postid == '500':
+            raise KayakoResponseError('HTTP Error 500: Internal Server Error: ')
+        return StringIO(self.POST % (postid, postid, ticketid))
+
+    def test_get_many_composite(self):
+        from kayako.objects import TicketPost
+        results = self.api.get_many(TicketPost, [(1, 3), (1, 404), [2, 1], (1, 500), (3, 2)], workers=3)
+        assert [post and post.id for post in results] == [3, None, 1, None, 2]
+        assert results[2].ticketid == 2
+        assert results.errors.keys() == [(1, 500)]
+        assert 'HTTP Error 500' in str(results.errors[(1, 500)])
+
+    def test_get_many_empty(self):
+        from kayako.objects import TicketPost
+        assert self.api.get_many(TicketPost, []) == []
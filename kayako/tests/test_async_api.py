@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#-----------------------------------------------------------------------------
+# Copyright (c) 2011, Evan Leis
+#
+# Distributed under the terms of the Lesser GNU General Public License (LGPL)
+#-----------------------------------------------------------------------------
+
+from StringIO import StringIO
+
+from kayako.tests import KayakoTest
+
+DEPARTMENTS = '''<?xml version="1.0" encoding="UTF-8"?>
+<departments>
+    <department><id>1</id><title>General</title><type>public</type><module>tickets</module><displayorder>1</displayorder><parentdepartmentid>0</parentdepartmentid><uservisibilitycustom>0</uservisibilitycustom></department>
+    <department><id>2</id><title>Sales</title><type>public</type><module>livechat</module><displayorder>2</displayorder><parentdepartmentid>0</parentdepartmentid><uservisibilitycustom>0</uservisibilitycustom></department>
+</departments>'''
+
+class TestAsyncKayakoAPI(KayakoTest):
+
+    def setUp(self):
+        from kayako.async_api import AsyncKayakoAPI
+        self.requests = []
+        self.async_api = AsyncKayakoAPI('http://localhost/api/index.php', 'key', 'secret', workers=4)
+        self.async_api.api._request = self._request
+
+    def tearDown(self):
+        self.async_api.close()
+
+    def _request(self, controller, method, **parameters):
+        self.requests.append((controller, method))
+        if controller == '/Base/Department' and method == 'GET' or method == 'PUT':
+            return StringIO(DEPARTMENTS)
+        if method == 'DELETE':
+            return StringIO('')
+        from kayako.exception import KayakoResponseError
+        raise KayakoResponseError('HTTP Error 404: Not Found: ')
+
+    def test_get_all(self):
+        from kayako.objects import Department
+        result = self.async_api.get_all(Department)
+        departments = result.get(5)
+        assert [dept.id for dept in departments] == [1, 2]
+        assert departments[0].api is self.async_api.api
+
+    def test_filter_and_first(self):
+        from kayako.objects import Department
+        filtered = self.async_api.filter(Department, module='tickets')
+        first = self.async_api.first(Department, module='livechat')
+        assert [dept.id for dept in filtered.get(5)] == [1]
+        assert first.get(5).id == 2
+
+    def test_callback(self):
+        import threading
+        from kayako.objects import Department
+        done = threading.Event()
+        results = []
+
+        def callback(departments):
+            results.append(departments)
+            done.set()
+
+        self.async_api.get_all(Department, callback=callback)
+        done.wait(5)
+        assert len(results[0]) == 2
+
+    def test_errors_are_raised_by_get(self):
+        from kayako.exception import KayakoResponseError
+        from kayako.objects import Department
+        result = self.async_api.get(Department, 123)
+        self.assertRaises(KayakoResponseError, result.get, 5)
+
+    def test_save_and_delete(self):
+        from kayako.core.lib import UnsetParameter
+        from kayako.objects import Department
+        department = self.async_api.create(Department, id=1, title='General')
+        assert self.async_api.save(department).get(5) is department
+        assert self.async_api.delete(department).get(5).id is UnsetParameter
+        assert self.requests == [('/Base/Department/1/', 'PUT'), ('/Base/Department/1/', 'DELETE')]
+
+    def test_search_arguments(self):
+        calls = []
+        for name in ('ticket_search', 'ticket_search_full', 'user_search'):
+            setattr(self.async_api.api, name, lambda query, _name=name, **kwargs: calls.append((_name, query, kwargs)))
+        self.async_api.ticket_search('a', contents=True, fields=['subject']).get(5)
+        self.async_api.ticket_search_full('b', stream=True, fields=['subject']).get(5)
+        self.async_api.user_search('c', deadline=5, fields=['fullname']).get(5)
+        deadline = calls[2][2].pop('deadline')
+        assert 0 < deadline.remaining() <= 5
+        assert calls == [
+            ('ticket_search', 'a', dict(contents=True, fields=['subject'])),
+            ('ticket_search_full', 'b', dict(stream=True, fields=['subject'])),
+            ('user_search', 'c', dict(fields=['fullname'])),
+        ]